@@ -0,0 +1,188 @@
+"""
+Batch command line: ``python -m Core [spec] [options]``.
+
+A job spec (JSON or TOML) lists tickers, window pairs and date ranges;
+every ticker x range is fetched once and all its window pairs are
+evaluated in one vectorized pass. Results go to CSV, Parquet or JSON.
+Only argparse is imported up front; pandas loads once there is work to
+do, yfinance only for network fetches and matplotlib only for charts.
+"""
+import argparse
+import json
+import os
+import sys
+
+SPEC_KEYS = {'tickers', 'windows', 'short_windows', 'long_windows', 'ranges', 'start', 'end',
+             'initial_capital', 'ma_type', 'data', 'cache', 'offline', 'output', 'plot_dir',
+             'concurrency', 'rate'}
+
+
+def load_spec(path):
+    """Job spec dict from a .json or .toml file."""
+    if os.path.splitext(path)[1].lower() == '.toml':
+        import tomllib
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+    else:
+        with open(path) as f:
+            spec = json.load(f)
+    unknown = set(spec) - SPEC_KEYS
+    if unknown:
+        raise ValueError(f"Unknown job spec keys {sorted(unknown)}, expected {sorted(SPEC_KEYS)}")
+    return spec
+
+
+def window_pairs(spec):
+    """(short, long) pairs from ``windows`` or the short_windows x long_windows grid."""
+    if spec.get('windows'):
+        pairs = [tuple(int(w) for w in pair) for pair in spec['windows']]
+    else:
+        pairs = [(short, long) for short in spec.get('short_windows', [20])
+                 for long in spec.get('long_windows', [50]) if short < long]
+    if not pairs:
+        raise ValueError("No valid (short, long) window pairs in the job spec")
+    return pairs
+
+
+def date_ranges(spec):
+    """(start, end) pairs from ``ranges`` or a single ``start``/``end``."""
+    if spec.get('ranges'):
+        return [tuple(pair) for pair in spec['ranges']]
+    return [(spec.get('start', '2020-01-01'), spec.get('end', '2024-01-01'))]
+
+
+def make_source(spec):
+    """DataSource for the spec: local files, a PriceCache, or concurrent downloads."""
+    if spec.get('data'):
+        from .sources import LocalFileSource
+        return LocalFileSource(spec['data'])
+    if spec.get('cache'):
+        from .cache import PriceCache
+        from .sources import YFinanceSource
+        return YFinanceSource(cache=PriceCache(spec['cache'], offline=spec.get('offline', False)))
+    from .fetcher import AsyncSource
+    return AsyncSource(max_concurrency=spec.get('concurrency', 8), rate=spec.get('rate'))
+
+
+def run_jobs(spec):
+    """Evaluate every ticker x date range x window pair; returns a DataFrame."""
+    import numpy as np
+    import pandas as pd
+    from .backtester import evaluate_pairs
+    from .performance import infer_periods_per_year
+
+    tickers = [ticker.upper() for ticker in spec['tickers']]
+    pairs = window_pairs(spec)
+    capital = spec.get('initial_capital', 100000)
+    ma_type = spec.get('ma_type', 'sma')
+    source = make_source(spec)
+
+    frames = []
+    for start, end in date_ranges(spec):
+        errors = {}
+        loaded = source.load_many(tickers, start, end, errors)
+        for ticker in tickers:
+            if ticker not in loaded:
+                message = errors.get(ticker, f"No data found for ticker {ticker}")
+                frames.append(pd.DataFrame([{'Ticker': ticker, 'Start': start, 'End': end,
+                                             'Error': message}]))
+                continue
+            try:
+                close = loaded[ticker]['Close'].to_numpy(dtype=np.float64)
+                frame = evaluate_pairs(close, pairs, capital, ma_type=ma_type,
+                                       periods_per_year=infer_periods_per_year(loaded[ticker].index))
+            except Exception as e:
+                frame = pd.DataFrame([{'Error': str(e)}])
+            frame.insert(0, 'End', end)
+            frame.insert(0, 'Start', start)
+            frame.insert(0, 'Ticker', ticker)
+            frames.append(frame)
+
+            if spec.get('plot_dir'):
+                save_charts(loaded[ticker], ticker, start, end, pairs, capital, ma_type, spec['plot_dir'])
+    results = pd.concat(frames, ignore_index=True)
+    # Failed jobs have no windows; keep the column integer anyway
+    windows = [column for column in ('Short_MA', 'Long_MA') if column in results]
+    return results.astype({column: 'Int64' for column in windows})
+
+
+def save_charts(data, ticker, start, end, pairs, capital, ma_type, directory):
+    """One chart per window pair, rendered headless."""
+    from .signals import generate_signals_lean
+    from .strategy import run_strategy
+    from .performance import calculate_performance
+    from .plotter import plot_results, use_headless
+
+    use_headless()
+    os.makedirs(directory, exist_ok=True)
+    for short, long in pairs:
+        # Lean signals leave the shared ``data`` frame untouched
+        signals = generate_signals_lean(data, short, long, ma_type=ma_type)
+        portfolio, trades = run_strategy(signals, capital, lean=True)
+        metrics = calculate_performance(portfolio, trades, capital)
+        path = os.path.join(directory, f"{ticker}_{start}_{end}_{short}_{long}.png")
+        plot_results(signals, portfolio, ticker, metrics, short, long, capital, save_path=path, show=False)
+
+
+def write_results(results, path):
+    """Write by extension: .csv, .parquet/.pq or .json (one record per row)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        results.to_csv(path, index=False)
+    elif ext in ('.parquet', '.pq'):
+        results.to_parquet(path, index=False)
+    elif ext == '.json':
+        results.to_json(path, orient='records', indent=2, date_format='iso')
+    else:
+        raise ValueError(f"Unsupported output format '{ext}', expected .csv, .parquet or .json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m Core',
+                                     description="Batch moving average crossover backtests")
+    parser.add_argument('spec', nargs='?', help="job spec file (.json or .toml)")
+    parser.add_argument('--tickers', nargs='+', help="stock symbols")
+    parser.add_argument('--windows', nargs='+', metavar='SHORT:LONG', help="window pairs, e.g. 20:50 10:30")
+    parser.add_argument('--start', help="start date (YYYY-MM-DD)")
+    parser.add_argument('--end', help="end date (YYYY-MM-DD)")
+    parser.add_argument('--capital', type=float, dest='initial_capital', help="initial capital")
+    parser.add_argument('--ma-type', dest='ma_type', help="sma, ema, wma or hma")
+    parser.add_argument('--data', help="directory or long-format file of local prices")
+    parser.add_argument('--cache', help="PriceCache directory")
+    parser.add_argument('--offline', action='store_true', default=None,
+                        help="serve only what is in --cache, never download")
+    parser.add_argument('--concurrency', type=int, help="parallel downloads")
+    parser.add_argument('--rate', type=float, help="max downloads started per second")
+    parser.add_argument('-o', '--output', help="results file (.csv, .parquet or .json)")
+    parser.add_argument('--plot-dir', dest='plot_dir', help="save a chart per job to this directory")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.spec) if args.spec else {}
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot read job spec: {e}")
+    overrides = {key: value for key, value in vars(args).items() if key != 'spec' and value is not None}
+    if 'windows' in overrides:
+        overrides['windows'] = [pair.split(':') for pair in overrides['windows']]
+    if 'start' in overrides or 'end' in overrides:
+        spec.pop('ranges', None)
+    spec.update(overrides)
+    if not spec.get('tickers'):
+        parser.error("no tickers given (job spec or --tickers)")
+
+    try:
+        results = run_jobs(spec)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if spec.get('output'):
+        write_results(results, spec['output'])
+        print(f"Wrote {len(results)} results to {spec['output']}")
+    else:
+        print(results.to_string(index=False))
+    return 1 if 'Error' in results and results['Error'].notna().all() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
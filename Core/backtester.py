@@ -1,8 +1,18 @@
-from .data_loader import fetch_data
-from .signals import generate_signals
-from .strategy import run_strategy
-from .performance import calculate_performance
-from .plotter import plot_results
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .sources import YFinanceSource
+from .signals import generate_signals, generate_signals_lean, moving_average_matrix, crossover_signal
+from .strategy import run_strategy, simulate_batch
+from .ledger import TradeLedger
+from .results import data_fingerprint, result_key
+from .resample import resample_ohlcv, multi_timeframe_signals
+from .performance import TRADING_DAYS, compute_metrics, format_metrics, portfolio_metrics, infer_periods_per_year
+from .instrument import Instrumentation, StageTimings
+
+logger = logging.getLogger(__name__)
 
 class MovingAverageCrossoverBacktester:
     """
@@ -11,60 +21,258 @@ class MovingAverageCrossoverBacktester:
 
     def __init__(self, ticker: str, start_date: str, end_date: str,
                  short_window: int = 20, long_window: int = 50,
-                 initial_capital: float = 100000):
+                 initial_capital: float = 100000, engine: str = "vectorized",
+                 cache=None, source=None, ma_type: str = "sma", execution: dict = None,
+                 instrument: bool = False, hooks=None, lean: bool = False,
+                 price_dtype: str = "float64", timeframe: str = None,
+                 signal_timeframe: str = None, periods_per_year: int = None,
+                 trace_memory: bool = False):
         self.ticker = ticker.upper()
         self.start_date = start_date
         self.end_date = end_date
         self.short_window = short_window
         self.long_window = long_window
+        self.ma_type = ma_type
         self.initial_capital = initial_capital
+        self.engine = engine
+        self.execution = execution
+        # Lean mode leaves self.data untouched and keeps only the columns that are read
+        self.lean = lean
+        self.price_dtype = price_dtype
+        # Bars are traded on ``timeframe`` (default: as fetched), signals may
+        # come from coarser ``signal_timeframe`` bars; see Core.resample.
+        # Those signals are always lean-shaped float64 frames, so there lean
+        # only trims the portfolio and other price dtypes are rejected.
+        if signal_timeframe and price_dtype != "float64":
+            raise ValueError("price_dtype is not supported with signal_timeframe; signals there are float64")
+        self.timeframe = timeframe
+        self.signal_timeframe = signal_timeframe
+        # None annualizes by the frequency of the traded bars
+        self.periods_per_year = periods_per_year
+        self.cache = cache
+        self.source = source if source is not None else YFinanceSource(cache=cache)
 
         self.data = None
         self.signals = None
         self.portfolio = None
         self.trades = []
         self.metrics = {}
+        self.metric_values = {}
+
+        # Per-stage timing is off unless asked for (or a hook wants it);
+        # memory peaks need trace_memory too, since tracing slows the stages
+        self.instrumentation = Instrumentation(enabled=instrument or bool(hooks),
+                                               trace_memory=trace_memory, hooks=hooks)
+        self.timings = self.instrumentation.timings
+
+    def run_backtest(self, save_plot_path: str = None, plot: bool = False, headless: bool = False,
+                     cache=None):
+        """
+        Run the full pipeline. Charts are opt-in: ``plot=True`` shows them,
+        ``save_plot_path`` writes them to disk, and ``headless=True`` renders
+        on the Agg backend without opening a window.
+
+        ``cache`` is an optional ResultCache: when a run with the same
+        configuration and identical input prices was stored before, its
+        signals, portfolio, trades and metrics are returned instead of being
+        recomputed. (Prices still come from ``self.source``; pair it with a
+        PriceCache or LocalFileSource to make the whole call cheap.)
+
+        Progress and results go to the ``Core`` loggers (silent unless
+        logging is configured). With ``instrument=True`` or hooks, each
+        stage's wall/CPU time and rows/sec are recorded in ``self.timings``;
+        ``trace_memory=True`` adds its tracemalloc peak, and the timings then
+        include the tracing overhead.
+        """
+        instrumentation = self.instrumentation
+        self.timings = instrumentation.timings = StageTimings()
 
-    def run_backtest(self, save_plot_path: str = None):
-        print("=" * 60)
-        print(f"MOVING AVERAGE CROSSOVER BACKTEST - {self.ticker}")
-        print("=" * 60)
-        print(f"Strategy: {self.short_window}-day MA vs {self.long_window}-day MA")
-        print(f"Period: {self.start_date} to {self.end_date}")
-        print(f"Initial Capital: ${self.initial_capital:,.2f}")
-        print("-" * 60)
+        logger.info("=" * 60)
+        logger.info("MOVING AVERAGE CROSSOVER BACKTEST - %s", self.ticker)
+        logger.info("=" * 60)
+        logger.info("Strategy: %s-day MA vs %s-day MA", self.short_window, self.long_window)
+        logger.info("Period: %s to %s", self.start_date, self.end_date)
+        if self.timeframe or self.signal_timeframe:
+            logger.info("Bars: %s, signals on %s", self.timeframe or "as fetched",
+                        self.signal_timeframe or self.timeframe)
+        logger.info("Initial Capital: $%s", f"{self.initial_capital:,.2f}")
+        logger.info("-" * 60)
 
         # Step 1: Fetch data
-        print("Fetching data...")
-        self.data = fetch_data(self.ticker, self.start_date, self.end_date)
+        logger.info("Fetching data...")
+        with instrumentation.stage('fetch') as stage:
+            self.data = self.source.load(self.ticker, self.start_date, self.end_date)
+            stage.rows = len(self.data)
+        rows = len(self.data)
 
-        # Step 2: Generate signals
-        print("Generating trading signals...")
-        self.signals = generate_signals(self.data, self.short_window, self.long_window)
+        stored = None
+        if cache is not None:
+            with instrumentation.stage('cache', rows):
+                run_key = result_key(self.config(), data_fingerprint(self.data))
+                stored = cache.get(run_key)
+        if stored is not None:
+            logger.info("Loaded stored result from cache")
+            self.signals = stored['signals']
+            self.portfolio = stored['portfolio']
+            self.trades = stored['trades']
+            self.metric_values = stored['metrics']
+        else:
+            # Step 2: Generate signals
+            logger.info("Generating trading signals...")
+            with instrumentation.stage('signals', rows):
+                if self.signal_timeframe:
+                    self.signals = multi_timeframe_signals(self.data, self.short_window, self.long_window,
+                                                           self.signal_timeframe, self.timeframe,
+                                                           ma_type=self.ma_type)
+                else:
+                    bars = resample_ohlcv(self.data, self.timeframe) if self.timeframe else self.data
+                    if self.lean:
+                        self.signals = generate_signals_lean(bars, self.short_window, self.long_window,
+                                                             ma_type=self.ma_type, dtype=self.price_dtype)
+                    else:
+                        self.signals = generate_signals(bars, self.short_window, self.long_window,
+                                                        ma_type=self.ma_type)
 
-        # Step 3: Run strategy and backtest
-        print("Running strategy simulation...")
-        self.portfolio, self.trades = run_strategy(self.signals, self.initial_capital)
+            # Step 3: Run strategy and backtest
+            logger.info("Running strategy simulation...")
+            with instrumentation.stage('strategy', rows):
+                self.portfolio, self.trades = run_strategy(self.signals, self.initial_capital,
+                                                           engine=self.engine, execution=self.execution,
+                                                           lean=self.lean)
 
-        # Step 4: Calculate performance metrics
-        print("Calculating performance metrics...")
-        self.metrics = calculate_performance(self.portfolio, self.trades, self.initial_capital)
+            # Step 4: Calculate performance metrics
+            logger.info("Calculating performance metrics...")
+            with instrumentation.stage('metrics', rows):
+                self.metric_values = portfolio_metrics(self.portfolio, self.trades, self.initial_capital,
+                                                       self.periods_per_year)
+
+            if cache is not None:
+                with instrumentation.stage('store', rows):
+                    cache.put(run_key, self.ticker, self.config(), self.signals, self.portfolio,
+                              self.trades, self.metric_values)
+        self.metrics = format_metrics(self.metric_values)
 
         # Step 5: Plot results
-        print("Plotting results...")
-        plot_results(self.signals, self.portfolio, self.ticker, self.metrics,
-                     self.short_window, self.long_window, self.initial_capital,
-                     save_path=save_plot_path)
+        if plot or save_plot_path:
+            logger.info("Plotting results...")
+            with instrumentation.stage('plot', rows):
+                # matplotlib is only loaded when a chart is requested
+                from .plotter import plot_results, use_headless
+                if headless:
+                    use_headless()
+                plot_results(self.signals, self.portfolio, self.ticker, self.metrics,
+                             self.short_window, self.long_window, self.initial_capital,
+                             save_path=save_plot_path, show=plot and not headless)
 
         # Summary
-        print("\nBACKTEST RESULTS")
-        print("-" * 30)
+        logger.info("")
+        logger.info("BACKTEST RESULTS")
+        logger.info("-" * 30)
         for key, value in self.metrics.items():
-            print(f"{key:<25}: {value}")
+            logger.info("%-25s: %s", key, value)
+
+        logger.info("")
+        logger.info("Total Trades Executed: %d", len(self.trades))
+        logger.info("Data Points Analyzed: %d", rows)
 
-        print(f"\nTotal Trades Executed: {len(self.trades)}")
-        print(f"Data Points Analyzed: {len(self.data)}")
+        for record in self.timings:
+            logger.info("Stage %-8s %8.4fs wall %8.4fs cpu %12.0f rows/s", record['Stage'],
+                        record['Wall_s'], record['CPU_s'], record['Rows_per_s'])
 
         return self
-    
 
+    def config(self):
+        """Everything besides the input prices that determines a run's result."""
+        return {
+            'ticker': self.ticker,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'short_window': self.short_window,
+            'long_window': self.long_window,
+            'initial_capital': self.initial_capital,
+            'engine': self.engine,
+            'ma_type': self.ma_type,
+            'execution': self.execution,
+            'lean': self.lean,
+            'price_dtype': self.price_dtype,
+            'timeframe': self.timeframe,
+            'signal_timeframe': self.signal_timeframe,
+            'periods_per_year': self.periods_per_year,
+        }
+
+    def export_trades(self, path: str):
+        """
+        Write the executed trades to ``path`` (Parquet for .parquet/.pq,
+        CSV otherwise) and return the ledger.
+        """
+        ledger = TradeLedger.from_trades(self.trades)
+        if str(path).lower().endswith(('.parquet', '.pq')):
+            ledger.to_parquet(path)
+        else:
+            ledger.to_csv(path)
+        logger.info("Trades exported to %s", path)
+        return ledger
+
+
+def sweep(ticker, short_windows, long_windows, start_date=None, end_date=None,
+          initial_capital=100000, data=None, batch_size=256, cache=None, source=None,
+          ma_type="sma"):
+    """
+    Evaluate every (short, long) window pair on one ticker in a single pass.
+
+    Data is loaded once from ``source`` (Yahoo Finance by default) or taken
+    from ``data``, every distinct window's ``ma_type`` moving average is
+    computed once (with the same algorithm as run_backtest()), and the
+    pairs are simulated ``batch_size`` at a time as 2-D arrays. Pairs with
+    short >= long are skipped. Returns one row per pair with the
+    compute_metrics() values.
+    """
+    if data is None:
+        if source is None:
+            source = YFinanceSource(cache=cache)
+        data = source.load(ticker.upper(), start_date, end_date)
+    close = data['Close'].to_numpy(dtype=np.float64)
+
+    pairs = [(short, long) for short in short_windows for long in long_windows if short < long]
+    if not pairs:
+        raise ValueError("No window pairs with short < long to evaluate")
+
+    windows = sorted({w for pair in pairs for w in pair})
+    row_of = {w: i for i, w in enumerate(windows)}
+    averages = moving_average_matrix(close, windows, ma_type=ma_type)
+
+    periods_per_year = infer_periods_per_year(data.index)
+    results = [evaluate_pairs(close, pairs[start:start + batch_size], initial_capital, averages, row_of,
+                              periods_per_year=periods_per_year)
+               for start in range(0, len(pairs), batch_size)]
+    return pd.concat(results, ignore_index=True)
+
+
+def evaluate_pairs(close, pairs, initial_capital, averages=None, row_of=None, ma_type="sma",
+                   periods_per_year=TRADING_DAYS):
+    """
+    Simulate a batch of (short, long) window pairs over one close-price array
+    and return their numeric performance metrics as a DataFrame.
+
+    ``averages``/``row_of`` let callers pass a precomputed moving-average
+    matrix and its window-to-row mapping; otherwise ``ma_type`` averages
+    are computed here. Metrics are annualized with ``periods_per_year``.
+    """
+    if averages is None:
+        windows = sorted({w for pair in pairs for w in pair})
+        row_of = {w: i for i, w in enumerate(windows)}
+        averages = moving_average_matrix(close, windows, ma_type=ma_type)
+
+    short_rows = [row_of[short] for short, _ in pairs]
+    long_rows = [row_of[long] for _, long in pairs]
+
+    signals = crossover_signal(averages[short_rows], averages[long_rows])
+    sim = simulate_batch(close, signals, initial_capital)
+    metrics = compute_metrics(sim['Total'], initial_capital, price=close,
+                              returns=sim['Strategy_Returns'], round_trips=sim['Round_Trips'],
+                              winning_trades=sim['Winning_Trades'], periods_per_year=periods_per_year)
+
+    frame = pd.DataFrame(metrics)
+    frame.insert(0, 'Long_MA', [long for _, long in pairs])
+    frame.insert(0, 'Short_MA', [short for short, _ in pairs])
+    return frame
@@ -0,0 +1,143 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import fetch_data
+from .backtester import evaluate_pairs
+from .performance import infer_periods_per_year
+
+logger = logging.getLogger(__name__)
+
+
+class BatchBacktester:
+    """
+    Runs the crossover strategy over a universe of tickers and window pairs
+    on a process pool.
+
+    Close prices are loaded once in the parent and packed into a single
+    shared-memory block; each worker maps its ticker's slice straight out of
+    that block instead of receiving a pickled DataFrame. A ticker that fails
+    to load or simulate is recorded in ``self.errors`` and skipped.
+
+    Prices come from ``source.load_many`` when a DataSource is given,
+    otherwise from calling ``loader`` once per ticker. Each ticker's metrics
+    are annualized for the bar frequency of its own dates.
+    """
+
+    def __init__(self, tickers, param_sets, start_date: str, end_date: str,
+                 initial_capital: float = 100000, max_workers: int = None,
+                 loader=fetch_data, source=None, ma_type: str = "sma"):
+        self.tickers = [ticker.upper() for ticker in tickers]
+        self.param_sets = [(int(short), int(long)) for short, long in param_sets]
+        self.start_date = start_date
+        self.end_date = end_date
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers
+        self.loader = loader
+        self.source = source
+        self.ma_type = ma_type
+
+        self.results = None
+        self.errors = {}
+
+    def load(self):
+        """Fetch every ticker's date-indexed closes, recording failures in self.errors."""
+        if self.source is not None:
+            frames = self.source.load_many(self.tickers, self.start_date, self.end_date, self.errors)
+            closes = {}
+            for ticker in self.tickers:
+                if ticker not in frames:
+                    self.errors.setdefault(ticker, f"No data found for ticker {ticker}")
+                    continue
+                if 'Close' not in frames[ticker]:
+                    self.errors[ticker] = f"No Close column for ticker {ticker}"
+                    continue
+                closes[ticker] = frames[ticker]['Close']
+            return closes
+
+        closes = {}
+        for ticker in self.tickers:
+            try:
+                data = self.loader(ticker, self.start_date, self.end_date)
+                closes[ticker] = data['Close']
+            except Exception as e:
+                self.errors[ticker] = str(e)
+        return closes
+
+    def run(self, closes=None):
+        """
+        Run every ticker/parameter combination and return one aggregated
+        DataFrame with a row per (ticker, short, long).
+
+        ``closes`` may map tickers to close prices that are already in
+        memory; otherwise they are fetched with ``self.loader``. Series keep
+        their DatetimeIndex for infer_periods_per_year(), plain arrays are
+        annualized as daily bars.
+        """
+        if closes is None:
+            closes = self.load()
+        periods = {ticker: infer_periods_per_year(getattr(close, 'index', None)) for ticker, close in closes.items()}
+        closes = {ticker: np.asarray(close, dtype=np.float64) for ticker, close in closes.items()}
+
+        frames = []
+        if closes:
+            lengths = [len(close) for close in closes.values()]
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            size = max(sum(lengths), 1) * np.dtype(np.float64).itemsize
+
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            try:
+                packed = np.ndarray((sum(lengths),), dtype=np.float64, buffer=shm.buf)
+                for offset, close in zip(offsets, closes.values()):
+                    packed[offset:offset + len(close)] = close
+                del packed
+
+                with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                    futures = {
+                        pool.submit(_run_ticker, shm.name, int(offset), length, ticker, self.param_sets,
+                                    self.initial_capital, self.ma_type, periods[ticker]): ticker
+                        for ticker, offset, length in zip(closes, offsets, lengths)
+                    }
+                    for future in as_completed(futures):
+                        ticker = futures[future]
+                        try:
+                            frames.append(future.result())
+                        except Exception as e:
+                            self.errors[ticker] = str(e)
+            finally:
+                shm.close()
+                shm.unlink()
+
+        for ticker, error in self.errors.items():
+            logger.warning("Error analyzing %s: %s", ticker, error)
+
+        if frames:
+            self.results = pd.concat(frames, ignore_index=True)
+            self.results = self.results.sort_values(['Ticker', 'Short_MA', 'Long_MA'], ignore_index=True)
+        else:
+            self.results = pd.DataFrame(columns=['Ticker', 'Short_MA', 'Long_MA'])
+        return self.results
+
+
+def _run_ticker(shm_name, offset, length, ticker, param_sets, initial_capital, ma_type, periods_per_year):
+    """Worker: evaluate every window pair on one ticker's slice of shared memory."""
+    if length == 0:
+        raise ValueError(f"No data found for ticker {ticker}")
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    close = None
+    try:
+        close = np.ndarray((length,), dtype=np.float64, buffer=shm.buf,
+                           offset=offset * np.dtype(np.float64).itemsize)
+        frame = evaluate_pairs(close, param_sets, initial_capital, ma_type=ma_type,
+                               periods_per_year=periods_per_year)
+    finally:
+        # Drop the view before closing, the mapping can't close while exported
+        close = None
+        shm.close()
+
+    frame.insert(0, 'Ticker', ticker)
+    return frame
@@ -0,0 +1,302 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from .kernels import sma, ema, wma, hma, moving_averages
+from .signals import generate_signals, generate_signals_lean
+from .strategy import run_strategy
+from .performance import calculate_performance
+from .backtester import sweep
+from .batch import BatchBacktester
+
+PIPELINE_SIZES = (1_000, 100_000, 10_000_000)
+
+
+def synthetic_prices(n_bars, seed=0, start_price=100.0, mu=0.0003, sigma=0.015):
+    """Geometric Brownian motion close prices, reproducible from ``seed``."""
+    rng = np.random.default_rng(seed)
+    return start_price * np.exp(np.cumsum(rng.normal(mu - sigma ** 2 / 2, sigma, n_bars)))
+
+
+def synthetic_ohlcv(n_bars, seed=0, start='2000-01-03', freq='min', mu=0.0, sigma=0.0005):
+    """
+    OHLCV DataFrame around a synthetic_prices() close series. Minute bars
+    (with minute-scale drift and volatility) by default, so that 10M bars
+    still fit in the pandas timestamp range and never overflow.
+    """
+    rng = np.random.default_rng(seed + 1)
+    close = synthetic_prices(n_bars, seed=seed, mu=mu, sigma=sigma)
+    open_ = np.empty(n_bars)
+    open_[0] = close[0]
+    open_[1:] = close[:-1]
+    spread = np.abs(rng.normal(0, 0.002, n_bars))
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * (1 + spread),
+        'Low': np.minimum(open_, close) * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(100_000, 10_000_000, n_bars).astype(np.float64),
+    }, index=pd.date_range(start, periods=n_bars, freq=freq, name='Date'))
+
+
+def measure(func, repeat=1):
+    """
+    Run ``func`` and return (result, best wall seconds over ``repeat`` plain
+    calls, peak traced bytes of one extra call under tracemalloc).
+    """
+    result = None
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def best_time(func, repeat=3):
+    """Best wall-clock time of ``repeat`` calls, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_kernels(sizes=(10_000, 1_000_000), windows=(20, 50, 200), repeat=3):
+    """
+    Time the MA kernels against their pandas counterparts.
+
+    Returns a DataFrame with one row per (bars, kernel) giving the kernel
+    time, the pandas time, the speedup and the largest relative difference
+    between the two results. WMA and Hull have no built-in pandas version,
+    so they are compared with a rolling().apply() weighted mean on at most
+    10,000 bars.
+    """
+    rows = []
+    for n_bars in sizes:
+        close = synthetic_prices(n_bars)
+        series = pd.Series(close)
+        window = windows[0]
+        weights = np.arange(1, window + 1, dtype=np.float64)
+        apply_bars = min(n_bars, 10_000)
+
+        cases = [
+            ('sma', lambda: sma(close, window),
+             lambda: series.rolling(window).mean().to_numpy()),
+            (f'sma x{len(windows)}', lambda: moving_averages(close, windows),
+             lambda: np.array([series.rolling(w).mean().to_numpy() for w in windows])),
+            ('ema', lambda: ema(close, window),
+             lambda: series.ewm(span=window, adjust=False, min_periods=window).mean().to_numpy()),
+            ('wma', lambda: wma(close[:apply_bars], window),
+             lambda: series[:apply_bars].rolling(window).apply(
+                 lambda x: np.dot(x, weights) / weights.sum(), raw=True).to_numpy()),
+            ('hma', lambda: hma(close, window), None),
+        ]
+
+        for name, kernel, reference in cases:
+            result = kernel()
+            row = {'Bars': n_bars, 'Kernel': name, 'Kernel_s': best_time(kernel, repeat)}
+            if reference is not None:
+                expected = reference()
+                row['Pandas_s'] = best_time(reference, 1 if name == 'wma' else repeat)
+                row['Speedup'] = row['Pandas_s'] / row['Kernel_s']
+                with np.errstate(invalid='ignore'):
+                    row['Max_Rel_Diff'] = np.nanmax(np.abs(result - expected) / np.abs(expected))
+            rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def benchmark_pipeline(sizes=PIPELINE_SIZES, short_window=20, long_window=50,
+                       initial_capital=100000, repeat=1, plot=True):
+    """
+    Time each pipeline stage (generate_signals, run_strategy,
+    calculate_performance and, with ``plot``, a headless plot_results) on a
+    synthetic series of every size. Returns one record per (bars, stage).
+    """
+    records = []
+    for n_bars in sizes:
+        data = synthetic_ohlcv(n_bars)
+        signals, seconds, peak = measure(
+            lambda: generate_signals(data.copy(), short_window, long_window), repeat)
+        records.append(_record('pipeline', n_bars, 'signals', seconds, peak))
+
+        (portfolio, trades), seconds, peak = measure(lambda: run_strategy(signals, initial_capital), repeat)
+        records.append(_record('pipeline', n_bars, 'strategy', seconds, peak))
+
+        metrics, seconds, peak = measure(lambda: calculate_performance(portfolio, trades, initial_capital), repeat)
+        records.append(_record('pipeline', n_bars, 'metrics', seconds, peak))
+
+        if plot:
+            from .plotter import plot_results, use_headless
+            use_headless()
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'chart.png')
+                _, seconds, peak = measure(lambda: plot_results(
+                    signals, portfolio, 'SYNTH', metrics, short_window, long_window, initial_capital,
+                    save_path=path, show=False, dpi=100, max_points=2000), repeat)
+            records.append(_record('pipeline', n_bars, 'plot', seconds, peak))
+        del data, signals, portfolio, trades
+    return records
+
+
+def benchmark_memory(sizes=PIPELINE_SIZES, short_window=20, long_window=50, initial_capital=100000):
+    """
+    Peak traced memory and time of signals + strategy + metrics in the
+    standard mode (mutating generate_signals, full portfolio) against the
+    lean mode in float64 and float32. Each record's Reduction is the
+    standard peak divided by that mode's peak. float32 only shrinks the
+    signals frame that is kept; the run itself still peaks in float64.
+    """
+    def pipeline(data, lean, dtype='float64'):
+        if lean:
+            signals = generate_signals_lean(data, short_window, long_window, dtype=dtype)
+        else:
+            signals = generate_signals(data, short_window, long_window)
+        portfolio, trades = run_strategy(signals, initial_capital, lean=lean)
+        return calculate_performance(portfolio, trades, initial_capital)
+
+    records = []
+    for n_bars in sizes:
+        data = synthetic_ohlcv(n_bars)
+        modes = [('lean', lambda: pipeline(data, True)),
+                 ('lean_float32', lambda: pipeline(data, True, 'float32')),
+                 # Last: the standard mode widens ``data`` in place
+                 ('standard', lambda: pipeline(data, False))]
+        mode_records = []
+        for name, func in modes:
+            _, seconds, peak = measure(func)
+            mode_records.append(_record('memory', n_bars, name, seconds, peak))
+        standard = mode_records[-1]['Peak_MB']
+        for record in mode_records:
+            record['Reduction'] = standard / record['Peak_MB'] if record['Peak_MB'] else float('nan')
+        records += mode_records
+        del data
+    return records
+
+
+def benchmark_multi_ticker(n_tickers=50, n_bars=2520, param_sets=((20, 50), (10, 30), (50, 200)),
+                           initial_capital=100000, max_workers=None, repeat=1):
+    """Time BatchBacktester over ``n_tickers`` synthetic closes (no downloads)."""
+    closes = {f'SYN{i}': synthetic_prices(n_bars, seed=i) for i in range(n_tickers)}
+    batch = BatchBacktester(list(closes), param_sets, None, None, initial_capital, max_workers=max_workers)
+    _, seconds, peak = measure(lambda: batch.run(closes), repeat)
+    return [_record('multi_ticker', n_tickers * n_bars, 'batch', seconds, peak)]
+
+
+def benchmark_grid(n_bars=2520, short_windows=range(5, 105, 5), long_windows=range(20, 420, 10),
+                   initial_capital=100000, repeat=1):
+    """Time a sweep() over a (short, long) grid on one synthetic series."""
+    data = synthetic_ohlcv(n_bars)
+    results, seconds, peak = measure(lambda: sweep('SYNTH', short_windows, long_windows, data=data,
+                                                   initial_capital=initial_capital), repeat)
+    return [_record('grid', n_bars, f'sweep x{len(results)}', seconds, peak)]
+
+
+def run_suite(sizes=PIPELINE_SIZES, repeat=1, plot=True):
+    """Every scenario, as a JSON-ready dict with environment metadata."""
+    records = benchmark_pipeline(sizes, repeat=repeat, plot=plot)
+    records += benchmark_memory(sizes)
+    records += benchmark_multi_ticker(repeat=repeat)
+    records += benchmark_grid(repeat=repeat)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'results': records,
+    }
+
+
+def save_results(suite, path):
+    with open(path, 'w') as f:
+        json.dump(suite, f, indent=2)
+
+
+def compare_to_baseline(suite, baseline, tolerance=0.25, min_seconds=0.01):
+    """
+    Join a run_suite() result with a baseline (dict or JSON path) on
+    (scenario, bars, stage). A stage regresses when its time or peak memory
+    grows by more than ``tolerance`` (0.25 = 25%) over the baseline; time
+    differences below ``min_seconds`` are treated as timer noise.
+    """
+    if isinstance(baseline, str):
+        with open(baseline) as f:
+            baseline = json.load(f)
+    keys = ['Scenario', 'Bars', 'Stage']
+    current = pd.DataFrame(suite['results'])
+    previous = pd.DataFrame(baseline['results'])[keys + ['Seconds', 'Peak_MB']]
+    merged = current.merge(previous, on=keys, how='left', suffixes=('', '_Baseline'))
+    merged['Time_Ratio'] = merged['Seconds'] / merged['Seconds_Baseline']
+    merged['Memory_Ratio'] = merged['Peak_MB'] / merged['Peak_MB_Baseline']
+    slower = (merged['Time_Ratio'] > 1 + tolerance) & (merged['Seconds'] - merged['Seconds_Baseline'] > min_seconds)
+    merged['Regression'] = slower | (merged['Memory_Ratio'] > 1 + tolerance)
+    return merged
+
+
+def _record(scenario, n_bars, stage, seconds, peak):
+    return {
+        'Scenario': scenario,
+        'Bars': n_bars,
+        'Stage': stage,
+        'Seconds': seconds,
+        'Peak_MB': peak / 2 ** 20,
+        'Rows_per_s': n_bars / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of the backtesting pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(PIPELINE_SIZES),
+                        help="pipeline series lengths in bars")
+    parser.add_argument('--repeat', type=int, default=1, help="timed calls per stage (best is kept)")
+    parser.add_argument('--no-plot', action='store_true', help="skip the plot_results stage")
+    parser.add_argument('--kernels', action='store_true', help="only compare the MA kernels with pandas")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="compare against this JSON file and flag regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown before flagging")
+    args = parser.parse_args(argv)
+
+    if args.kernels:
+        print(benchmark_kernels().to_string(index=False))
+        return 0
+
+    suite = run_suite(args.sizes, repeat=args.repeat, plot=not args.no_plot)
+    print(pd.DataFrame(suite['results']).to_string(index=False))
+    if args.output:
+        save_results(suite, args.output)
+        print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        comparison = compare_to_baseline(suite, args.baseline, args.tolerance)
+        print(comparison[['Scenario', 'Bars', 'Stage', 'Time_Ratio', 'Memory_Ratio', 'Regression']]
+              .to_string(index=False))
+        regressions = comparison[comparison['Regression']]
+        if len(regressions):
+            print(f"{len(regressions)} stage(s) regressed beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
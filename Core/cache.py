@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import download, OHLCV_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Where an open-ended (None) start date begins: before any listed history
+OPEN_START = pd.Timestamp('1900-01-01')
+
+
+class PriceCache:
+    """
+    Persistent on-disk OHLCV cache in front of a price fetcher.
+
+    Each ticker is stored as two memory-mappable .npy files (UTC nanosecond
+    timestamps and an (n, 5) OHLCV matrix) covering one contiguous
+    [start, end) date range. Requests inside that range are sliced from disk;
+    requests that extend it only fetch the missing head and/or tail.
+    Tickers are evicted least-recently-used first once the cache grows past
+    ``max_bytes``. With ``offline=True`` the fetcher is never called and
+    only the cached part of a request is returned. A ``None`` start or end
+    is open-ended: the full history, or everything up to today. Coverage
+    never extends past today, so a request ending in the future fetches the
+    new bars again once they exist.
+
+    ``fetcher(ticker, start, end)`` must return a cleaned OHLCV DataFrame,
+    empty when the range holds no bars; the default downloads from Yahoo
+    Finance.
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30,
+                 offline: bool = False, fetcher=download):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.fetcher = fetcher
+
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._read_index()
+
+    def get(self, ticker, start_date, end_date):
+        """Return OHLCV bars for ticker in [start_date, end_date)."""
+        ticker = ticker.upper()
+        start, end = _to_date(start_date, OPEN_START), _to_date(end_date, _tomorrow())
+        entry = self._index.get(ticker)
+
+        if entry is not None and _to_date(entry['start']) <= start and end <= _to_date(entry['end']):
+            data = self._read(ticker)
+        elif self.offline:
+            if entry is None:
+                raise ValueError(f"No cached data for ticker {ticker} (offline mode)")
+            logger.info("Offline mode: serving cached %s to %s for %s", entry['start'], entry['end'], ticker)
+            data = self._read(ticker)
+        else:
+            data = self._extend(ticker, entry, start, end)
+            if ticker not in self._index:
+                # Nothing to cache, e.g. a mistyped ticker; ask again next time
+                return data
+
+        entry = self._index[ticker]
+        entry['last_access'] = time.time()
+        self._write_index()
+        return _slice(data, start, end)
+
+    def invalidate(self, ticker=None):
+        """Drop one ticker from the cache, or everything when ticker is None."""
+        tickers = list(self._index) if ticker is None else [ticker.upper()]
+        for name in tickers:
+            if self._index.pop(name, None) is not None:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+        self._write_index()
+
+    def size(self):
+        """Total bytes of cached price data."""
+        return sum(entry['bytes'] for entry in self._index.values())
+
+    def _extend(self, ticker, entry, start, end):
+        if entry is None:
+            data = self.fetcher(ticker, _to_str(start), _to_str(end))
+            if data.empty:
+                return data
+            covered = (start, min(end, _tomorrow()))
+        else:
+            data = self._read(ticker)
+            cached_start, cached_end = _to_date(entry['start']), _to_date(entry['end'])
+            parts = [data]
+            if start < cached_start:
+                parts.insert(0, self.fetcher(ticker, _to_str(start), _to_str(cached_start)))
+            if end > cached_end:
+                parts.append(self.fetcher(ticker, _to_str(cached_end), _to_str(end)))
+            data = pd.concat([part for part in parts if not part.empty] or [data])
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+            covered = (min(start, cached_start), max(min(end, _tomorrow()), cached_end))
+
+        self._store(ticker, data, *covered)
+        self._evict(keep=ticker)
+        return data
+
+    def _store(self, ticker, data, start, end):
+        path = os.path.join(self.directory, ticker)
+        os.makedirs(path, exist_ok=True)
+
+        index = data.index
+        tz = str(index.tz) if getattr(index, 'tz', None) is not None else None
+        if tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        stamps = pd.DatetimeIndex(index).as_unit('ns').asi8
+        values = data.reindex(columns=OHLCV_COLUMNS).to_numpy(dtype=np.float64)
+
+        # Write then rename so a crash never leaves a half-written file behind
+        for name, array in (('index.npy', stamps), ('ohlcv.npy', values)):
+            tmp = os.path.join(path, name + '.tmp')
+            with open(tmp, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp, os.path.join(path, name))
+
+        self._index[ticker] = {
+            'start': _to_str(start),
+            'end': _to_str(end),
+            'tz': tz,
+            'bytes': stamps.nbytes + values.nbytes,
+            'last_access': time.time(),
+        }
+        self._write_index()
+
+    def _read(self, ticker):
+        path = os.path.join(self.directory, ticker)
+        stamps = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+        values = np.load(os.path.join(path, 'ohlcv.npy'), mmap_mode='r')
+
+        index = pd.DatetimeIndex(np.asarray(stamps).view('datetime64[ns]'))
+        tz = self._index[ticker]['tz']
+        if tz is not None:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        return pd.DataFrame(np.array(values), index=index, columns=OHLCV_COLUMNS)
+
+    def _evict(self, keep=None):
+        total = self.size()
+        by_age = sorted(self._index, key=lambda name: self._index[name]['last_access'])
+        for name in by_age:
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            total -= self._index[name]['bytes']
+            logger.info("Evicting %s from price cache", name)
+            self.invalidate(name)
+
+    def _read_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp, path)
+
+
+def _to_date(value, default=None):
+    if value is None:
+        return default
+    stamp = pd.Timestamp(value)
+    if stamp.tz is not None:
+        stamp = stamp.tz_localize(None)
+    return stamp.normalize()
+
+
+def _tomorrow():
+    """Exclusive end of the last day that can have bars."""
+    return pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+
+
+def _to_str(value):
+    return value.strftime('%Y-%m-%d')
+
+
+def _slice(data, start, end):
+    index = data.index
+    local = index.tz_localize(None) if getattr(index, 'tz', None) is not None else index
+    return data[(local >= start) & (local < end)]
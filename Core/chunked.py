@@ -0,0 +1,374 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .execution import NUMBA_AVAILABLE
+from .ledger import TradeLedger
+from .performance import INFER_BARS, RISK_FREE_RATE, infer_periods_per_year
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def npy_chunks(close_path, index_path, chunk_size=DEFAULT_CHUNK_SIZE, column=None):
+    """
+    Yield (index, close) chunks from memory-mapped .npy files: an int64 UTC
+    nanosecond timestamp array and a close array (or a 2-D price matrix and
+    the ``column`` holding the close). Only one chunk is resident at a time.
+    """
+    stamps = np.load(index_path, mmap_mode='r')
+    prices = np.load(close_path, mmap_mode='r')
+    for start in range(0, len(stamps), chunk_size):
+        close = prices[start:start + chunk_size]
+        if column is not None:
+            close = close[:, column]
+        yield (pd.DatetimeIndex(np.asarray(stamps[start:start + chunk_size]).view('datetime64[ns]')),
+               np.array(close, dtype=np.float64))
+
+
+def price_cache_chunks(cache, ticker, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Chunks of a ticker already stored in a PriceCache, straight from its .npy files."""
+    path = os.path.join(cache.directory, ticker.upper())
+    # Close is the fourth OHLCV column
+    return npy_chunks(os.path.join(path, 'ohlcv.npy'), os.path.join(path, 'index.npy'), chunk_size, column=3)
+
+
+def parquet_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, date_column='Date', close_column='Close',
+                   ticker=None, ticker_column='Ticker'):
+    """
+    Yield (index, close) chunks from a Parquet file or directory, reading
+    record batches of at most ``chunk_size`` rows. ``ticker`` selects one
+    symbol from a long-format file. Rows must be in date order.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format='parquet')
+    filter_ = None
+    if ticker is not None:
+        filter_ = ds.field(ticker_column).isin([ticker.upper(), ticker.lower()])
+    for batch in dataset.to_batches(columns=[date_column, close_column], filter=filter_,
+                                    batch_size=chunk_size):
+        if batch.num_rows == 0:
+            continue
+        frame = batch.to_pandas()
+        yield (pd.DatetimeIndex(frame[date_column]),
+               frame[close_column].to_numpy(dtype=np.float64))
+
+
+def _roll(fstate, istate, value, removed, do_remove, window):
+    # One step of pandas' Kahan add/remove rolling mean (see streaming.RollingMean).
+    # fstate: sum_x, compensation_add, compensation_remove, prev_value
+    # istate: nobs, neg_ct, num_consecutive_same_value
+    if window == 1:
+        fstate[0] = 0.0
+        fstate[1] = 0.0
+        fstate[2] = 0.0
+        fstate[3] = np.nan
+        istate[0] = 0
+        istate[1] = 0
+        istate[2] = 0
+    elif do_remove and removed == removed:
+        istate[0] -= 1
+        y = -removed - fstate[2]
+        t = fstate[0] + y
+        fstate[2] = t - fstate[0] - y
+        fstate[0] = t
+        if np.signbit(removed):
+            istate[1] -= 1
+
+    if value == value:
+        istate[0] += 1
+        y = value - fstate[1]
+        t = fstate[0] + y
+        fstate[1] = t - fstate[0] - y
+        fstate[0] = t
+        if np.signbit(value):
+            istate[1] += 1
+        if value == fstate[3]:
+            istate[2] += 1
+        else:
+            istate[2] = 1
+        fstate[3] = value
+
+    nobs = istate[0]
+    if nobs < window or nobs == 0:
+        return np.nan
+    result = fstate[0] / nobs
+    if istate[2] >= nobs:
+        result = fstate[3]
+    elif istate[1] == 0 and result < 0:
+        result = 0.0
+    elif istate[1] == nobs and result > 0:
+        result = 0.0
+    return result
+
+
+def _make_chunk_kernel(roll):
+    def _crossover_chunk(ext, first, seen, short_window, long_window, fstate, istate, book,
+                         total, trade_index, trade_side, trade_shares):
+        """
+        Advance both rolling means and the loop engine's cash/shares book over
+        ext[first:], where ext starts with the carried tail of earlier bars
+        and ``seen`` is the global bar number of ext[first]. Returns the
+        number of trades; book = [cash, shares] is updated in place.
+        """
+        cash = book[0]
+        shares = book[1]
+        n_trades = 0
+        for j in range(first, len(ext)):
+            bar = seen + j - first
+            price = ext[j]
+            short_ma = roll(fstate[0], istate[0], price, ext[j - short_window] if j >= short_window else 0.0,
+                            bar >= short_window, short_window)
+            long_ma = roll(fstate[1], istate[1], price, ext[j - long_window] if j >= long_window else 0.0,
+                           bar >= long_window, long_window)
+
+            # Buy signal (enter long position), sell signal (exit)
+            if short_ma > long_ma and shares == 0:
+                qty = cash // price
+                if qty > 0:
+                    shares = qty
+                    cash -= qty * price
+                    trade_index[n_trades] = bar
+                    trade_side[n_trades] = 1
+                    trade_shares[n_trades] = qty
+                    n_trades += 1
+            elif short_ma < long_ma and shares > 0:
+                cash += shares * price
+                trade_index[n_trades] = bar
+                trade_side[n_trades] = -1
+                trade_shares[n_trades] = shares
+                n_trades += 1
+                shares = 0.0
+
+            total[j - first] = shares * price + cash
+        book[0] = cash
+        book[1] = shares
+        return n_trades
+    return _crossover_chunk
+
+
+_KERNELS = {'python': _make_chunk_kernel(_roll)}
+
+
+def _compile():
+    from numba import njit
+
+    return njit(cache=True)(_make_chunk_kernel(njit(cache=True)(_roll)))
+
+
+class ChunkedBacktester:
+    """
+    Out-of-core crossover backtest over a stream of (index, close) chunks.
+
+    Only the last ``long_window`` closes, the rolling-mean sums, cash,
+    shares and the metric accumulators (compounded high-water mark, equity
+    peak, return moments) carry from one chunk to the next, so memory is
+    bounded by the chunk size however long the history is. Moving averages
+    follow pandas' rolling().mean() algorithm step for step, so signals,
+    trades and equity are identical to run_backtest() on the whole series;
+    return, drawdown, trade and buy & hold metrics match exactly and
+    volatility-based ratios to floating-point rounding (their sums are
+    merged per chunk).
+
+    The bar loop is compiled with Numba when it is installed and otherwise
+    runs as the same pure-Python code. ``periods_per_year`` defaults to the
+    bar frequency of the dates seen so far, the same leading INFER_BARS
+    bars infer_periods_per_year() reads from the whole index.
+    """
+
+    def __init__(self, short_window: int = 20, long_window: int = 50,
+                 initial_capital: float = 100000, engine: str = "auto",
+                 periods_per_year: int = None, risk_free_rate: float = RISK_FREE_RATE):
+        if engine == "auto":
+            engine = "numba" if NUMBA_AVAILABLE else "python"
+        if engine == "numba" and not NUMBA_AVAILABLE:
+            raise ImportError("engine='numba' requires numba (pip install numba)")
+        if engine == "numba" and engine not in _KERNELS:
+            _KERNELS[engine] = _compile()
+        if engine not in _KERNELS:
+            raise ValueError(f"Unknown engine '{engine}', expected 'auto', 'numba' or 'python'")
+        self.short_window = short_window
+        self.long_window = long_window
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+        self._infer = periods_per_year is None
+        self._dates = pd.DatetimeIndex([])
+        self.risk_free_rate = risk_free_rate
+        self._kernel = _KERNELS[engine]
+
+        self._tail = np.empty(0)
+        self._fstate = np.zeros((2, 4))
+        self._fstate[:, 3] = np.nan
+        self._istate = np.zeros((2, 3), dtype=np.int64)
+        self._book = np.array([float(initial_capital), 0.0])
+
+        self.bars = 0
+        self.trades = TradeLedger()
+        self.first_price = np.nan
+        self.last_price = np.nan
+        self.last_total = float(initial_capital)
+        # Return moments (count, mean, M2), squared losses and compounded drawdown state
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._loss_sq = 0.0
+        self._cumulative = 1.0
+        self._running_max = -np.inf
+        self._max_drawdown = np.inf
+        # Equity peak state for the drawdown duration
+        self._equity_peak = -np.inf
+        self._last_peak_bar = 0
+        self._max_duration = 0
+
+    def update(self, index, close):
+        """Process one chunk of bars and return its per-bar total equity."""
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        n = len(close)
+        if n == 0:
+            return np.empty(0)
+        index = pd.DatetimeIndex(index)
+        if self._infer and len(self._dates) < INFER_BARS:
+            self._dates = self._dates.append(index[:INFER_BARS - len(self._dates)])
+            self.periods_per_year = infer_periods_per_year(self._dates)
+
+        ext = np.concatenate((self._tail, close))
+        first = len(self._tail)
+        total = np.empty(n)
+        trade_index = np.empty(n, dtype=np.int64)
+        trade_side = np.empty(n, dtype=np.int8)
+        trade_shares = np.empty(n)
+        n_trades = self._kernel(ext, first, self.bars, self.short_window, self.long_window,
+                                self._fstate, self._istate, self._book, total,
+                                trade_index, trade_side, trade_shares)
+
+        local = trade_index[:n_trades] - self.bars
+        self.trades.extend(index[local], trade_side[:n_trades], close[local],
+                           trade_shares[:n_trades], bars=trade_index[:n_trades])
+
+        self._accumulate(close, total)
+        self._tail = ext[-max(self.short_window, self.long_window):].copy()
+        self.bars += n
+        return total
+
+    def run(self, chunks, on_chunk=None):
+        """
+        Consume an iterable of (index, close) chunks. ``on_chunk(index,
+        total)`` may persist each chunk's equity (e.g. to disk).
+        """
+        for index, close in chunks:
+            total = self.update(index, close)
+            if on_chunk is not None:
+                on_chunk(index, total)
+        return self
+
+    def metrics(self):
+        """compute_metrics()-style numeric metrics of everything processed so far."""
+        if self.bars == 0:
+            raise ValueError("No bars processed")
+        ppy = self.periods_per_year
+        total_return = (self.last_total - self.initial_capital) / self.initial_capital
+        years = self.bars / ppy
+        annualized_return = _annualize(total_return, years)
+
+        volatility = np.sqrt(self._m2 / (self._count - 1)) * np.sqrt(ppy) if self._count > 1 else np.nan
+        downside = np.sqrt(self._loss_sq / self._count) * np.sqrt(ppy) if self._count else np.nan
+        excess = annualized_return - self.risk_free_rate
+        max_drawdown = self._max_drawdown
+
+        buy_hold_return = (self.last_price - self.first_price) / self.first_price
+        round_trips, winning_trades = self.trades.win_counts()
+        return {
+            'Total Return': total_return,
+            'Annualized Return': annualized_return,
+            'Volatility': volatility,
+            'Sharpe Ratio': excess / volatility if volatility > 0 else 0.0,
+            'Sortino Ratio': excess / downside if downside > 0 else 0.0,
+            'Calmar Ratio': annualized_return / -max_drawdown if max_drawdown < 0 else 0.0,
+            'Max Drawdown': max_drawdown,
+            'Max Drawdown Duration': self._max_duration,
+            'Buy & Hold Return': buy_hold_return,
+            'Buy & Hold Annualized': (1 + buy_hold_return) ** (1/years) - 1,
+            'Total Trades': round_trips,
+            'Win Rate': winning_trades / round_trips if round_trips > 0 else 0.0,
+            'Final Portfolio Value': self.last_total,
+        }
+
+    def _accumulate(self, close, total):
+        # Strategy returns, the first bar of the series being 0 as in bar_returns()
+        previous = np.concatenate(([self.last_total], total[:-1]))
+        returns = (total - previous) / previous
+        if self.bars == 0:
+            returns[0] = 0.0
+            self.first_price = close[0]
+        self.last_price = close[-1]
+        self.last_total = total[-1]
+
+        # Chan et al. merge of the chunk's mean and squared deviations
+        valid = returns[~np.isnan(returns)]
+        if len(valid):
+            count, mean = len(valid), valid.mean()
+            m2 = ((valid - mean) ** 2).sum()
+            delta = mean - self._mean
+            merged = self._count + count
+            self._m2 += m2 + delta * delta * self._count * count / merged
+            self._mean += delta * count / merged
+            self._count = merged
+            self._loss_sq += (np.minimum(valid, 0.0) ** 2).sum()
+
+        # Compounded drawdown, continuing drawdowns()' sequential cumprod exactly
+        cumulative = np.cumprod(np.concatenate(([self._cumulative], 1 + np.nan_to_num(returns))))[1:]
+        running_max = np.maximum.accumulate(np.concatenate(([self._running_max], cumulative)))[1:]
+        self._max_drawdown = min(self._max_drawdown, np.min((cumulative - running_max) / running_max))
+        self._cumulative, self._running_max = cumulative[-1], running_max[-1]
+
+        # Bars below the last equity peak, as max_drawdown_duration()
+        bars = np.arange(self.bars, self.bars + len(total))
+        peak = np.maximum.accumulate(np.concatenate(([self._equity_peak], total)))[1:]
+        last_peak = np.maximum.accumulate(np.concatenate(([self._last_peak_bar], np.where(total >= peak, bars, 0))))[1:]
+        self._max_duration = max(self._max_duration, int((bars - last_peak).max()))
+        self._equity_peak, self._last_peak_bar = peak[-1], last_peak[-1]
+
+
+def _annualize(total_return, years):
+    # Array power like compute_metrics(); NumPy's vector pow can round differently from the scalar one
+    return ((1 + np.array([total_return])) ** (1/years) - 1).item()
+
+
+def chunked_backtest(chunks, short_window=20, long_window=50, initial_capital=100000, engine="auto"):
+    """Run a ChunkedBacktester over ``chunks`` and return it."""
+    return ChunkedBacktester(short_window, long_window, initial_capital, engine).run(chunks)
+
+
+def run_chunked_files(files, short_window=20, long_window=50, initial_capital=100000,
+                      chunk_size=DEFAULT_CHUNK_SIZE, max_workers=None, engine="auto"):
+    """
+    Out-of-core backtests of many symbols on a process pool.
+
+    ``files`` maps tickers to a Parquet file/directory or to a PriceCache
+    ticker directory (holding index.npy and ohlcv.npy). Each worker streams
+    its own file chunk by chunk. Returns one row of metrics per ticker;
+    failures are reported in an Error column.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {ticker: pool.submit(_run_file, path, short_window, long_window, initial_capital,
+                                       chunk_size, engine)
+                   for ticker, path in files.items()}
+        rows = []
+        for ticker, future in futures.items():
+            try:
+                rows.append({'Ticker': ticker, **future.result()})
+            except Exception as e:
+                rows.append({'Ticker': ticker, 'Error': str(e)})
+    return pd.DataFrame(rows)
+
+
+def _run_file(path, short_window, long_window, initial_capital, chunk_size, engine):
+    """Worker: stream one file through a ChunkedBacktester."""
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, 'index.npy')):
+        chunks = npy_chunks(os.path.join(path, 'ohlcv.npy'), os.path.join(path, 'index.npy'),
+                            chunk_size, column=3)
+    else:
+        chunks = parquet_chunks(path, chunk_size)
+    return chunked_backtest(chunks, short_window, long_window, initial_capital, engine).metrics()
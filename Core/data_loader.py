@@ -1,22 +1,50 @@
-import yfinance as yf
+import logging
+
 import pandas as pd
 
-def fetch_data(ticker, start_date, end_date):
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+logger = logging.getLogger(__name__)
+
+
+def download(ticker, start_date, end_date):
+    """
+    Download and clean OHLCV history from Yahoo Finance.
+
+    Returns an empty frame when the range has no bars, so callers filling
+    small gaps (such as PriceCache) can tell "nothing there" from an error.
+    """
+    # Imported here so cached and offline runs never pay for yfinance
+    import yfinance as yf
+
+    stock = yf.Ticker(ticker)
+    data = stock.history(start=start_date, end=end_date)
+    return clean_data(data)
+
+
+def clean_data(data):
+    # Clean and prepare data
+    if data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([]), dtype='float64')
+    data = data[OHLCV_COLUMNS].copy()
+    data.dropna(inplace=True)
+    return data
+
+
+def fetch_data(ticker, start_date, end_date, cache=None):
     try:
-        print(f"Fetching data for {ticker} from {start_date} to {end_date}...")
-        stock = yf.Ticker(ticker)
-        data = stock.history(start=start_date, end=end_date)
-        
+        logger.info("Fetching data for %s from %s to %s...", ticker, start_date, end_date)
+        if cache is not None:
+            data = cache.get(ticker, start_date, end_date)
+        else:
+            data = download(ticker, start_date, end_date)
+
         if data.empty:
             raise ValueError(f"No data found for ticker {ticker}")
-        
-        # Clean and prepare data
-        data = data[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
-        data.dropna(inplace=True)
-        
-        print(f"Successfully fetched {len(data)} trading days of data")
+
+        logger.info("Successfully fetched %d trading days of data", len(data))
         return data
-        
+
     except Exception as e:
-        print(f"Error fetching data: {e}")
-        raise
\ No newline at end of file
+        logger.warning("Error fetching data: %s", e)
+        raise
@@ -0,0 +1,263 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+# numba itself is imported on first use of the compiled kernels, it is slow to load;
+# without it the pure-Python fallback runs the very same kernels
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+
+# Order of the columns of a parameter matrix; 0 disables a stop
+EXECUTION_PARAMS = {
+    'commission': 0.0,       # fixed fee per trade
+    'commission_pct': 0.0,   # fee as a fraction of the traded value
+    'slippage': 0.0,         # fill price moves this fraction against us
+    'stop_loss': 0.0,        # exit when close falls this fraction below the entry fill
+    'take_profit': 0.0,      # exit when close rises this fraction above the entry fill
+    'trailing_stop': 0.0,    # exit when close falls this fraction below the peak since entry
+    'position_size': 1.0,    # fraction of cash committed to each entry
+    'fractional': 0.0,       # 1 allows fractional shares
+}
+
+
+
+def _execute_path(close, signal, initial_capital, commission, commission_pct, slippage,
+                  stop_loss, take_profit, trailing_stop, position_size, fractional,
+                  total, cash_out, holdings_out, trade_index, trade_side, trade_shares,
+                  trade_price, trade_fee, trade_reason):
+    """
+    Bar-by-bar execution with costs, stops and sizing; fills the per-bar and
+    per-trade output arrays and returns the number of trades.
+
+    Entries follow the loop engine (signal 1 while flat), exits happen on a
+    stop or on signal -1. After a stop, re-entry waits for the signal to
+    leave 1 so the same regime is not bought straight back. With every
+    parameter at its default the arithmetic is exactly simulate()'s.
+    """
+    cash = initial_capital
+    shares = 0.0
+    entry_price = 0.0
+    peak = 0.0
+    blocked = False
+    n_trades = 0
+
+    for i in range(len(close)):
+        price = close[i]
+        if shares > 0:
+            if price > peak:
+                peak = price
+            reason = -1
+            if stop_loss > 0 and price <= entry_price * (1 - stop_loss):
+                reason = 1
+            elif trailing_stop > 0 and price <= peak * (1 - trailing_stop):
+                reason = 3
+            elif take_profit > 0 and price >= entry_price * (1 + take_profit):
+                reason = 2
+            elif signal[i] == -1:
+                reason = 0
+
+            if reason >= 0:
+                fill = price * (1 - slippage)
+                proceeds = shares * fill
+                fee = commission + commission_pct * proceeds
+                cash += proceeds - fee
+                trade_index[n_trades] = i
+                trade_side[n_trades] = -1
+                trade_shares[n_trades] = shares
+                trade_price[n_trades] = fill
+                trade_fee[n_trades] = fee
+                trade_reason[n_trades] = reason
+                n_trades += 1
+                shares = 0.0
+                blocked = reason > 0
+        else:
+            if blocked and signal[i] != 1:
+                blocked = False
+            if signal[i] == 1 and not blocked:
+                fill = price * (1 + slippage)
+                budget = cash * position_size - commission
+                if fractional:
+                    qty = budget / (fill * (1 + commission_pct))
+                else:
+                    qty = budget // (fill * (1 + commission_pct))
+                if qty > 0:
+                    cost = qty * fill
+                    fee = commission + commission_pct * cost
+                    cash -= cost + fee
+                    shares = qty
+                    entry_price = fill
+                    peak = price
+                    trade_index[n_trades] = i
+                    trade_side[n_trades] = 1
+                    trade_shares[n_trades] = qty
+                    trade_price[n_trades] = fill
+                    trade_fee[n_trades] = fee
+                    trade_reason[n_trades] = 0
+                    n_trades += 1
+
+        cash_out[i] = cash
+        holdings_out[i] = shares
+        total[i] = cash + shares * price
+
+    return n_trades
+
+
+def _make_batch(path):
+    def _execute_batch(close, signals, rows, params, initial_capital, total, stats):
+        # stats columns: trades, round trips, winning round trips, fees paid
+        n = len(close)
+        cash = np.empty(n)
+        holdings = np.empty(n)
+        trade_index = np.empty(n, dtype=np.int64)
+        trade_side = np.empty(n, dtype=np.int8)
+        trade_shares = np.empty(n)
+        trade_price = np.empty(n)
+        trade_fee = np.empty(n)
+        trade_reason = np.empty(n, dtype=np.int8)
+
+        for k in range(params.shape[0]):
+            p = params[k]
+            n_trades = path(close, signals[rows[k]], initial_capital, p[0], p[1], p[2], p[3],
+                            p[4], p[5], p[6], p[7] > 0, total[k], cash, holdings, trade_index,
+                            trade_side, trade_shares, trade_price, trade_fee, trade_reason)
+            wins = 0
+            fees = 0.0
+            for t in range(n_trades):
+                fees += trade_fee[t]
+            for t in range(0, n_trades - 1, 2):
+                cost = trade_shares[t] * trade_price[t] + trade_fee[t]
+                proceeds = trade_shares[t + 1] * trade_price[t + 1] - trade_fee[t + 1]
+                if proceeds - cost > 0:
+                    wins += 1
+            stats[k, 0] = n_trades
+            stats[k, 1] = n_trades // 2
+            stats[k, 2] = wins
+            stats[k, 3] = fees
+    return _execute_batch
+
+
+_KERNELS = {'python': (_execute_path, _make_batch(_execute_path))}
+
+
+def _compile():
+    from numba import njit
+
+    path_jit = njit(cache=True)(_execute_path)
+    return path_jit, njit(cache=True)(_make_batch(path_jit))
+
+
+def param_matrix(param_sets):
+    """
+    (n_sets, len(EXECUTION_PARAMS)) float64 matrix from a list of dicts or a
+    DataFrame; missing parameters take their EXECUTION_PARAMS default.
+    """
+    if isinstance(param_sets, pd.DataFrame):
+        param_sets = param_sets.to_dict('records')
+    if isinstance(param_sets, dict):
+        param_sets = [param_sets]
+    matrix = np.empty((len(param_sets), len(EXECUTION_PARAMS)))
+    for k, params in enumerate(param_sets):
+        unknown = set(params) - set(EXECUTION_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown execution parameters {sorted(unknown)}, expected {list(EXECUTION_PARAMS)}")
+        matrix[k] = [float(params.get(name, default)) for name, default in EXECUTION_PARAMS.items()]
+    return matrix
+
+
+def execute(close, signal, initial_capital, engine="auto", **params):
+    """
+    Path-dependent execution of one signal series with commissions,
+    slippage, stop-loss / take-profit / trailing stops and position sizing
+    (see EXECUTION_PARAMS for the keyword arguments).
+
+    engine="numba" uses the compiled kernel, engine="python" the identical
+    pure-Python one; "auto" picks Numba when it is installed. Returns a dict
+    shaped like simulate()'s plus 'trade_price' (fill prices), 'trade_fee'
+    and 'trade_reason' (see Core.ledger.EXIT_REASONS).
+    """
+    path, _ = _kernels(engine)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    signal = np.ascontiguousarray(signal, dtype=np.int8)
+    p = param_matrix(params)[0]
+    n = len(close)
+
+    total = np.empty(n)
+    cash = np.empty(n)
+    holdings = np.empty(n)
+    trade_index = np.empty(n, dtype=np.int64)
+    trade_side = np.empty(n, dtype=np.int8)
+    trade_shares = np.empty(n)
+    trade_price = np.empty(n)
+    trade_fee = np.empty(n)
+    trade_reason = np.empty(n, dtype=np.int8)
+    n_trades = path(close, signal, float(initial_capital), p[0], p[1], p[2], p[3], p[4], p[5], p[6],
+                    p[7] > 0, total, cash, holdings, trade_index, trade_side, trade_shares,
+                    trade_price, trade_fee, trade_reason)
+
+    returns = np.zeros(n)
+    strategy_returns = np.zeros(n)
+    if n > 1:
+        returns[1:] = (close[1:] - close[:-1]) / close[:-1]
+        strategy_returns[1:] = (total[1:] - total[:-1]) / total[:-1]
+
+    return {
+        'Holdings': holdings,
+        'Cash': cash,
+        'Total': total,
+        'Returns': returns,
+        'Strategy_Returns': strategy_returns,
+        'trade_index': trade_index[:n_trades],
+        'trade_side': trade_side[:n_trades],
+        'trade_shares': trade_shares[:n_trades],
+        'trade_price': trade_price[:n_trades],
+        'trade_fee': trade_fee[:n_trades],
+        'trade_reason': trade_reason[:n_trades],
+    }
+
+
+def execute_batch(close, signals, initial_capital, param_sets, engine="auto"):
+    """
+    Run execute() for many parameter sets in one kernel call.
+
+    ``signals`` is a single signal series shared by every set or a
+    (n_sets, n_bars) array with one row per set. Returns a dict with the
+    (n_sets, n_bars) 'Total' and 'Strategy_Returns' arrays and per-set
+    'Trades', 'Round_Trips', 'Winning_Trades' (net of fees) and 'Fees'.
+    """
+    _, batch = _kernels(engine)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    signals = np.ascontiguousarray(np.atleast_2d(signals), dtype=np.int8)
+    params = param_matrix(param_sets)
+    n_sets, n = len(params), len(close)
+    if len(signals) not in (1, n_sets):
+        raise ValueError(f"Got {len(signals)} signal rows for {n_sets} parameter sets")
+    rows = np.zeros(n_sets, dtype=np.int64) if len(signals) == 1 else np.arange(n_sets)
+
+    total = np.empty((n_sets, n))
+    stats = np.zeros((n_sets, 4))
+    batch(close, signals, rows, params, float(initial_capital), total, stats)
+
+    strategy_returns = np.zeros((n_sets, n))
+    if n > 1:
+        strategy_returns[:, 1:] = (total[:, 1:] - total[:, :-1]) / total[:, :-1]
+
+    return {
+        'Total': total,
+        'Strategy_Returns': strategy_returns,
+        'Trades': stats[:, 0].astype(np.int64),
+        'Round_Trips': stats[:, 1].astype(np.int64),
+        'Winning_Trades': stats[:, 2].astype(np.int64),
+        'Fees': stats[:, 3],
+    }
+
+
+def _kernels(engine):
+    if engine == "auto":
+        engine = "numba" if NUMBA_AVAILABLE else "python"
+    if engine == "numba" and not NUMBA_AVAILABLE:
+        raise ImportError("engine='numba' requires numba (pip install numba)")
+    if engine == "numba" and engine not in _KERNELS:
+        _KERNELS[engine] = _compile()
+    if engine not in _KERNELS:
+        raise ValueError(f"Unknown engine '{engine}', expected 'auto', 'numba' or 'python'")
+    return _KERNELS[engine]
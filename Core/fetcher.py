@@ -0,0 +1,266 @@
+import asyncio
+import io
+import logging
+import random
+import time
+import urllib.error
+import urllib.request
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import clean_data, download
+from .sources import DataSource
+
+logger = logging.getLogger(__name__)
+
+
+class Provider(ABC):
+    """
+    Raw price provider for the async loader.
+
+    ``fetch`` is a coroutine returning one ticker's OHLCV frame for
+    [start_date, end_date), before cleaning. Raising ValueError means there
+    is no such data and is final; any other exception counts as a transient
+    failure and is retried.
+    """
+
+    @abstractmethod
+    async def fetch(self, ticker, start_date, end_date):
+        """One ticker's raw bars in [start_date, end_date)."""
+
+
+class YFinanceProvider(Provider):
+    """Yahoo Finance; the blocking client runs in worker threads."""
+
+    async def fetch(self, ticker, start_date, end_date):
+        return await asyncio.to_thread(download, ticker, start_date, end_date)
+
+
+class HTTPProvider(Provider):
+    """
+    CSV over HTTP, e.g. a local price server. ``url`` is a template
+    formatted with ``ticker``, ``start`` and ``end``; the response must
+    have a ``date_column`` plus the OHLCV columns. A 404 means no data.
+    """
+
+    def __init__(self, url: str, date_column: str = 'Date', timeout: float = 30.0):
+        self.url = url
+        self.date_column = date_column
+        self.timeout = timeout
+
+    async def fetch(self, ticker, start_date, end_date):
+        url = self.url.format(ticker=ticker, start=start_date, end=end_date)
+        try:
+            body = await asyncio.to_thread(self._get, url)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise ValueError(f"No data found for ticker {ticker}") from e
+            raise
+        return pd.read_csv(io.BytesIO(body), index_col=self.date_column, parse_dates=True)
+
+    def _get(self, url):
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return response.read()
+
+
+class StubProvider(Provider):
+    """
+    In-process provider serving prepared frames, for offline runs and for
+    exercising the loader. Every call waits ``latency`` seconds plus up to
+    ``jitter``; ``failures`` maps tickers to how many of their first calls
+    raise ConnectionError, and ``error_rate`` fails calls at random.
+    """
+
+    def __init__(self, frames, latency: float = 0.0, jitter: float = 0.0,
+                 failures=None, error_rate: float = 0.0, seed: int = 0):
+        self.frames = frames
+        self.latency = latency
+        self.jitter = jitter
+        self.failures = dict(failures or {})
+        self.error_rate = error_rate
+        self.calls = {}
+        self._rng = random.Random(seed)
+
+    async def fetch(self, ticker, start_date, end_date):
+        self.calls[ticker] = self.calls.get(ticker, 0) + 1
+        await asyncio.sleep(self.latency + self.jitter * self._rng.random())
+        if self.calls[ticker] <= self.failures.get(ticker, 0) or self._rng.random() < self.error_rate:
+            raise ConnectionError(f"Injected failure for {ticker}")
+
+        data = self.frames.get(ticker)
+        if data is None:
+            return pd.DataFrame()
+        # Half-open [start_date, end_date), like Yahoo Finance and PriceCache
+        index = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        keep = np.ones(len(data), dtype=bool)
+        if start_date is not None:
+            keep &= index >= pd.Timestamp(start_date)
+        if end_date is not None:
+            keep &= index < pd.Timestamp(end_date)
+        return data[keep]
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: ``rate`` requests per second on average with
+    bursts of up to ``capacity``. Meant for tasks on one event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class FetchReport:
+    """
+    Outcome of a bulk fetch: ``data`` maps tickers to cleaned frames,
+    ``errors`` maps the tickers that failed to their last error message and
+    ``attempts`` counts the requests made per ticker.
+    """
+
+    def __init__(self, tickers):
+        self.tickers = list(tickers)
+        self.data = {}
+        self.errors = {}
+        self.attempts = {}
+        self.elapsed = 0.0
+
+    @property
+    def failed(self):
+        return [ticker for ticker in self.tickers if ticker in self.errors]
+
+    def summary(self):
+        """One row per ticker with its status, attempts, rows and error."""
+        rows = []
+        for ticker in self.tickers:
+            rows.append({
+                'Ticker': ticker,
+                'Status': 'ok' if ticker in self.data else 'failed',
+                'Attempts': self.attempts.get(ticker, 0),
+                'Rows': len(self.data[ticker]) if ticker in self.data else 0,
+                'Error': self.errors.get(ticker),
+            })
+        return pd.DataFrame(rows)
+
+    def __repr__(self):
+        return f"FetchReport({len(self.data)} ok, {len(self.errors)} failed, {self.elapsed:.2f}s)"
+
+
+async def fetch_many_async(tickers, start_date, end_date, provider=None, max_concurrency=8,
+                           rate=None, burst=None, retries=3, backoff=0.5, max_backoff=30.0,
+                           timeout=None):
+    """
+    Fetch many tickers concurrently and return a FetchReport.
+
+    At most ``max_concurrency`` requests are in flight, and with ``rate``
+    set requests start at no more than ``rate`` per second (bursts of
+    ``burst``). Transient failures and timeouts are retried up to
+    ``retries`` times after exponential backoff (``backoff`` * 2**attempt
+    seconds, capped at ``max_backoff``, with jitter); the concurrency slot
+    is released while waiting. Frames are cleaned exactly like
+    fetch_data(); a ticker without data, or whose response lacks OHLCV
+    columns, fails without retries. One ticker failing never cancels the
+    others.
+    """
+    provider = provider if provider is not None else YFinanceProvider()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    bucket = TokenBucket(rate, burst) if rate else None
+    report = FetchReport(tickers)
+
+    async def fetch_one(ticker):
+        for attempt in range(retries + 1):
+            async with semaphore:
+                if bucket is not None:
+                    await bucket.acquire()
+                report.attempts[ticker] = attempt + 1
+                try:
+                    request = provider.fetch(ticker, start_date, end_date)
+                    data = clean_data(await asyncio.wait_for(request, timeout))
+                    if data.empty:
+                        raise ValueError(f"No data found for ticker {ticker}")
+                    report.data[ticker] = data
+                    report.errors.pop(ticker, None)
+                    return
+                except ValueError as e:
+                    report.errors[ticker] = str(e)
+                    return
+                except KeyError as e:
+                    # clean_data() found no OHLCV columns; asking again will not help
+                    report.errors[ticker] = f"Missing columns in response: {e}"
+                    return
+                except Exception as e:
+                    report.errors[ticker] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            if attempt < retries:
+                delay = min(max_backoff, backoff * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fetch_one(ticker) for ticker in tickers))
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def fetch_many(tickers, start_date, end_date, **kwargs):
+    """
+    Blocking wrapper around fetch_many_async() (takes the same keyword
+    arguments). Called from code that is already running an event loop
+    (e.g. a notebook), it runs the fetch on its own loop in a worker thread;
+    async code should await fetch_many_async() instead.
+    """
+    fetch = fetch_many_async(tickers, start_date, end_date, **kwargs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        report = asyncio.run(fetch)
+    else:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            report = pool.submit(asyncio.run, fetch).result()
+    logger.info("Fetched %d/%d tickers in %.2fs", len(report.data), len(report.tickers), report.elapsed)
+    for ticker in report.failed:
+        logger.warning("Error fetching %s: %s", ticker, report.errors[ticker])
+    return report
+
+
+class AsyncSource(DataSource):
+    """
+    DataSource backed by the concurrent loader, so the batch, portfolio and
+    walk-forward backtesters fetch a whole universe at once. The report of
+    the last load_many() call is kept in ``self.report``.
+    """
+
+    def __init__(self, provider=None, max_concurrency: int = 8, rate: float = None,
+                 burst: float = None, retries: int = 3, backoff: float = 0.5,
+                 timeout: float = None):
+        self.provider = provider
+        self.options = {'max_concurrency': max_concurrency, 'rate': rate, 'burst': burst,
+                        'retries': retries, 'backoff': backoff, 'timeout': timeout}
+        self.report = None
+
+    def load(self, ticker, start_date, end_date):
+        frames = self.load_many([ticker], start_date, end_date)
+        if ticker not in frames:
+            raise ValueError(self.report.errors.get(ticker, f"No data found for ticker {ticker}"))
+        return frames[ticker]
+
+    def load_many(self, tickers, start_date, end_date, errors=None):
+        self.report = fetch_many(tickers, start_date, end_date, provider=self.provider, **self.options)
+        if errors is not None:
+            errors.update(self.report.errors)
+        return self.report.data
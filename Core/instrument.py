@@ -0,0 +1,129 @@
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+class StageTimings:
+    """
+    Structured per-stage measurements of one run, in execution order.
+
+    Each record is a dict with Stage, Wall_s, CPU_s, Peak_Bytes (None
+    without memory tracing), Rows and Rows_per_s.
+    """
+
+    def __init__(self):
+        self._records = {}
+
+    def add(self, record):
+        self._records[record['Stage']] = record
+
+    def total(self):
+        """Summed wall-clock seconds of all stages."""
+        return sum(record['Wall_s'] for record in self._records.values())
+
+    def to_frame(self):
+        return pd.DataFrame(list(self._records.values()),
+                            columns=['Stage', 'Wall_s', 'CPU_s', 'Peak_Bytes', 'Rows', 'Rows_per_s'])
+
+    def __getitem__(self, stage):
+        return self._records[stage]
+
+    def __contains__(self, stage):
+        return stage in self._records
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def __len__(self):
+        return len(self._records)
+
+    def __repr__(self):
+        stages = ', '.join(f"{record['Stage']}={record['Wall_s']:.4f}s" for record in self)
+        return f"StageTimings({stages})"
+
+
+class Instrumentation:
+    """
+    Per-stage wall time, CPU time, throughput and, with ``trace_memory``,
+    tracemalloc peak.
+
+    Wrap each stage in ``with instrumentation.stage(name) as stage:`` and
+    set ``stage.rows`` to the number of rows it processed. Finished records
+    go to ``self.timings`` and to every hook, called as
+    ``hook(stage_name, record)``. When disabled, stage() hands back one
+    shared no-op object, so the only cost is a method call per stage.
+    Memory tracing is opt-in because tracemalloc slows every allocation,
+    and the wall and CPU times measured alongside it include that cost.
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False, hooks=None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.hooks = list(hooks or [])
+        self.timings = StageTimings()
+
+    def stage(self, name, rows=0):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def _finish(self, record):
+        self.timings.add(record)
+        for hook in self.hooks:
+            hook(record['Stage'], record)
+
+
+class _Stage:
+    def __init__(self, instrumentation, name, rows):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.rows = rows
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.instrumentation.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak = None
+        if self.instrumentation.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] - self._base
+            if self._started_tracing:
+                tracemalloc.stop()
+
+        if exc_type is None:
+            self.instrumentation._finish({
+                'Stage': self.name,
+                'Wall_s': wall,
+                'CPU_s': cpu,
+                'Peak_Bytes': peak,
+                'Rows': self.rows,
+                'Rows_per_s': self.rows / wall if wall > 0 else float('inf'),
+            })
+        return False
+
+
+class _NullStage:
+    rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
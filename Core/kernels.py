@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+MA_TYPES = ('sma', 'ema', 'wma', 'hma')
+
+
+def compensated_cumsum(values):
+    """
+    Cumulative sum with the rounding error of every step carried separately.
+
+    Returns (hi, lo) with a leading zero, so hi[k] + lo[k] is the sum of the
+    first k values to roughly twice float64 precision. The per-step errors
+    come from a vectorized TwoSum over np.cumsum's sequential partial sums,
+    which keeps window sums accurate over tens of millions of bars.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    n = len(values)
+    hi = np.empty(n + 1)
+    hi[0] = 0.0
+    np.cumsum(values, out=hi[1:])
+
+    # TwoSum: exact error of hi[k] = fl(hi[k-1] + values[k-1])
+    a, b, s = hi[:-1], values, hi[1:]
+    bb = s - a
+    err = (a - (s - bb)) + (b - bb)
+
+    lo = np.empty(n + 1)
+    lo[0] = 0.0
+    np.cumsum(err, out=lo[1:])
+    return hi, lo
+
+
+def window_sums(hi, lo, window):
+    """Trailing window sums from compensated_cumsum() output, length n - window + 1."""
+    return (hi[window:] - hi[:-window]) + (lo[window:] - lo[:-window])
+
+
+def sma(values, window, out=None):
+    """
+    Simple moving average; the first window - 1 bars are NaN.
+
+    Computed with pandas' rolling mean, the same algorithm as
+    generate_signals(), so batched sweeps see bit-identical averages and
+    the same exact ties on flat stretches as single runs.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    out = _output(out, len(values))
+    if window <= len(values):
+        out[:] = pd.Series(values).rolling(window).mean().to_numpy()
+    return out
+
+
+def ema(values, window, out=None):
+    """
+    Exponential moving average with span ``window`` (alpha = 2 / (window + 1)),
+    seeded with the first value and NaN for the first window - 1 bars
+    (counted from the first non-NaN value).
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    out = _output(out, len(values))
+    start = _first_valid(values) + window - 1
+    if start < len(values):
+        # pandas' ewm is a compiled single pass over the array
+        smoothed = pd.Series(values).ewm(span=window, adjust=False).mean().to_numpy()
+        out[start:] = smoothed[start:]
+    return out
+
+
+def wma(values, window, out=None, _cumsum=None):
+    """
+    Linearly weighted moving average (weights 1..window, newest heaviest).
+
+    Uses the O(N) recurrence numerator[t] = numerator[t-1] + window * x[t]
+    - sum(x[t-window:t]); its increments hover around zero, so their
+    compensated running sum stays accurate over long series.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    n = len(values)
+    out = _output(out, n)
+
+    start = _first_valid(values)
+    if n - start < window:
+        return out
+    x = values[start:]
+    hi, lo = _cumsum if _cumsum is not None and start == 0 else compensated_cumsum(x)
+
+    sums = window_sums(hi, lo, window)
+    increments = np.empty(len(x) - window + 1)
+    increments[0] = np.dot(np.arange(1, window + 1, dtype=np.float64), x[:window])
+    increments[1:] = window * x[window:] - sums[:-1]
+
+    num_hi, num_lo = compensated_cumsum(increments)
+    out[start + window - 1:] = (num_hi[1:] + num_lo[1:]) / (window * (window + 1) / 2)
+    return out
+
+
+def hma(values, window, out=None):
+    """Hull moving average: WMA(2 * WMA(x, w/2) - WMA(x, w), sqrt(w))."""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    out = _output(out, len(values))
+    half = max(window // 2, 1)
+    root = max(int(np.sqrt(window)), 1)
+    raw = 2 * wma(values, half) - wma(values, window)
+    return wma(raw, root, out=out)
+
+
+_KERNELS = {'sma': sma, 'ema': ema, 'wma': wma, 'hma': hma}
+
+
+def moving_average(values, window, ma_type='sma', out=None):
+    """Dispatch to one of the MA kernels by name."""
+    if ma_type not in _KERNELS:
+        raise ValueError(f"Unknown ma_type '{ma_type}', expected one of {MA_TYPES}")
+    return _KERNELS[ma_type](values, window, out=out)
+
+
+def moving_averages(values, windows, ma_type='sma', out=None):
+    """
+    Compute one MA per window into a (len(windows), len(values)) array.
+
+    ``out`` may be a preallocated float64 array of that shape. WMAs share a
+    single compensated cumulative sum across all windows.
+    """
+    if ma_type not in _KERNELS:
+        raise ValueError(f"Unknown ma_type '{ma_type}', expected one of {MA_TYPES}")
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if out is None:
+        out = np.empty((len(windows), len(values)))
+    elif out.shape != (len(windows), len(values)):
+        raise ValueError(f"out has shape {out.shape}, expected {(len(windows), len(values))}")
+
+    shared = compensated_cumsum(values) if ma_type == 'wma' else None
+    for row, window in enumerate(windows):
+        if ma_type == 'wma':
+            wma(values, window, out=out[row], _cumsum=shared)
+        else:
+            _KERNELS[ma_type](values, window, out=out[row])
+    return out
+
+
+def _output(out, n):
+    if out is None:
+        out = np.empty(n)
+    out[:] = np.nan
+    return out
+
+
+def _first_valid(values):
+    valid = np.flatnonzero(~np.isnan(values))
+    return valid[0] if len(valid) else len(values)
@@ -0,0 +1,245 @@
+import numpy as np
+import pandas as pd
+
+TRADE_DTYPE = np.dtype([
+    ('run', np.int32),      # backtest the trade belongs to
+    ('bar', np.int64),      # bar index within that run, -1 when unknown
+    ('date', 'M8[ns]'),     # UTC timestamp
+    ('side', np.int8),      # 1 = BUY, -1 = SELL
+    ('price', np.float64),
+    ('shares', np.float64),
+    ('value', np.float64),
+    ('fee', np.float64),     # commission paid on the trade
+    ('reason', np.int8),     # why the trade happened, see EXIT_REASONS
+])
+
+SIDE_NAMES = {1: 'BUY', -1: 'SELL'}
+SIDE_CODES = {'BUY': 1, 'SELL': -1}
+# Entries are always signal trades; exits may also come from a stop
+EXIT_REASONS = {0: 'Signal', 1: 'Stop Loss', 2: 'Take Profit', 3: 'Trailing Stop'}
+
+
+class TradeLedger:
+    """
+    Columnar trade log backed by a preallocated NumPy structured array.
+
+    Appends write into spare capacity and the buffer doubles when full, so
+    recording n trades costs amortized O(1) each. Ledgers from many
+    backtests can be concatenated (each keeps its ``run`` id) and analysed
+    with vectorized round-trip pairing, P&L and holding-period statistics.
+
+    Indexing or iterating yields the same dicts run_strategy() used to
+    return ({'Date', 'Type', 'Price', 'Shares', 'Value'}), so existing
+    consumers keep working.
+    """
+
+    def __init__(self, capacity: int = 16, tz=None):
+        self._data = np.zeros(max(capacity, 1), dtype=TRADE_DTYPE)
+        self._size = 0
+        self.tz = tz
+
+    @classmethod
+    def from_arrays(cls, dates, sides, prices, shares, bars=None, fees=None, reasons=None, run=0):
+        """Build a ledger from parallel arrays in one copy."""
+        dates = pd.DatetimeIndex(dates)
+        ledger = cls(capacity=len(dates), tz=dates.tz)
+        ledger.extend(dates, sides, prices, shares, bars=bars, fees=fees, reasons=reasons, run=run)
+        return ledger
+
+    @classmethod
+    def from_trades(cls, trades, run=0):
+        """Build a ledger from a list of run_strategy()-style trade dicts."""
+        if isinstance(trades, TradeLedger):
+            return trades
+        return cls.from_arrays([trade['Date'] for trade in trades],
+                               [SIDE_CODES[trade['Type']] for trade in trades],
+                               [trade['Price'] for trade in trades],
+                               [trade['Shares'] for trade in trades], run=run)
+
+    @classmethod
+    def concat(cls, ledgers, runs=None):
+        """
+        Concatenate ledgers into one. With ``runs`` every ledger's trades are
+        relabelled with the matching run id; otherwise ids are kept.
+        """
+        ledgers = list(ledgers)
+        total = sum(len(ledger) for ledger in ledgers)
+        tz = next((ledger.tz for ledger in ledgers if ledger.tz is not None), None)
+        out = cls(capacity=total, tz=tz)
+        for i, ledger in enumerate(ledgers):
+            block = ledger.records
+            out._data[out._size:out._size + len(block)] = block
+            if runs is not None:
+                out._data['run'][out._size:out._size + len(block)] = runs[i]
+            out._size += len(block)
+        return out
+
+    def append(self, date, side, price, shares, bar=-1, fee=0.0, reason=0, run=0):
+        """Record one trade; ``side`` is 'BUY'/'SELL' or 1/-1."""
+        self._reserve(self._size + 1)
+        timestamp = pd.Timestamp(date)
+        if timestamp.tz is not None and self.tz is None and self._size == 0:
+            self.tz = timestamp.tz
+        self._data[self._size] = (run, bar, np.datetime64(timestamp.as_unit('ns').value, 'ns'),
+                                  SIDE_CODES.get(side, side), price, shares, shares * price, fee, reason)
+        self._size += 1
+
+    def extend(self, dates, sides, prices, shares, bars=None, fees=None, reasons=None, run=0):
+        """Record many trades from parallel arrays."""
+        n = len(prices)
+        self._reserve(self._size + n)
+        block = self._data[self._size:self._size + n]
+        prices = np.asarray(prices, dtype=np.float64)
+        shares = np.asarray(shares, dtype=np.float64)
+        block['run'] = run
+        block['bar'] = -1 if bars is None else bars
+        block['date'] = _to_utc(pd.DatetimeIndex(dates), self)
+        block['side'] = [SIDE_CODES.get(side, side) for side in sides] if n and isinstance(sides[0], str) else sides
+        block['price'] = prices
+        block['shares'] = shares
+        block['value'] = shares * prices
+        block['fee'] = 0.0 if fees is None else fees
+        block['reason'] = 0 if reasons is None else reasons
+        self._size += n
+
+    @property
+    def records(self):
+        """Structured-array view of the recorded trades."""
+        return self._data[:self._size]
+
+    def round_trips(self):
+        """
+        Pair every BUY with the SELL that follows it in the same run.
+
+        Returns a DataFrame with one row per completed round trip: run,
+        entry/exit dates and prices, shares, P&L net of fees, return,
+        holding period (as a Timedelta and, when known, in bars) and why the
+        position was closed.
+        """
+        records = self.records
+        entry = np.flatnonzero((records['side'][:-1] == 1) & (records['side'][1:] == -1)
+                               & (records['run'][:-1] == records['run'][1:]))
+        buys, sells = records[entry], records[entry + 1]
+
+        cost = buys['value'] + buys['fee']
+        pnl = sells['value'] - sells['fee'] - cost
+        return pd.DataFrame({
+            'Run': buys['run'],
+            'Entry_Date': self._dates(buys['date']),
+            'Exit_Date': self._dates(sells['date']),
+            'Entry_Price': buys['price'],
+            'Exit_Price': sells['price'],
+            'Shares': buys['shares'],
+            'PnL': pnl,
+            'Return': pnl / cost,
+            'Holding_Period': sells['date'] - buys['date'],
+            'Holding_Bars': np.where((buys['bar'] >= 0) & (sells['bar'] >= 0), sells['bar'] - buys['bar'], -1),
+            'Exit_Reason': _reason_names(sells['reason']),
+        })
+
+    def win_counts(self):
+        """(completed round trips, profitable round trips)."""
+        records = self.records
+        entry = np.flatnonzero((records['side'][:-1] == 1) & (records['side'][1:] == -1)
+                               & (records['run'][:-1] == records['run'][1:]))
+        pnl = (records['value'][entry + 1] - records['fee'][entry + 1]) - (records['value'][entry] + records['fee'][entry])
+        return len(entry), int(np.count_nonzero(pnl > 0))
+
+    def stats(self, by_run: bool = False):
+        """
+        Round-trip P&L and holding-period statistics, overall or per run.
+        """
+        trips = self.round_trips()
+        trips['Holding_Days'] = trips['Holding_Period'].dt.total_seconds() / 86400
+        trips['Win'] = trips['PnL'] > 0
+
+        aggregations = {
+            'Round_Trips': ('PnL', 'size'),
+            'Win_Rate': ('Win', 'mean'),
+            'Total_PnL': ('PnL', 'sum'),
+            'Average_PnL': ('PnL', 'mean'),
+            'Average_Return': ('Return', 'mean'),
+            'Average_Holding_Days': ('Holding_Days', 'mean'),
+            'Max_Holding_Days': ('Holding_Days', 'max'),
+        }
+        if by_run:
+            return trips.groupby('Run').agg(**aggregations)
+        return pd.Series({name: trips[column].agg(func) for name, (column, func) in aggregations.items()})
+
+    def to_frame(self):
+        """Trades as a DataFrame with the trade dict columns plus Run, Bar, Fee and Reason."""
+        records = self.records
+        return pd.DataFrame({
+            'Run': records['run'],
+            'Bar': records['bar'],
+            'Date': self._dates(records['date']),
+            'Type': np.where(records['side'] == 1, 'BUY', 'SELL'),
+            'Price': records['price'],
+            'Shares': records['shares'],
+            'Value': records['value'],
+            'Fee': records['fee'],
+            'Reason': _reason_names(records['reason']),
+        })
+
+    def to_csv(self, path):
+        self.to_frame().to_csv(path, index=False)
+
+    def to_parquet(self, path):
+        self.to_frame().to_parquet(path, index=False)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._size))]
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError('trade index out of range')
+        row = self._data[i]
+        return {
+            'Date': self._dates(np.array([row['date']]))[0],
+            'Type': SIDE_NAMES[int(row['side'])],
+            'Price': row['price'],
+            'Shares': row['shares'],
+            'Value': row['value']
+        }
+
+    def __iter__(self):
+        return (self[i] for i in range(self._size))
+
+    def __eq__(self, other):
+        if isinstance(other, TradeLedger):
+            return np.array_equal(self.records, other.records)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    # Ledgers are mutable and compare by value, so they cannot be hashed
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TradeLedger({self._size} trades)"
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            grown = np.zeros(max(size, 2 * len(self._data)), dtype=TRADE_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def _dates(self, values):
+        index = pd.DatetimeIndex(values)
+        return index.tz_localize('UTC').tz_convert(self.tz) if self.tz is not None else index
+
+
+def _reason_names(codes):
+    return np.array([EXIT_REASONS[code] for code in codes.tolist()], dtype=object)
+
+
+def _to_utc(index, ledger):
+    if index.tz is None:
+        return index.as_unit('ns').values
+    if ledger.tz is None and ledger._size == 0:
+        ledger.tz = index.tz
+    return index.tz_convert('UTC').tz_localize(None).as_unit('ns').values
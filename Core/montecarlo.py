@@ -0,0 +1,211 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .sources import YFinanceSource
+from .signals import signal_matrix
+from .strategy import simulate_batch
+from .performance import TRADING_DAYS, compute_metrics, infer_periods_per_year
+from .backtester import evaluate_pairs
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('bootstrap', 'gbm')
+
+# Per-path distributions reported by MonteCarloSimulator
+PATH_METRICS = ['Total Return', 'Annualized Return', 'Volatility', 'Sharpe Ratio', 'Sortino Ratio',
+                'Calmar Ratio', 'Max Drawdown', 'Max Drawdown Duration', 'Total Trades', 'Win Rate',
+                'Final Portfolio Value', 'Buy & Hold Return']
+
+
+def log_returns(close):
+    """Bar-to-bar log returns of a price series (one fewer than prices)."""
+    close = np.asarray(close, dtype=np.float64)
+    return np.diff(np.log(close))
+
+
+def bootstrap_paths(returns, n_paths, n_bars, start_price, block_size=20, rng=None):
+    """
+    (n_paths, n_bars) price paths built from a moving-block bootstrap of
+    historical log returns. Blocks of ``block_size`` consecutive returns
+    are drawn with replacement and laid end to end, which keeps short-range
+    autocorrelation and volatility clustering inside each block.
+    """
+    rng = np.random.default_rng(rng)
+    returns = np.asarray(returns, dtype=np.float64)
+    block_size = min(block_size, len(returns))
+    n_blocks = -(-(n_bars - 1) // block_size)
+    starts = rng.integers(0, len(returns) - block_size + 1, size=(n_paths, n_blocks))
+    index = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :n_bars - 1]
+    return _prices(returns[index], start_price)
+
+
+def gbm_paths(returns, n_paths, n_bars, start_price, rng=None):
+    """
+    (n_paths, n_bars) geometric Brownian motion price paths whose per-bar
+    log drift and volatility are estimated from historical log returns.
+    """
+    rng = np.random.default_rng(rng)
+    returns = np.asarray(returns, dtype=np.float64)
+    drift, volatility = returns.mean(), returns.std(ddof=1)
+    steps = rng.standard_normal((n_paths, n_bars - 1))
+    steps *= volatility
+    steps += drift
+    return _prices(steps, start_price)
+
+
+def simulate_paths(paths, short_window, long_window, initial_capital, ma_type="sma",
+                   periods_per_year=TRADING_DAYS):
+    """
+    Run the crossover strategy over every row of a (n_paths, n_bars) price
+    matrix in one batched pass and return per-path metrics as a DataFrame.
+    """
+    paths = np.asarray(paths, dtype=np.float64)
+    signals = signal_matrix(paths.T, short_window, long_window, ma_type=ma_type).T
+    sim = simulate_batch(paths, signals, initial_capital)
+    del signals
+    metrics = compute_metrics(sim['Total'], initial_capital, returns=sim['Strategy_Returns'],
+                              round_trips=sim['Round_Trips'], winning_trades=sim['Winning_Trades'],
+                              periods_per_year=periods_per_year)
+    metrics['Buy & Hold Return'] = paths[:, -1] / paths[:, 0] - 1
+    return pd.DataFrame({name: metrics[name] for name in PATH_METRICS})
+
+
+def distribution_summary(results, confidence=0.95, historical=None):
+    """
+    Mean, spread and percentile confidence interval of every metric column.
+
+    With ``historical`` (metric -> value of the actual history), also
+    reports where the real run falls within the simulated distribution.
+    """
+    tail = (1 - confidence) / 2
+    summary = pd.DataFrame({
+        'Mean': results.mean(),
+        'Std': results.std(),
+        'Median': results.median(),
+        'CI_Lower': results.quantile(tail),
+        'CI_Upper': results.quantile(1 - tail),
+        'Prob_Positive': (results > 0).mean(),
+    })
+    if historical is not None:
+        summary['Historical'] = pd.Series(historical)
+        summary['Percentile'] = [(results[metric] <= historical[metric]).mean() if metric in historical
+                                 else np.nan for metric in summary.index]
+    summary.index.name = 'Metric'
+    return summary
+
+
+class MonteCarloSimulator:
+    """
+    Robustness check of one crossover configuration on resampled histories.
+
+    ``n_paths`` synthetic price paths are generated from the ticker's log
+    returns, by block bootstrap (``method='bootstrap'``) or by a fitted
+    geometric Brownian motion (``method='gbm'``), and the strategy is run
+    over all of them as one 2-D array computation per batch of
+    ``batch_size`` paths. Batches run on a process pool when ``max_workers``
+    is not 1. Every batch draws from its own child of ``seed``, so results
+    are reproducible and do not depend on the number of workers.
+    """
+
+    def __init__(self, ticker: str, start_date: str = None, end_date: str = None,
+                 short_window: int = 20, long_window: int = 50,
+                 initial_capital: float = 100000, n_paths: int = 1000, n_bars: int = None,
+                 method: str = 'bootstrap', block_size: int = 20, seed: int = None,
+                 confidence: float = 0.95, batch_size: int = 1000, max_workers: int = 1,
+                 cache=None, source=None, ma_type: str = "sma"):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+        self.ticker = ticker.upper()
+        self.start_date = start_date
+        self.end_date = end_date
+        self.short_window = short_window
+        self.long_window = long_window
+        self.initial_capital = initial_capital
+        self.n_paths = n_paths
+        self.n_bars = n_bars
+        self.method = method
+        self.block_size = block_size
+        self.seed = seed
+        self.confidence = confidence
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.ma_type = ma_type
+        self.source = source if source is not None else YFinanceSource(cache=cache)
+
+        self.results = None
+        self.summary = None
+        self.historical = {}
+
+    def run(self, data=None):
+        """
+        Simulate every path and return the per-path metrics DataFrame.
+
+        The distribution summary with confidence intervals is stored in
+        ``self.summary``, together with the metrics and percentile of the
+        last ``n_bars`` bars of actual history when there are that many.
+        """
+        if data is None:
+            data = self.source.load(self.ticker, self.start_date, self.end_date)
+        close = data['Close'].to_numpy(dtype=np.float64)
+        returns = log_returns(close)
+        periods_per_year = infer_periods_per_year(data.index)
+        n_bars = self.n_bars or len(close)
+        if len(returns) < 2 or n_bars < 2:
+            raise ValueError(f"Need at least 3 bars of history, got {len(close)}")
+
+        sizes = [min(self.batch_size, self.n_paths - start) for start in range(0, self.n_paths, self.batch_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        jobs = [(self.method, returns, close[0], size, n_bars, self.block_size, seed, self.short_window,
+                 self.long_window, self.initial_capital, self.ma_type, periods_per_year)
+                for size, seed in zip(sizes, seeds)]
+
+        logger.info("Monte Carlo %s: %d %s paths x %d bars", self.ticker, self.n_paths, self.method, n_bars)
+        if self.max_workers == 1 or len(jobs) == 1:
+            frames = [_run_batch(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                frames = list(pool.map(_run_batch, *zip(*jobs)))
+        self.results = pd.concat(frames, ignore_index=True)
+
+        # Rank the actual history over the same horizon as the paths
+        self.historical = {}
+        if n_bars <= len(close):
+            recent = close[-n_bars:]
+            actual = evaluate_pairs(recent, [(self.short_window, self.long_window)], self.initial_capital,
+                                    ma_type=self.ma_type, periods_per_year=periods_per_year)
+            self.historical = {metric: actual[metric].iloc[0] for metric in PATH_METRICS if metric in actual}
+            self.historical['Buy & Hold Return'] = recent[-1] / recent[0] - 1
+        self.summary = distribution_summary(self.results, self.confidence, self.historical or None)
+
+        logger.info("%.0f%% intervals over %d paths:", self.confidence * 100, self.n_paths)
+        for metric in ('Total Return', 'Sharpe Ratio', 'Max Drawdown'):
+            row = self.summary.loc[metric]
+            line = f"{metric:<15}: median {row['Median']:.4f}  [{row['CI_Lower']:.4f}, {row['CI_Upper']:.4f}]"
+            if self.historical:
+                line += f"  historical {row['Historical']:.4f} (pct {row['Percentile']:.0%})"
+            logger.info(line)
+        return self.results
+
+
+def _run_batch(method, returns, start_price, n_paths, n_bars, block_size, seed, short_window,
+               long_window, initial_capital, ma_type, periods_per_year):
+    """Worker: generate one batch of paths and simulate them."""
+    rng = np.random.default_rng(seed)
+    if method == 'gbm':
+        paths = gbm_paths(returns, n_paths, n_bars, start_price, rng)
+    else:
+        paths = bootstrap_paths(returns, n_paths, n_bars, start_price, block_size, rng)
+    return simulate_paths(paths, short_window, long_window, initial_capital, ma_type, periods_per_year)
+
+
+def _prices(log_steps, start_price):
+    # Compound log returns onto the starting price, in place
+    prices = np.empty((log_steps.shape[0], log_steps.shape[1] + 1))
+    prices[:, 0] = 0.0
+    np.cumsum(log_steps, axis=1, out=prices[:, 1:])
+    np.exp(prices, out=prices)
+    prices *= start_price
+    return prices
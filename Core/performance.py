@@ -1,60 +1,303 @@
 import numpy as np
+import pandas as pd
 
+from .kernels import compensated_cumsum, window_sums
+from .ledger import TradeLedger
 
-def calculate_performance(portfolio, trades, initial_capital):
-    
-    # Basic performance
-    total_return = (portfolio['Total'].iloc[-1] - initial_capital) / initial_capital
-    
-    # Annualized returns
-    days = len(portfolio)
-    years = days / 252  # Approximate trading days per year
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.02
+# infer_periods_per_year() only looks at this many leading bars
+INFER_BARS = 100_000
+
+# Display format of each metric; compute_metrics() keys follow this order
+METRIC_FORMATS = {
+    'Total Return': '{:.2%}',
+    'Annualized Return': '{:.2%}',
+    'Volatility': '{:.2%}',
+    'Sharpe Ratio': '{:.2f}',
+    'Sortino Ratio': '{:.2f}',
+    'Calmar Ratio': '{:.2f}',
+    'Max Drawdown': '{:.2%}',
+    'Max Drawdown Duration': '{:.0f} bars',
+    'Buy & Hold Return': '{:.2%}',
+    'Buy & Hold Annualized': '{:.2%}',
+    'Total Trades': '{:d}',
+    'Win Rate': '{:.2%}',
+    'Final Portfolio Value': '${:,.2f}',
+}
+
+
+def calculate_performance(portfolio, trades, initial_capital, periods_per_year=None):
+    """Formatted performance summary of a single run_strategy() result."""
+    return format_metrics(portfolio_metrics(portfolio, trades, initial_capital, periods_per_year))
+
+
+def portfolio_metrics(portfolio, trades, initial_capital, periods_per_year=None):
+    """
+    Numeric compute_metrics() of a single run_strategy() result, annualized
+    by ``periods_per_year`` or else by the bar frequency of its index.
+    """
+    if periods_per_year is None:
+        periods_per_year = infer_periods_per_year(portfolio.index)
+    round_trips, winning_trades = trade_stats(trades)
+    return compute_metrics(portfolio['Total'].to_numpy(dtype=np.float64), initial_capital,
+                           price=portfolio['Price'].to_numpy(dtype=np.float64),
+                           returns=portfolio['Strategy_Returns'].to_numpy(dtype=np.float64),
+                           round_trips=round_trips, winning_trades=winning_trades,
+                           periods_per_year=periods_per_year)
+
+
+def infer_periods_per_year(index, trading_days=TRADING_DAYS):
+    """
+    Bars per year implied by the spacing of a DatetimeIndex.
+
+    Intraday bars give the typical number of bars per session times
+    ``trading_days`` (78 five-minute bars a day -> 19,656), daily bars give
+    ``trading_days`` and coarser bars the number of such periods in a
+    calendar year (weekly -> 52, monthly -> 12). Only the first INFER_BARS
+    bars are inspected; anything that is not a DatetimeIndex with at least two
+    bars falls back to ``trading_days``.
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return trading_days
+    index = index[:INFER_BARS]
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    stamps = index.as_unit('ns').asi8
+    day = 86_400 * 10**9
+    spacing = np.median(np.diff(stamps)) / day
+
+    if spacing < 0.5:
+        _, bars_per_day = np.unique(stamps // day, return_counts=True)
+        return int(round(np.median(bars_per_day))) * trading_days
+    if spacing < 2:
+        return trading_days
+    return max(1, int(round(365.25 / spacing)))
+
+
+def trade_stats(trades):
+    """
+    Count completed BUY -> SELL round trips and how many of them made money.
+
+    Trades are paired positionally (0-1, 2-3, ...), as run_strategy() emits
+    them. A TradeLedger is counted directly from its columns.
+    """
+    if isinstance(trades, TradeLedger):
+        return trades.win_counts()
+    n_pairs = len(trades) // 2
+    if n_pairs == 0:
+        return 0, 0
+    types = np.array([trade['Type'] for trade in trades[:2 * n_pairs]])
+    values = np.array([trade['Value'] for trade in trades[:2 * n_pairs]], dtype=np.float64)
+
+    paired = (types[0::2] == 'BUY') & (types[1::2] == 'SELL')
+    profits = values[1::2][paired] - values[0::2][paired]
+    return int(paired.sum()), int(np.count_nonzero(profits > 0))
+
+
+def compute_metrics(equity, initial_capital, price=None, returns=None, round_trips=0,
+                    winning_trades=0, periods_per_year=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE):
+    """
+    Numeric performance metrics of one or many equity curves.
+
+    ``equity`` is a 1-D curve or a (n_strategies, n_bars) matrix; every
+    statistic is computed along the bar axis in one vectorized pass, and
+    the result maps the METRIC_FORMATS keys to floats (1-D input) or
+    per-strategy arrays (2-D input). ``returns`` defaults to the bar-to-bar
+    change of ``equity``; ``price`` enables the buy & hold figures.
+    Use format_metrics() to turn the result into display strings.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    single = equity.ndim == 1
+    equity = np.atleast_2d(equity)
+    n_rows, n = equity.shape
+
+    if returns is None:
+        returns = bar_returns(equity)
+    returns = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+
+    total_return = (equity[:, -1] - initial_capital) / initial_capital
+
+    years = n / periods_per_year
     annualized_return = (1 + total_return) ** (1/years) - 1
-    
-    # Volatility
-    daily_returns = portfolio['Strategy_Returns'].dropna()
-    volatility = daily_returns.std() * np.sqrt(252)  # Annualized
-    
-    # Sharpe ratio (assuming 2% risk-free rate)
-    risk_free_rate = 0.02
-    sharpe_ratio = (annualized_return - risk_free_rate) / volatility if volatility > 0 else 0
-    
-    # Maximum drawdown
-    cumulative = (1 + daily_returns).cumprod()
-    running_max = cumulative.expanding().max()
-    drawdown = (cumulative - running_max) / running_max
-    max_drawdown = drawdown.min()
-    
-    # Buy and hold comparison
-    buy_hold_return = (portfolio['Price'].iloc[-1] - portfolio['Price'].iloc[0]) / portfolio['Price'].iloc[0]
-    buy_hold_annualized = (1 + buy_hold_return) ** (1/years) - 1
-    
-    # Win rate
-    if len(trades) >= 2:
-        trade_pairs = []
-        for i in range(0, len(trades)-1, 2):
-            if i+1 < len(trades) and trades[i]['Type'] == 'BUY' and trades[i+1]['Type'] == 'SELL':
-                profit = trades[i+1]['Value'] - trades[i]['Value']
-                trade_pairs.append(profit)
-        
-        winning_trades = len([p for p in trade_pairs if p > 0])
-        total_trades = len(trade_pairs)
-        win_rate = winning_trades / total_trades if total_trades > 0 else 0
+
+    volatility = _nanstd(returns) * np.sqrt(periods_per_year)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = np.where(volatility > 0, (annualized_return - risk_free_rate) / volatility, 0.0)
+
+        losses = np.minimum(returns, 0.0)
+        losses *= losses
+        downside = np.sqrt(np.nanmean(losses, axis=1)) * np.sqrt(periods_per_year)
+        del losses
+        sortino_ratio = np.where(downside > 0, (annualized_return - risk_free_rate) / downside, 0.0)
+
+    drawdown = drawdowns(returns)
+    max_drawdown = np.nanmin(drawdown, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        calmar_ratio = np.where(max_drawdown < 0, annualized_return / -max_drawdown, 0.0)
+
+    if price is not None:
+        price = np.asarray(price, dtype=np.float64)
+        buy_hold_return = (price[-1] - price[0]) / price[0]
+        buy_hold_annualized = (1 + buy_hold_return) ** (1/years) - 1
     else:
-        win_rate = 0
-        total_trades = 0
-    
+        buy_hold_return = buy_hold_annualized = np.nan
+
+    round_trips = np.broadcast_to(np.asarray(round_trips, dtype=np.int64), (n_rows,))
+    winning_trades = np.broadcast_to(np.asarray(winning_trades, dtype=np.int64), (n_rows,))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        win_rate = np.where(round_trips > 0, winning_trades / round_trips, 0.0)
+
     metrics = {
-        'Total Return': f"{total_return:.2%}",
-        'Annualized Return': f"{annualized_return:.2%}",
-        'Volatility': f"{volatility:.2%}",
-        'Sharpe Ratio': f"{sharpe_ratio:.2f}",
-        'Max Drawdown': f"{max_drawdown:.2%}",
-        'Buy & Hold Return': f"{buy_hold_return:.2%}",
-        'Buy & Hold Annualized': f"{buy_hold_annualized:.2%}",
-        'Total Trades': total_trades,
-        'Win Rate': f"{win_rate:.2%}",
-        'Final Portfolio Value': f"${portfolio['Total'].iloc[-1]:,.2f}"
+        'Total Return': total_return,
+        'Annualized Return': annualized_return,
+        'Volatility': volatility,
+        'Sharpe Ratio': sharpe_ratio,
+        'Sortino Ratio': sortino_ratio,
+        'Calmar Ratio': calmar_ratio,
+        'Max Drawdown': max_drawdown,
+        'Max Drawdown Duration': max_drawdown_duration(equity),
+        'Buy & Hold Return': np.full(n_rows, buy_hold_return),
+        'Buy & Hold Annualized': np.full(n_rows, buy_hold_annualized),
+        'Total Trades': round_trips.copy(),
+        'Win Rate': win_rate,
+        'Final Portfolio Value': equity[:, -1].copy(),
     }
-    
-    return metrics
\ No newline at end of file
+    if single:
+        metrics = {key: value[0].item() for key, value in metrics.items()}
+    return metrics
+
+
+def format_metrics(metrics):
+    """Display strings for a single-strategy compute_metrics() result."""
+    formatted = {}
+    for key, value in metrics.items():
+        if key == 'Total Trades':
+            # Kept numeric, as calculate_performance() always returned it
+            formatted[key] = int(value)
+        elif key in METRIC_FORMATS:
+            formatted[key] = METRIC_FORMATS[key].format(value)
+        else:
+            formatted[key] = value
+    return formatted
+
+
+def bar_returns(equity):
+    """Bar-to-bar returns along the last axis, 0 on the first bar."""
+    equity = np.asarray(equity, dtype=np.float64)
+    returns = np.zeros_like(equity)
+    returns[..., 1:] = (equity[..., 1:] - equity[..., :-1]) / equity[..., :-1]
+    return returns
+
+
+def drawdowns(returns):
+    """Drawdown from the running peak of the compounded returns, along the last axis."""
+    # Same arithmetic as (cumulative - peak) / peak, done in place
+    cumulative = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+    cumulative += 1
+    np.cumprod(cumulative, axis=-1, out=cumulative)
+    running_max = np.maximum.accumulate(cumulative, axis=-1)
+    cumulative -= running_max
+    cumulative /= running_max
+    return cumulative
+
+
+def max_drawdown_duration(equity):
+    """Longest number of bars spent below a previous equity peak, per curve."""
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    bars = np.arange(equity.shape[1])
+    at_peak = equity >= np.maximum.accumulate(equity, axis=1)
+    last_peak = np.where(at_peak, bars, 0)
+    del at_peak
+    np.maximum.accumulate(last_peak, axis=1, out=last_peak)
+    np.subtract(bars, last_peak, out=last_peak)
+    return last_peak.max(axis=1)
+
+
+def rolling_metrics(returns, window, periods_per_year=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE):
+    """
+    Rolling annualized volatility, Sharpe ratio and drawdown over ``window`` bars.
+
+    ``returns`` is 1-D or (n_strategies, n_bars); each output has the same
+    shape, NaN until the window fills. The drawdown is measured against the
+    highest compounded value within the window.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    single = returns.ndim == 1
+    returns = np.atleast_2d(returns)
+    n_rows, n = returns.shape
+
+    volatility = np.full((n_rows, n), np.nan)
+    sharpe = np.full((n_rows, n), np.nan)
+    drawdown = np.full((n_rows, n), np.nan)
+    if window <= n:
+        # Compensated cumulative sums keep long windows of tiny returns accurate
+        sums = np.empty((n_rows, n - window + 1))
+        squares = np.empty((n_rows, n - window + 1))
+        for row in range(n_rows):
+            sums[row] = window_sums(*compensated_cumsum(returns[row]), window)
+            squares[row] = window_sums(*compensated_cumsum(returns[row] ** 2), window)
+        mean = sums / window
+        var = (squares - sums * mean) / max(window - 1, 1)
+        std = np.sqrt(np.maximum(var, 0.0))
+
+        volatility[:, window - 1:] = std * np.sqrt(periods_per_year)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            excess = mean * periods_per_year - risk_free_rate
+            sharpe[:, window - 1:] = np.where(std > 0, excess / volatility[:, window - 1:], 0.0)
+
+        cumulative = np.cumprod(1 + returns, axis=1)
+        peak = pd.DataFrame(cumulative.T).rolling(window).max().to_numpy().T
+        drawdown = (cumulative - peak) / peak
+
+    result = {'Rolling Volatility': volatility, 'Rolling Sharpe': sharpe, 'Rolling Drawdown': drawdown}
+    if single:
+        result = {key: value[0] for key, value in result.items()}
+    return result
+
+
+def period_breakdown(equity, freq='Y', periods_per_year=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE):
+    """
+    Per-year ('Y') or per-month ('M') performance of a date-indexed equity Series.
+
+    Each period's return is measured from the previous period's closing
+    value (the first period from its own first bar). Returns one row per
+    period with Return, Volatility, Sharpe Ratio, Max Drawdown and Bars.
+    """
+    index = equity.index
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_localize(None)
+    values = equity.to_numpy(dtype=np.float64)
+    periods = index.to_period({'Y': 'Y', 'M': 'M'}[freq])
+    returns = bar_returns(values)
+
+    codes, labels = pd.factorize(periods)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(values)]
+
+    rows = []
+    for label, start, end in zip(labels, starts, ends):
+        base = values[start - 1] if start > 0 else values[start]
+        period_returns = returns[start:end] if start > 0 else returns[start + 1:end]
+        volatility = period_returns.std(ddof=1) * np.sqrt(periods_per_year) if len(period_returns) > 1 else np.nan
+        mean = period_returns.mean() * periods_per_year if len(period_returns) else np.nan
+        rows.append({
+            'Period': str(label),
+            'Return': values[end - 1] / base - 1,
+            'Volatility': volatility,
+            'Sharpe Ratio': (mean - risk_free_rate) / volatility if volatility and volatility > 0 else 0.0,
+            'Max Drawdown': drawdowns(period_returns).min() if len(period_returns) else 0.0,
+            'Bars': end - start,
+        })
+    return pd.DataFrame(rows).set_index('Period')
+
+
+def _nanstd(returns):
+    # Sample standard deviation per row, ignoring NaN like Series.std()
+    counts = np.sum(~np.isnan(returns), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nansum(returns, axis=1) / counts
+        deviations = returns - mean[:, None]
+        deviations *= deviations
+        return np.sqrt(np.nansum(deviations, axis=1) / (counts - 1))
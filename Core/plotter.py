@@ -1,73 +1,314 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+
+import matplotlib
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def use_headless():
+    """Switch matplotlib to the non-interactive Agg backend (no windows, no blocking)."""
+    matplotlib.use('Agg')
+
 
-def plot_results(signals, portfolio, ticker, metrics, short_window, long_window, initial_capital, save_path=None):
+def plot_results(signals, portfolio, ticker, metrics, short_window, long_window, initial_capital,
+                 save_path=None, show=True, dpi=300, max_points=None):
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
     fig.suptitle(f'{ticker} Moving Average Crossover Strategy Backtest', fontsize=16, fontweight='bold')
-    
+
+    def line(ax, x, y, **kwargs):
+        idx = downsample_indices(np.asarray(y, dtype=np.float64), max_points)
+        if idx is not None:
+            x, y = x[idx], np.asarray(y)[idx]
+        ax.plot(x, y, **kwargs)
+
     # Plot 1: Price and Moving Averages with Signals
-    ax1.plot(signals.index, signals['Close'], label='Close Price', linewidth=1, alpha=0.8)
-    ax1.plot(signals.index, signals[f'MA_{short_window}'], 
-            label=f'{short_window}-day MA', linewidth=1.5)
-    ax1.plot(signals.index, signals[f'MA_{long_window}'], 
-            label=f'{long_window}-day MA', linewidth=1.5)
-    
+    line(ax1, signals.index, signals['Close'], label='Close Price', linewidth=1, alpha=0.8)
+    line(ax1, signals.index, signals[f'MA_{short_window}'],
+         label=f'{short_window}-day MA', linewidth=1.5)
+    line(ax1, signals.index, signals[f'MA_{long_window}'],
+         label=f'{long_window}-day MA', linewidth=1.5)
+
     # Mark buy/sell signals
     buy_signals = signals[signals['Entry']]
     sell_signals = signals[signals['Exit']]
-    
-    ax1.scatter(buy_signals.index, buy_signals['Close'], 
+
+    ax1.scatter(buy_signals.index, buy_signals['Close'],
                 color='green', marker='^', s=100, label='Buy Signal', zorder=5)
-    ax1.scatter(sell_signals.index, sell_signals['Close'], 
+    ax1.scatter(sell_signals.index, sell_signals['Close'],
                 color='red', marker='v', s=100, label='Sell Signal', zorder=5)
-    
+
     ax1.set_title('Price Chart with Trading Signals')
     ax1.set_ylabel('Price ($)')
     ax1.legend()
     ax1.grid(True, alpha=0.3)
-    
+
     # Plot 2: Portfolio Value vs Buy & Hold
     buy_hold_value = initial_capital * (portfolio['Price'] / portfolio['Price'].iloc[0])
-    
-    ax2.plot(portfolio.index, portfolio['Total'], 
-            label='Strategy Portfolio', linewidth=2, color='blue')
-    ax2.plot(portfolio.index, buy_hold_value, 
-            label='Buy & Hold', linewidth=2, color='gray', linestyle='--')
-    
+
+    line(ax2, portfolio.index, portfolio['Total'],
+         label='Strategy Portfolio', linewidth=2, color='blue')
+    line(ax2, portfolio.index, buy_hold_value,
+         label='Buy & Hold', linewidth=2, color='gray', linestyle='--')
+
     ax2.set_title('Portfolio Value Comparison')
     ax2.set_ylabel('Portfolio Value ($)')
     ax2.legend()
     ax2.grid(True, alpha=0.3)
-    
+
     # Format y-axis as currency
     ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
-    
+
     # Plot 3: Drawdown
-    daily_returns = portfolio['Strategy_Returns'].dropna()
-    cumulative = (1 + daily_returns).cumprod()
-    running_max = cumulative.expanding().max()
-    drawdown = (cumulative - running_max) / running_max * 100
-    
+    drawdown = _drawdown_percent(portfolio['Strategy_Returns'].dropna())
+    idx = downsample_indices(drawdown.to_numpy(), max_points)
+    if idx is not None:
+        drawdown = drawdown.iloc[idx]
+
     ax3.fill_between(drawdown.index, drawdown, 0, color='red', alpha=0.3)
     ax3.plot(drawdown.index, drawdown, color='red', linewidth=1)
     ax3.set_title('Strategy Drawdown')
     ax3.set_ylabel('Drawdown (%)')
     ax3.grid(True, alpha=0.3)
-    
+
     # Plot 4: Performance Metrics Table
     ax4.axis('off')
     metrics_text = []
     for key, value in metrics.items():
         metrics_text.append(f"{key}: {value}")
-    
-    ax4.text(0.1, 0.9, '\n'.join(metrics_text), transform=ax4.transAxes, 
+
+    ax4.text(0.1, 0.9, '\n'.join(metrics_text), transform=ax4.transAxes,
             fontsize=11, verticalalignment='top', fontfamily='monospace',
             bbox=dict(boxstyle='round', facecolor='lightgray', alpha=0.8))
     ax4.set_title('Performance Metrics')
-    
+
     plt.tight_layout()
-    
+
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        print(f"Chart saved to {save_path}")
-    
-    plt.show()
\ No newline at end of file
+        fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+        logger.info("Chart saved to %s", save_path)
+
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def _drawdown_percent(daily_returns):
+    cumulative = (1 + daily_returns).cumprod()
+    running_max = cumulative.expanding().max()
+    return (cumulative - running_max) / running_max * 100
+
+
+def downsample(x, y, max_points, method='minmax'):
+    """
+    Reduce a series to at most about ``max_points`` points for drawing.
+
+    'minmax' keeps the lowest and highest point of each bucket, so spikes and
+    drawdowns survive; 'lttb' uses Largest-Triangle-Three-Buckets, which
+    follows the visual shape more closely but walks the buckets in Python.
+    Short series (or ``max_points=None``) are returned unchanged.
+    """
+    idx = downsample_indices(y, max_points, method, x=x)
+    if idx is None:
+        return x, y
+    return x[idx], y[idx]
+
+
+def downsample_indices(y, max_points, method='minmax', x=None):
+    """Positions kept by downsample(), or None when nothing needs dropping."""
+    n = len(y)
+    if max_points is None or n <= max_points or max_points < 4:
+        return None
+    if method == 'lttb':
+        return _lttb_indices(np.arange(n, dtype=np.float64) if x is None else x, y, max_points)
+    if method == 'minmax':
+        return _minmax_indices(y, max_points)
+    raise ValueError(f"Unknown downsampling method '{method}', expected 'minmax' or 'lttb'")
+
+
+def _minmax_indices(y, max_points):
+    n = len(y)
+    buckets = (max_points - 2) // 2
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+
+    # Missing values never win a bucket unless the whole bucket is missing
+    low = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    high = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+    base = np.arange(buckets) * size
+    idx = np.concatenate(([0], base + low, base + high, [n - 1]))
+    return np.unique(np.minimum(idx, n - 1))
+
+
+def _lttb_indices(x, y, max_points):
+    n = len(y)
+    xs = mdates.date2num(x) if np.issubdtype(np.asarray(x).dtype, np.datetime64) else np.asarray(x, dtype=np.float64)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+
+    idx = np.empty(max_points, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    previous = 0
+    for b in range(max_points - 2):
+        start, stop = edges[b], edges[b + 1]
+        next_stop = edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = xs[stop:next_stop].mean() if next_stop > stop else xs[-1]
+        avg_y = np.nanmean(y[stop:next_stop]) if next_stop > stop else y[-1]
+
+        # Pick the point forming the largest triangle with the last pick and the next bucket's mean
+        area = np.abs((xs[previous] - avg_x) * (y[start:stop] - y[previous])
+                      - (xs[previous] - xs[start:stop]) * (avg_y - y[previous]))
+        area = np.where(np.isnan(area), -1.0, area)
+        previous = start + int(np.argmax(area))
+        idx[b + 1] = previous
+    return idx
+
+
+class BatchRenderer:
+    """
+    Renders backtest charts for many tickers through one reused figure.
+
+    The four-panel layout of plot_results() is built once; each render()
+    only swaps the data of the existing line, scatter and text artists,
+    downsamples every series to ``max_points`` and saves at ``dpi``. This
+    skips figure construction and layout for every chart after the first.
+    Always headless.
+    """
+
+    def __init__(self, max_points: int = 2000, dpi: int = 100, figsize=(16, 12)):
+        use_headless()
+        self.max_points = max_points
+        self.dpi = dpi
+
+        self.fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=figsize)
+        self.axes = (ax1, ax2, ax3)
+        # Placeholder title so tight_layout reserves room for it
+        self.title = self.fig.suptitle('Moving Average Crossover Strategy Backtest',
+                                       fontsize=16, fontweight='bold')
+
+        self.close_line, = ax1.plot([], [], label='Close Price', linewidth=1, alpha=0.8)
+        self.short_line, = ax1.plot([], [], linewidth=1.5)
+        self.long_line, = ax1.plot([], [], linewidth=1.5)
+        self.buys = ax1.scatter([], [], color='green', marker='^', s=100, label='Buy Signal', zorder=5)
+        self.sells = ax1.scatter([], [], color='red', marker='v', s=100, label='Sell Signal', zorder=5)
+        ax1.set_title('Price Chart with Trading Signals')
+        ax1.set_ylabel('Price ($)')
+        ax1.grid(True, alpha=0.3)
+
+        self.total_line, = ax2.plot([], [], label='Strategy Portfolio', linewidth=2, color='blue')
+        self.hold_line, = ax2.plot([], [], label='Buy & Hold', linewidth=2, color='gray', linestyle='--')
+        ax2.set_title('Portfolio Value Comparison')
+        ax2.set_ylabel('Portfolio Value ($)')
+        ax2.legend()
+        ax2.grid(True, alpha=0.3)
+        ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+
+        self.drawdown_line, = ax3.plot([], [], color='red', linewidth=1)
+        self.drawdown_fill = None
+        ax3.set_title('Strategy Drawdown')
+        ax3.set_ylabel('Drawdown (%)')
+        ax3.grid(True, alpha=0.3)
+
+        for ax in self.axes:
+            ax.xaxis_date()
+
+        ax4.axis('off')
+        self.metrics_text = ax4.text(0.1, 0.9, '', transform=ax4.transAxes,
+                                     fontsize=11, verticalalignment='top', fontfamily='monospace',
+                                     bbox=dict(boxstyle='round', facecolor='lightgray', alpha=0.8))
+        ax4.set_title('Performance Metrics')
+
+        self.fig.tight_layout()
+
+    def render(self, signals, portfolio, ticker, metrics, short_window, long_window,
+               initial_capital, save_path):
+        ax1, ax2, ax3 = self.axes
+        self.title.set_text(f'{ticker} Moving Average Crossover Strategy Backtest')
+
+        dates = _date_numbers(signals.index)
+        self._set_line(self.close_line, dates, signals['Close'])
+        self._set_line(self.short_line, dates, signals[f'MA_{short_window}'])
+        self._set_line(self.long_line, dates, signals[f'MA_{long_window}'])
+        self.short_line.set_label(f'{short_window}-day MA')
+        self.long_line.set_label(f'{long_window}-day MA')
+
+        entry = signals['Entry'].to_numpy(dtype=bool)
+        exit_ = signals['Exit'].to_numpy(dtype=bool)
+        close = signals['Close'].to_numpy(dtype=np.float64)
+        self.buys.set_offsets(np.column_stack((dates[entry], close[entry])))
+        self.sells.set_offsets(np.column_stack((dates[exit_], close[exit_])))
+        ax1.legend()
+
+        portfolio_dates = _date_numbers(portfolio.index)
+        price = portfolio['Price'].to_numpy(dtype=np.float64)
+        self._set_line(self.total_line, portfolio_dates, portfolio['Total'])
+        self._set_line(self.hold_line, portfolio_dates, initial_capital * (price / price[0]))
+
+        drawdown = _drawdown_percent(portfolio['Strategy_Returns'].dropna())
+        x, y = self._set_line(self.drawdown_line, _date_numbers(drawdown.index), drawdown)
+        if self.drawdown_fill is not None:
+            self.drawdown_fill.remove()
+        self.drawdown_fill = ax3.fill_between(x, y, 0, color='red', alpha=0.3)
+
+        self.metrics_text.set_text('\n'.join(f"{key}: {value}" for key, value in metrics.items()))
+
+        for ax in self.axes:
+            ax.relim()
+            ax.autoscale_view()
+
+        self.fig.savefig(save_path, dpi=self.dpi)
+        return save_path
+
+    def close(self):
+        plt.close(self.fig)
+
+    def _set_line(self, artist, x, y):
+        x, y = downsample(x, np.asarray(y, dtype=np.float64), self.max_points)
+        artist.set_data(x, y)
+        return x, y
+
+
+def _date_numbers(index):
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_localize(None)
+    return mdates.date2num(np.asarray(index, dtype='datetime64[ns]'))
+
+
+_worker_renderer = None
+
+
+def _render_job(job):
+    # One renderer per worker process, reused for every chart it draws
+    global _worker_renderer
+    if _worker_renderer is None:
+        _worker_renderer = BatchRenderer(**job.pop('renderer_options'))
+    else:
+        job.pop('renderer_options')
+    return _worker_renderer.render(**job)
+
+
+def render_charts(jobs, max_workers: int = None, max_points: int = 2000, dpi: int = 100):
+    """
+    Render many backtest charts headlessly.
+
+    ``jobs`` is a list of dicts with the BatchRenderer.render() arguments
+    (signals, portfolio, ticker, metrics, short_window, long_window,
+    initial_capital, save_path). With ``max_workers`` > 1 the charts are
+    split over a process pool, each worker reusing a single figure.
+    Returns the saved paths in job order.
+    """
+    options = {'max_points': max_points, 'dpi': dpi}
+    if max_workers is None or max_workers <= 1:
+        renderer = BatchRenderer(**options)
+        try:
+            return [renderer.render(**job) for job in jobs]
+        finally:
+            renderer.close()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_render_job, [dict(job, renderer_options=options) for job in jobs],
+                             chunksize=max(1, len(jobs) // (max_workers * 4))))
@@ -0,0 +1,230 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .sources import YFinanceSource
+from .signals import signal_matrix
+from .strategy import regime_positions, position_changes, trade_ordinals
+from .performance import compute_metrics, format_metrics, infer_periods_per_year
+
+logger = logging.getLogger(__name__)
+
+ALLOCATIONS = ('equal', 'capped', 'volatility')
+
+
+def align_prices(frames):
+    """
+    Date-aligned (n_bars, n_assets) close-price DataFrame from a mapping of
+    ticker -> OHLCV frame. Dates are the union of all calendars; gaps are
+    forward-filled and bars before an asset's first price stay NaN.
+    """
+    prices = pd.concat({ticker: frame['Close'] for ticker, frame in frames.items()}, axis=1, sort=True)
+    return prices.ffill().astype(np.float64)
+
+
+def positions_from_signals(signals):
+    """
+    Long (True) wherever the last non-zero signal of the column is 1; the
+    same regime rule as the single-asset engines, one column per asset.
+    """
+    return regime_positions(signals.T).T
+
+
+def allocation_weights(positions, returns, allocation='equal', max_weight=None, vol_window=20):
+    """
+    Target portfolio weight of every asset on every bar.
+
+    - 'equal': each asset owns a fixed 1/n_assets sleeve, invested while long
+    - 'capped': capital is split equally among the assets currently long,
+      each capped at ``max_weight``
+    - 'volatility': long assets are weighted by inverse ``vol_window``-bar
+      volatility, normalised to sum to one and capped at ``max_weight``
+
+    Whatever is not allocated stays in cash.
+    """
+    if allocation not in ALLOCATIONS:
+        raise ValueError(f"Unknown allocation '{allocation}', expected one of {ALLOCATIONS}")
+    n_assets = positions.shape[1]
+    long = positions.astype(np.float64)
+
+    if allocation == 'equal':
+        return long / n_assets
+
+    if allocation == 'capped':
+        raw = long
+    else:
+        volatility = pd.DataFrame(returns).rolling(vol_window).std().to_numpy()
+        with np.errstate(divide='ignore'):
+            raw = np.where(positions & (volatility > 0), 1.0 / volatility, 0.0)
+
+    totals = raw.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = np.where(totals > 0, raw / totals, 0.0)
+    if max_weight is not None:
+        np.minimum(weights, max_weight, out=weights)
+    return weights
+
+
+def simulate_portfolio(prices, weights, initial_capital):
+    """
+    Portfolio equity from a (n_bars, n_assets) price matrix and target weights.
+
+    Weights set at a bar's close earn the next bar's asset returns, and the
+    book is rebalanced to the targets every bar (fractional positions, no
+    costs). Everything is computed across the asset axis in one pass.
+    Returns a dict of per-bar arrays: 'Total', 'Cash', 'Invested',
+    'Strategy_Returns' and the per-asset 'Holdings' value matrix.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    returns = asset_returns(prices)
+
+    strategy_returns = np.zeros(len(prices))
+    strategy_returns[1:] = np.einsum('ij,ij->i', weights[:-1], returns[1:])
+    total = initial_capital * np.cumprod(1 + strategy_returns)
+
+    holdings = weights * total[:, None]
+    invested = holdings.sum(axis=1)
+    return {
+        'Total': total,
+        'Cash': total - invested,
+        'Invested': invested,
+        'Strategy_Returns': strategy_returns,
+        'Holdings': holdings,
+    }
+
+
+def asset_returns(prices):
+    """Bar-to-bar asset returns, 0 where either price is missing."""
+    returns = np.zeros_like(prices)
+    with np.errstate(invalid='ignore'):
+        returns[1:] = prices[1:] / prices[:-1] - 1
+    return np.nan_to_num(returns, nan=0.0)
+
+
+def episode_stats(prices, positions):
+    """
+    Completed long episodes across all assets and how many ended higher
+    than they started, from the entry/exit bars of every column.
+    """
+    entries, exits = position_changes(positions.T)
+    entry_idx = trade_ordinals(entries)
+    exit_idx = trade_ordinals(exits, entry_idx.shape[1])
+    closed = exit_idx >= 0
+    assets = np.broadcast_to(np.arange(prices.shape[1])[:, None], closed.shape)[closed]
+    gains = prices[exit_idx[closed], assets] > prices[entry_idx[closed], assets]
+    trades = int(entries.sum() + exits.sum())
+    return trades, int(closed.sum()), int(np.count_nonzero(gains))
+
+
+class PortfolioBacktester:
+    """
+    Runs the crossover rule over many tickers at once as one portfolio.
+
+    Prices are aligned into a (n_bars, n_assets) matrix and signals,
+    positions, weights and equity are all computed across the asset axis;
+    there is no per-ticker loop. ``allocation`` is 'equal', 'capped' or
+    'volatility' (see allocation_weights()).
+    """
+
+    def __init__(self, tickers, start_date: str, end_date: str,
+                 short_window: int = 20, long_window: int = 50,
+                 initial_capital: float = 100000, allocation: str = 'equal',
+                 max_weight: float = None, vol_window: int = 20,
+                 cache=None, source=None, ma_type: str = "sma"):
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f"Unknown allocation '{allocation}', expected one of {ALLOCATIONS}")
+        self.tickers = [ticker.upper() for ticker in tickers]
+        self.start_date = start_date
+        self.end_date = end_date
+        self.short_window = short_window
+        self.long_window = long_window
+        self.initial_capital = initial_capital
+        self.allocation = allocation
+        self.max_weight = max_weight
+        self.vol_window = vol_window
+        self.ma_type = ma_type
+        self.source = source if source is not None else YFinanceSource(cache=cache)
+
+        self.prices = None
+        self.positions = None
+        self.weights = None
+        self.portfolio = None
+        self.metrics = {}
+        self.metric_values = {}
+        self.errors = {}
+
+    def run_backtest(self, prices=None):
+        """
+        Run the portfolio pipeline. ``prices`` may be an already aligned
+        date-indexed close-price DataFrame with one column per ticker.
+        """
+        logger.info("=" * 60)
+        logger.info("PORTFOLIO CROSSOVER BACKTEST - %d tickers", len(self.tickers))
+        logger.info("=" * 60)
+        logger.info("Strategy: %s-day MA vs %s-day MA, %s allocation", self.short_window, self.long_window, self.allocation)
+        logger.info("Initial Capital: $%s", f"{self.initial_capital:,.2f}")
+        logger.info("-" * 60)
+
+        # Step 1: Fetch and align data
+        if prices is None:
+            logger.info("Fetching data...")
+            frames = self.source.load_many(self.tickers, self.start_date, self.end_date, self.errors)
+            for ticker in self.tickers:
+                if ticker in frames and 'Close' not in frames[ticker]:
+                    self.errors[ticker] = f"No Close column for ticker {ticker}"
+                    del frames[ticker]
+                if ticker not in frames:
+                    self.errors.setdefault(ticker, f"No data found for ticker {ticker}")
+                    logger.warning("Error analyzing %s: %s", ticker, self.errors[ticker])
+            if not frames:
+                raise ValueError("No data found for any ticker")
+            prices = align_prices(frames)
+        self.prices = prices
+        values = prices.to_numpy(dtype=np.float64)
+
+        # Step 2: Signals and positions for every asset at once
+        logger.info("Generating trading signals...")
+        signals = signal_matrix(values, self.short_window, self.long_window, ma_type=self.ma_type)
+        positions = positions_from_signals(signals)
+        self.positions = pd.DataFrame(positions, index=prices.index, columns=prices.columns)
+
+        # Step 3: Allocate and simulate
+        logger.info("Running portfolio simulation...")
+        returns = asset_returns(values)
+        weights = allocation_weights(positions, returns, self.allocation, self.max_weight, self.vol_window)
+        self.weights = pd.DataFrame(weights, index=prices.index, columns=prices.columns)
+        result = simulate_portfolio(values, weights, self.initial_capital)
+
+        # Equal-weight buy & hold basket as the benchmark
+        with np.errstate(invalid='ignore'):
+            first = values[np.argmax(~np.isnan(values), axis=0), np.arange(values.shape[1])]
+            benchmark = np.nanmean(values / first, axis=1)
+        self.portfolio = pd.DataFrame({
+            'Benchmark': benchmark,
+            'Invested': result['Invested'],
+            'Cash': result['Cash'],
+            'Total': result['Total'],
+            'Strategy_Returns': result['Strategy_Returns'],
+        }, index=prices.index)
+
+        # Step 4: Performance metrics
+        logger.info("Calculating performance metrics...")
+        trades, round_trips, winning_trades = episode_stats(values, positions)
+        self.metric_values = compute_metrics(result['Total'], self.initial_capital, price=benchmark,
+                                             returns=result['Strategy_Returns'],
+                                             round_trips=round_trips, winning_trades=winning_trades,
+                                             periods_per_year=infer_periods_per_year(prices.index))
+        self.metrics = format_metrics(self.metric_values)
+
+        logger.info("")
+        logger.info("PORTFOLIO RESULTS")
+        logger.info("-" * 30)
+        for key, value in self.metrics.items():
+            logger.info("%-25s: %s", key, value)
+
+        logger.info("")
+        logger.info("Total Trades Executed: %d", trades)
+        logger.info("Assets x Bars Analyzed: %d x %d", values.shape[1], values.shape[0])
+
+        return self
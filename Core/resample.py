@@ -0,0 +1,193 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from .sources import DataSource, YFinanceSource
+from .signals import generate_signals_lean
+
+# How each OHLCV column combines within a bar; any other column keeps its last value
+AGGREGATIONS = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+# Shorthand units: m = minutes, mo = months; weekly bars end on Friday
+_UNITS = {'m': 'min', 'min': 'min', 'h': 'h', 'd': 'D', 'w': 'W-FRI', 'mo': 'ME'}
+_TIMEFRAME = re.compile(r'^(\d*)\s*(min|mo|m|h|d|w)$', re.IGNORECASE)
+
+
+def parse_timeframe(timeframe):
+    """
+    pandas resample rule for a timeframe such as '5m', '1h', '1d', '1w' or
+    '1mo'. Anything else is passed through as a pandas offset alias.
+    """
+    match = _TIMEFRAME.match(str(timeframe).strip())
+    if match is None:
+        pd.tseries.frequencies.to_offset(timeframe)
+        return timeframe
+    count, unit = match.groups()
+    return f"{count or 1}{_UNITS[unit.lower()]}"
+
+
+def resample_ohlcv(data, timeframe, origin='start_day'):
+    """
+    Aggregate bars into ``timeframe`` bars: first Open, max High, min Low,
+    last Close and summed Volume (other columns keep their last value).
+    Intervals without any bar (nights, weekends, holidays) are dropped.
+    Works on any subset of the OHLCV columns, e.g. Close-only frames.
+    ``origin`` anchors intraday bins as in DataFrame.resample().
+    """
+    rule = parse_timeframe(timeframe)
+    how = {column: AGGREGATIONS.get(column, 'last') for column in data.columns}
+    resampler = data.resample(rule, origin=origin)
+    bars = resampler.agg(how)
+    return bars[resampler.size().to_numpy() > 0]
+
+
+def bar_end_times(data, timeframe):
+    """
+    Timestamp of the last underlying bar of every non-empty ``timeframe``
+    bar, i.e. when that bar is complete and its values become known.
+    """
+    rule = parse_timeframe(timeframe)
+    ends = pd.Series(data.index, index=data.index).resample(rule).last()
+    return pd.DatetimeIndex(ends.dropna())
+
+
+def multi_timeframe_signals(data, short_window, long_window, signal_timeframe,
+                            execution_timeframe=None, ma_type="sma"):
+    """
+    Crossover signals computed on ``signal_timeframe`` bars and executed on
+    ``execution_timeframe`` bars (or on ``data`` itself when None).
+
+    A signal bar's state only reaches the execution bars once the signal
+    bar is complete: every execution bar takes the state of the last signal
+    bar whose final underlying bar is not later than its own, so there is
+    no lookahead. Returns a generate_signals_lean()-shaped frame on the
+    execution bars, with the moving averages carried forward.
+    """
+    execution = resample_ohlcv(data, execution_timeframe) if execution_timeframe else data
+    executed_at = bar_end_times(data, execution_timeframe) if execution_timeframe else data.index
+
+    slow = generate_signals_lean(resample_ohlcv(data, signal_timeframe), short_window, long_window,
+                                 ma_type=ma_type)
+    known_at = bar_end_times(data, signal_timeframe)
+    source = np.searchsorted(known_at.asi8, executed_at.as_unit(known_at.unit).asi8, side='right') - 1
+    known = source >= 0
+    source = np.maximum(source, 0)
+
+    signal = np.where(known, slow['Signal'].to_numpy()[source], 0).astype(np.int8)
+    change = np.diff(signal, prepend=signal[:1])
+    frame = {'Close': execution['Close'].to_numpy(dtype=np.float64)}
+    for column in (f'MA_{short_window}', f'MA_{long_window}'):
+        frame[column] = np.where(known, slow[column].to_numpy()[source], np.nan)
+    frame.update({'Signal': signal, 'Entry': change == 2, 'Exit': change == -2})
+    return pd.DataFrame(frame, index=execution.index, copy=False)
+
+
+class TimeframeCache:
+    """
+    Base bars per ticker plus their aggregates, one per timeframe.
+
+    Base bars are loaded once from ``source`` (or given with set()) and
+    every timeframe asked for with get() is resampled once and kept. New
+    bars go through update(): they are appended to the base bars and each
+    cached timeframe re-aggregates only its last, possibly unfinished, bar
+    onwards, so running a universe at several timeframes costs one load and
+    one resample per timeframe however often bars arrive.
+    """
+
+    def __init__(self, source=None):
+        self.source = source if source is not None else YFinanceSource()
+        self._base = {}
+        self._ranges = {}
+        self._frames = {}
+
+    def load(self, ticker, start_date, end_date):
+        """Base bars of ``ticker`` in [start_date, end_date), fetched on first use."""
+        ticker = ticker.upper()
+        if self._ranges.get(ticker) != (start_date, end_date):
+            self.set(ticker, self.source.load(ticker, start_date, end_date))
+            self._ranges[ticker] = (start_date, end_date)
+        return self._base[ticker]
+
+    def set(self, ticker, data):
+        """Replace the base bars of ``ticker`` and drop its aggregates."""
+        ticker = ticker.upper()
+        self._base[ticker] = data.sort_index()
+        self._ranges.pop(ticker, None)
+        self._frames[ticker] = {}
+
+    def get(self, ticker, timeframe=None, start_date=None, end_date=None):
+        """
+        ``timeframe`` bars of ``ticker`` (base bars when None). Base bars are
+        loaded for the date range if they are not held yet.
+        """
+        ticker = ticker.upper()
+        if ticker not in self._base or (start_date, end_date) != (None, None):
+            self.load(ticker, start_date, end_date)
+        if timeframe is None:
+            return self._base[ticker]
+        rule = parse_timeframe(timeframe)
+        frames = self._frames[ticker]
+        if rule not in frames:
+            frames[rule] = resample_ohlcv(self._base[ticker], rule)
+        return frames[rule]
+
+    def update(self, ticker, bars):
+        """
+        Add new (or revised) base bars and bring every cached timeframe of
+        ``ticker`` up to date. Returns the {rule: frame} aggregates.
+        """
+        ticker = ticker.upper()
+        if ticker not in self._base:
+            self.set(ticker, bars)
+            return self._frames[ticker]
+        bars = bars.sort_index()
+        previous = self._base[ticker]
+        base = pd.concat([previous, bars])
+        if len(bars) and len(previous) and bars.index[0] <= previous.index[-1]:
+            # Revised or back-filled bars replace what was there
+            base = base[~base.index.duplicated(keep='last')].sort_index()
+        self._base[ticker] = base
+
+        frames = self._frames[ticker]
+        for rule, frame in frames.items():
+            frames[rule] = _refresh(frame, base, bars.index[0] if len(bars) else None, rule)
+        return frames
+
+    def timeframes(self, ticker):
+        """Resample rules cached for ``ticker``."""
+        return list(self._frames.get(ticker.upper(), {}))
+
+
+class ResampledSource(DataSource):
+    """
+    DataSource serving ``timeframe`` bars out of a shared TimeframeCache, so
+    any backtester can run on 5-minute, hourly or weekly bars and several
+    timeframes of one universe share a single load of the base bars.
+    """
+
+    def __init__(self, timeframe, cache: TimeframeCache = None, source=None):
+        self.timeframe = timeframe
+        self.cache = cache if cache is not None else TimeframeCache(source)
+
+    def load(self, ticker, start_date, end_date):
+        data = self.cache.get(ticker, self.timeframe, start_date, end_date)
+        if data.empty:
+            raise ValueError(f"No data found for ticker {ticker}")
+        return data
+
+
+def _refresh(frame, base, first_new, rule):
+    # Aggregates before the one holding the first new bar cannot change.
+    # Re-aggregate from one aggregate earlier, since labels mark a bar's
+    # start ('5min', '1h', 'D') or its end ('W-FRI', 'ME'), and splice.
+    # Intraday bins stay anchored where the full resample anchors them.
+    if first_new is None:
+        return frame
+    j = np.searchsorted(frame.index, first_new, side='right') - 2
+    if j < 0:
+        return resample_ohlcv(base, rule)
+    intraday = isinstance(pd.tseries.frequencies.to_offset(rule), pd.offsets.Tick)
+    origin = base.index[0].normalize() if intraday else 'start_day'
+    tail = resample_ohlcv(base.loc[frame.index[j]:], rule, origin)
+    return pd.concat([frame.iloc[:j + 1], tail[tail.index > frame.index[j]]])
@@ -0,0 +1,190 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from .ledger import TradeLedger
+
+logger = logging.getLogger(__name__)
+
+# Bump when stored results would no longer match what the code computes
+RESULT_VERSION = 1
+
+
+def data_fingerprint(data):
+    """Content hash of a price DataFrame: column names, timestamps and values."""
+    digest = hashlib.blake2b(digest_size=16)
+    index = data.index
+    if getattr(index, 'tz', None) is not None:
+        digest.update(str(index.tz).encode())
+        index = index.tz_convert('UTC').tz_localize(None)
+    digest.update(pd.DatetimeIndex(index).as_unit('ns').asi8.tobytes())
+    for column in data.columns:
+        digest.update(str(column).encode())
+        digest.update(np.ascontiguousarray(data[column].to_numpy()).tobytes())
+    return digest.hexdigest()
+
+
+def result_key(config, fingerprint):
+    """Content address of a run: its configuration plus its input data."""
+    payload = json.dumps({'version': RESULT_VERSION, 'config': config, 'data': fingerprint},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent memoization of backtest results.
+
+    Each run is stored under a hash of its configuration and of the input
+    prices, so a changed window, capital, engine or a revised price bar all
+    miss the cache. Signals, portfolio, trades and metrics go into one .npz
+    blob per run; a SQLite index keeps the ticker, configuration, size and
+    last access time. Runs are evicted least-recently-used first once the
+    store grows past ``max_bytes``.
+    """
+
+    INDEX_FILE = 'index.sqlite'
+
+    def __init__(self, directory: str, max_bytes: int = 512 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, self.INDEX_FILE))
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                ticker TEXT,
+                config TEXT,
+                bytes INTEGER,
+                created REAL,
+                last_access REAL
+            )""")
+        self._db.commit()
+
+    def get(self, key):
+        """Stored result dict for ``key`` or None on a miss."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as blob:
+            arrays = {name: blob[name] for name in blob.files}
+
+        self._db.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+
+        tz = str(arrays.pop('tz'))
+        metrics = json.loads(str(arrays.pop('metrics')))
+        records = arrays.pop('trades')
+        ledger = TradeLedger(capacity=len(records), tz=tz or None)
+        # Field by field, so blobs stored before a field was added still load
+        for name in records.dtype.names:
+            ledger._data[name][:len(records)] = records[name]
+        ledger._size = len(records)
+        return {
+            'signals': _frame(arrays, 'signals', tz),
+            'portfolio': _frame(arrays, 'portfolio', tz),
+            'trades': ledger,
+            'metrics': metrics,
+        }
+
+    def put(self, key, ticker, config, signals, portfolio, trades, metrics):
+        """Store one run's results under ``key``."""
+        ledger = TradeLedger.from_trades(trades)
+        tz = signals.index.tz if getattr(signals.index, 'tz', None) is not None else ledger.tz
+        arrays = {
+            'tz': np.array(str(tz) if tz is not None else ''),
+            'metrics': np.array(json.dumps(metrics)),
+            'trades': ledger.records,
+        }
+        arrays.update(_columns(signals, 'signals'))
+        arrays.update(_columns(portfolio, 'portfolio'))
+
+        # Write then rename so a crash never leaves a half-written blob behind
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        path = self._path(key)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(buffer.getbuffer())
+        os.replace(tmp, path)
+
+        now = time.time()
+        self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, ticker, json.dumps(config, sort_keys=True, default=str),
+                          buffer.getbuffer().nbytes, now, now))
+        self._db.commit()
+        self._evict(keep=key)
+
+    def invalidate(self, key=None, ticker=None):
+        """Drop one run by key, every run of a ticker, or everything when both are None."""
+        if key is not None:
+            keys = [key]
+        elif ticker is not None:
+            keys = [row[0] for row in self._db.execute("SELECT key FROM results WHERE ticker = ?",
+                                                       (ticker.upper(),))]
+        else:
+            keys = [row[0] for row in self._db.execute("SELECT key FROM results")]
+        for name in keys:
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+            self._db.execute("DELETE FROM results WHERE key = ?", (name,))
+        self._db.commit()
+
+    def size(self):
+        """Total bytes of stored results."""
+        return self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM results").fetchone()[0]
+
+    def entries(self):
+        """DataFrame of stored runs, most recently used first."""
+        return pd.read_sql_query("SELECT key, ticker, config, bytes, created, last_access FROM results "
+                                 "ORDER BY last_access DESC", self._db)
+
+    def close(self):
+        self._db.close()
+
+    def _evict(self, keep=None):
+        total = self.size()
+        for name, size in self._db.execute("SELECT key, bytes FROM results ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            total -= size
+            logger.info("Evicting %s from result cache", name[:12])
+            self.invalidate(key=name)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+
+def _columns(frame, prefix):
+    # One array per column plus the index as UTC nanoseconds
+    index = frame.index
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    arrays = {f"{prefix}:index": pd.DatetimeIndex(index).as_unit('ns').asi8,
+              f"{prefix}:index_name": np.array(frame.index.name or ''),
+              f"{prefix}:index_unit": np.array(getattr(frame.index, 'unit', 'ns')),
+              f"{prefix}:columns": np.array([str(column) for column in frame.columns])}
+    for i, column in enumerate(frame.columns):
+        arrays[f"{prefix}:{i}"] = frame[column].to_numpy()
+    return arrays
+
+
+def _frame(arrays, prefix, tz):
+    index = pd.DatetimeIndex(arrays[f"{prefix}:index"].view('datetime64[ns]'),
+                             name=str(arrays[f"{prefix}:index_name"]) or None)
+    index = index.as_unit(str(arrays[f"{prefix}:index_unit"]))
+    if tz:
+        index = index.tz_localize('UTC').tz_convert(tz)
+    columns = arrays[f"{prefix}:columns"]
+    return pd.DataFrame({str(column): arrays[f"{prefix}:{i}"] for i, column in enumerate(columns)},
+                        index=index)
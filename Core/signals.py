@@ -1,7 +1,19 @@
-def generate_signals(data, short_window, long_window):
+import numpy as np
+import pandas as pd
+
+from .kernels import moving_average, moving_averages
+
+
+def generate_signals(data, short_window, long_window, ma_type="sma"):
     # Calculate moving averages and add a column with the moving average
-        data[f'MA_{short_window}'] = data['Close'].rolling(window=short_window).mean()
-        data[f'MA_{long_window}'] = data['Close'].rolling(window=long_window).mean()
+        if ma_type == "sma":
+            data[f'MA_{short_window}'] = data['Close'].rolling(window=short_window).mean()
+            data[f'MA_{long_window}'] = data['Close'].rolling(window=long_window).mean()
+        else:
+            # EMA / WMA / Hull come from the array kernels
+            close = data['Close'].to_numpy(dtype=np.float64)
+            data[f'MA_{short_window}'] = moving_average(close, short_window, ma_type)
+            data[f'MA_{long_window}'] = moving_average(close, long_window, ma_type)
         
         # Generate signals
         data['Signal'] = 0
@@ -23,4 +35,82 @@ def generate_signals(data, short_window, long_window):
         data['Entry'] = data['Position'] == 2  # From -1 to 1 (or 0 to 1)
         data['Exit'] = data['Position'] == -2   # From 1 to -1 (or 1 to 0)
         
-        return data
\ No newline at end of file
+        return data
+
+
+def generate_signals_lean(data, short_window, long_window, ma_type="sma", dtype="float64"):
+    """
+    Memory-lean generate_signals().
+
+    Returns a new frame holding only what run_strategy() and the plots read
+    (Close, the two MA columns, an int8 Signal and bool Entry/Exit) and
+    leaves ``data`` untouched; OHLV and Position are not carried over.
+    With float64 the values match generate_signals() exactly; dtype="float32"
+    halves the price and MA columns of the returned frame, at the cost of
+    simulating on float32-rounded prices. It does not lower the peak of a
+    whole run: the moving averages are computed, and the strategy and
+    metrics run, in float64.
+    """
+    close = data['Close']
+    if ma_type == "sma":
+        short_ma = close.rolling(window=short_window).mean().to_numpy()
+        long_ma = close.rolling(window=long_window).mean().to_numpy()
+    else:
+        values = close.to_numpy(dtype=np.float64)
+        short_ma = moving_average(values, short_window, ma_type)
+        long_ma = moving_average(values, long_window, ma_type)
+
+    signal = crossover_signal(short_ma, long_ma)
+    change = np.diff(signal, prepend=signal[:1])
+
+    return pd.DataFrame({
+        'Close': close.to_numpy().astype(dtype, copy=False),
+        f'MA_{short_window}': short_ma.astype(dtype, copy=False),
+        f'MA_{long_window}': long_ma.astype(dtype, copy=False),
+        'Signal': signal,
+        'Entry': change == 2,
+        'Exit': change == -2,
+    }, index=data.index, copy=False)
+
+
+def moving_average_matrix(close, windows, ma_type="sma"):
+    """
+    Moving averages of one close series for several windows at once.
+
+    Returns a (len(windows), len(close)) float64 array; bars before a window
+    fills are NaN. SMAs are rolling().mean() values, identical to
+    generate_signals().
+    """
+    return moving_averages(close, windows, ma_type=ma_type)
+
+
+def crossover_signal(short_ma, long_ma):
+    """
+    Array version of the Signal column: 1 where the short MA is above the
+    long MA, -1 where it is below and 0 otherwise (including warm-up NaNs).
+    Works on 1-D series or 2-D batches of MAs.
+    """
+    short_ma = np.asarray(short_ma)
+    long_ma = np.asarray(long_ma)
+    signal = np.zeros(np.broadcast(short_ma, long_ma).shape, dtype=np.int8)
+    signal[short_ma > long_ma] = 1
+    signal[short_ma < long_ma] = -1
+    return signal
+
+
+
+def signal_matrix(prices, short_window, long_window, ma_type="sma"):
+    """
+    Crossover signals for a (n_bars, n_assets) price matrix, one column per
+    asset. SMAs use DataFrame.rolling().mean() so every column matches
+    generate_signals() on that asset; leading NaNs (not yet listed) give 0.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if ma_type == "sma":
+        frame = pd.DataFrame(prices)
+        short_ma = frame.rolling(window=short_window).mean().to_numpy()
+        long_ma = frame.rolling(window=long_window).mean().to_numpy()
+    else:
+        short_ma = np.column_stack([moving_average(column, short_window, ma_type) for column in prices.T])
+        long_ma = np.column_stack([moving_average(column, long_window, ma_type) for column in prices.T])
+    return crossover_signal(short_ma, long_ma)
@@ -0,0 +1,208 @@
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import fetch_data
+
+# The signal, strategy and plotting steps only ever read closing prices
+PIPELINE_COLUMNS = ('Close',)
+
+
+class DataSource(ABC):
+    """
+    Interface for price providers used by the backtesters.
+
+    ``load`` returns one ticker's bars in [start_date, end_date) as a
+    DataFrame indexed by date, raising ValueError when there is no data.
+    ``load_many`` returns a {ticker: DataFrame} dict and leaves out tickers
+    that failed to load, whatever the error, so one bad ticker never stops
+    the rest; with an ``errors`` dict it also records why each one failed.
+    """
+
+    @abstractmethod
+    def load(self, ticker, start_date, end_date):
+        """One ticker's bars in [start_date, end_date)."""
+
+    def load_many(self, tickers, start_date, end_date, errors=None):
+        frames = {}
+        for ticker in tickers:
+            try:
+                frames[ticker] = self.load(ticker, start_date, end_date)
+            except Exception as e:
+                _record(errors, ticker, e)
+        return frames
+
+
+class YFinanceSource(DataSource):
+    """Yahoo Finance over the network, optionally through a PriceCache."""
+
+    def __init__(self, cache=None):
+        self.cache = cache
+
+    def load(self, ticker, start_date, end_date):
+        return fetch_data(ticker, start_date, end_date, cache=self.cache)
+
+
+class LocalFileSource(DataSource):
+    """
+    Prices from local CSV/Parquet files, for machines without network access.
+
+    ``path`` is either a directory of per-ticker files (``AAPL.csv``,
+    ``MSFT.parquet``, ...) or a single long-format file with one row per
+    (date, ticker). Only ``columns`` are read, parsed straight into
+    ``dtype``; by default that is just the Close column the pipeline uses.
+    Long CSV files are scanned in ``chunksize``-row chunks, and directory
+    loads are spread over ``max_workers`` threads so they are bound by disk
+    throughput rather than a single reader.
+    """
+
+    def __init__(self, path: str, columns=PIPELINE_COLUMNS, dtype: str = 'float64',
+                 date_column: str = 'Date', ticker_column: str = 'Ticker',
+                 chunksize: int = 1_000_000, max_workers: int = None):
+        if dtype not in ('float32', 'float64'):
+            raise ValueError(f"Unsupported dtype '{dtype}', expected 'float32' or 'float64'")
+
+        self.path = path
+        self.columns = list(columns)
+        self.dtype = dtype
+        self.date_column = date_column
+        self.ticker_column = ticker_column
+        self.chunksize = chunksize
+        self.max_workers = max_workers
+
+        self._files = None
+        if os.path.isdir(path):
+            # One directory listing up front instead of a stat per ticker
+            self._files = {}
+            for entry in os.scandir(path):
+                name, ext = os.path.splitext(entry.name)
+                if ext.lower() in ('.csv', '.parquet', '.pq'):
+                    self._files[name.upper()] = entry.path
+
+    def load(self, ticker, start_date, end_date):
+        ticker = ticker.upper()
+        errors = {}
+        frames = self.load_many([ticker], start_date, end_date, errors)
+        if ticker not in frames:
+            raise ValueError(errors[ticker])
+        return frames[ticker]
+
+    def load_many(self, tickers, start_date, end_date, errors=None):
+        tickers = [ticker.upper() for ticker in tickers]
+        if self._files is None:
+            try:
+                frames = self._load_long(tickers, start_date, end_date)
+            except Exception as e:
+                frames = {}
+                for ticker in tickers:
+                    _record(errors, ticker, e)
+        else:
+            found = [ticker for ticker in tickers if ticker in self._files]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {ticker: pool.submit(self._read_file, self._files[ticker]) for ticker in found}
+            frames = {}
+            for ticker, future in futures.items():
+                try:
+                    frame = _select(future.result(), start_date, end_date)
+                except Exception as e:
+                    _record(errors, ticker, e)
+                    continue
+                if not frame.empty:
+                    frames[ticker] = frame
+
+        for ticker in tickers:
+            if ticker not in frames and (errors is None or ticker not in errors):
+                _record(errors, ticker, ValueError(f"No data found for ticker {ticker}"))
+        return frames
+
+    def _read_file(self, path):
+        if _is_parquet(path):
+            data = pd.read_parquet(path, columns=[self.date_column] + self.columns)
+            # Files written from a date-indexed frame restore it as the index
+            if self.date_column in data.columns:
+                data = data.set_index(self.date_column)
+            data = data.astype(self.dtype)
+        else:
+            data = pd.read_csv(path, usecols=[self.date_column] + self.columns,
+                               dtype={column: self.dtype for column in self.columns},
+                               index_col=self.date_column, parse_dates=True)
+        if not isinstance(data.index, pd.DatetimeIndex):
+            data.index = _parse_dates(data.index)
+        data.index = pd.DatetimeIndex(data.index)
+        return data
+
+    def _load_long(self, tickers, start_date, end_date):
+        usecols = [self.date_column, self.ticker_column] + self.columns
+
+        wanted = set(tickers)
+        if _is_parquet(self.path):
+            # Symbols match case-insensitively: find the spellings the file uses
+            # for the wanted tickers, then push that filter down to the reader
+            symbols = pd.read_parquet(self.path, columns=[self.ticker_column])[self.ticker_column]
+            names = sorted(name for name in symbols.dropna().unique() if name.upper() in wanted)
+            if not names:
+                return {}
+            data = pd.read_parquet(self.path, columns=usecols,
+                                   filters=[(self.ticker_column, 'in', names)])
+            chunks = [data.astype({column: self.dtype for column in self.columns})]
+        else:
+            dtypes = {column: self.dtype for column in self.columns}
+            dtypes[self.ticker_column] = str
+            chunks = []
+            for chunk in pd.read_csv(self.path, usecols=usecols, dtype=dtypes, chunksize=self.chunksize):
+                chunk = chunk[chunk[self.ticker_column].str.upper().isin(wanted)]
+                if not chunk.empty:
+                    chunks.append(chunk)
+
+        if not chunks:
+            return {}
+        data = pd.concat(chunks, ignore_index=True)
+        data[self.ticker_column] = data[self.ticker_column].str.upper()
+        if not pd.api.types.is_datetime64_any_dtype(data[self.date_column]):
+            data[self.date_column] = _parse_dates(data[self.date_column])
+
+        frames = {}
+        for ticker, group in data.groupby(self.ticker_column, sort=False):
+            frame = group.set_index(pd.DatetimeIndex(group[self.date_column]))[self.columns]
+            frame = _select(frame, start_date, end_date)
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+
+def _record(errors, ticker, error):
+    """Note why ``ticker`` failed in an optional errors dict."""
+    if errors is not None:
+        errors[ticker] = str(error) or type(error).__name__
+
+
+def _parse_dates(values):
+    """
+    Parse date strings, converting to UTC when they carry mixed offsets
+    (CSVs saved from tz-aware frames switch offset across DST).
+    """
+    try:
+        return pd.to_datetime(values)
+    except ValueError:
+        return pd.to_datetime(values, utc=True)
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def _select(data, start_date, end_date):
+    """Sort, clean and cut a frame to [start_date, end_date)."""
+    data = data.sort_index()
+    index = data.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    mask = np.ones(len(data), dtype=bool)
+    if start_date is not None:
+        mask &= index >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= index < pd.Timestamp(end_date)
+    return data[mask].dropna()
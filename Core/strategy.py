@@ -1,26 +1,293 @@
+import numpy as np
 import pandas as pd
 
-def run_strategy(signals, initial_capital):
+from .ledger import TradeLedger
+from .execution import execute
+
+
+def run_strategy(signals, initial_capital, engine="vectorized", execution=None, lean=False):
+    """
+    Simulate the long-only crossover strategy over a signals frame.
+
+    engine="vectorized" runs the NumPy array engine; engine="loop" runs the
+    original bar-by-bar reference implementation. Both return the same
+    (portfolio, trades) pair, with the trades recorded in a TradeLedger.
+
+    ``execution`` is a dict of Core.execution.EXECUTION_PARAMS (commissions,
+    slippage, stops, sizing); when given, the path-dependent execution
+    kernel (Numba when installed) runs instead of either engine.
+
+    ``lean=True`` keeps only the portfolio columns the metrics and plots read
+    (Price, Total, Strategy_Returns) and skips Holdings, Cash and Returns;
+    the loop engine always builds the full frame.
+    """
+    if execution:
+        return _run_strategy_execution(signals, initial_capital, execution, lean)
+    if engine == "vectorized":
+        return _run_strategy_vectorized(signals, initial_capital, lean)
+    if engine == "loop":
+        return _run_strategy_loop(signals, initial_capital)
+    raise ValueError(f"Unknown engine '{engine}', expected 'vectorized' or 'loop'")
+
+
+def simulate(close, signal, initial_capital):
+    """
+    Array-based execution engine.
+
+    Walks the trades rather than the bars: entries are the first affordable
+    bar with signal 1 while flat, exits the first bar with signal -1 while
+    long. Cash and share counts are updated with exactly the same arithmetic
+    as the loop engine, then spread over the bars in one vectorized pass.
+
+    Returns a dict of per-bar arrays ('Holdings', 'Cash', 'Total', 'Returns',
+    'Strategy_Returns') plus 'trade_index', 'trade_side' (1 = BUY, -1 = SELL)
+    and 'trade_shares' describing every executed trade.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.asarray(signal)
+    n = len(close)
+
+    buy_candidates = np.flatnonzero(signal == 1)
+    sell_candidates = np.flatnonzero(signal == -1)
+
+    cash = initial_capital
+    trade_index = []
+    trade_side = []
+    trade_shares = []
+    # State after each trade; slot 0 is the state before the first trade
+    cash_states = [cash]
+    holdings_states = [0]
+
+    k = 0
+    while k < len(buy_candidates):
+        # Find the first buy candidate we can afford at least one share of
+        shares = cash // close[buy_candidates[k]]
+        if shares <= 0:
+            affordable = np.flatnonzero(cash // close[buy_candidates[k:]] > 0)
+            if len(affordable) == 0:
+                break
+            k += affordable[0]
+            shares = cash // close[buy_candidates[k]]
+
+        entry = buy_candidates[k]
+        cash -= shares * close[entry]
+        trade_index.append(entry)
+        trade_side.append(1)
+        trade_shares.append(shares)
+        cash_states.append(cash)
+        holdings_states.append(shares)
+
+        s = np.searchsorted(sell_candidates, entry, side='right')
+        if s == len(sell_candidates):
+            break
+        exit_ = sell_candidates[s]
+        cash += shares * close[exit_]
+        trade_index.append(exit_)
+        trade_side.append(-1)
+        trade_shares.append(shares)
+        cash_states.append(cash)
+        holdings_states.append(0)
+
+        k = np.searchsorted(buy_candidates, exit_, side='right')
+
+    trade_index = np.asarray(trade_index, dtype=np.int64)
+    # Spread each post-trade state over the bars up to the next trade
+    counts = np.diff(np.concatenate(([0], trade_index, [n])))
+    holdings = np.repeat(np.asarray(holdings_states, dtype=np.float64), counts)
+    cash = np.repeat(np.asarray(cash_states, dtype=np.float64), counts)
+    total = holdings * close
+    total += cash
+
+    returns = np.zeros(n)
+    strategy_returns = np.zeros(n)
+    if n > 1:
+        # In place, so no bar-sized temporaries
+        np.subtract(close[1:], close[:-1], out=returns[1:])
+        returns[1:] /= close[:-1]
+        np.subtract(total[1:], total[:-1], out=strategy_returns[1:])
+        strategy_returns[1:] /= total[:-1]
+
+    return {
+        'Holdings': holdings,
+        'Cash': cash,
+        'Total': total,
+        'Returns': returns,
+        'Strategy_Returns': strategy_returns,
+        'trade_index': trade_index,
+        'trade_side': np.asarray(trade_side, dtype=np.int8),
+        'trade_shares': np.asarray(trade_shares, dtype=np.float64),
+    }
+
+
+def simulate_batch(close, signals, initial_capital):
+    """
+    Run the execution engine for many signal rows at once.
+
+    signals is a (n_strategies, n_bars) array; close is one shared price
+    series or a matching (n_strategies, n_bars) matrix with a price path per
+    row (e.g. Monte Carlo paths). Position state comes from the
+    forward-filled signal regime for every row at once; the cash recurrence
+    is then advanced one trade ordinal at a time across all rows. Rows where
+    an entry cannot afford a single share fall back to simulate() so the
+    result always matches the single-series engine.
+
+    Returns a dict with 'Total' and 'Strategy_Returns' (n_strategies, n_bars)
+    arrays plus per-row 'Trades', 'Round_Trips' and 'Winning_Trades' counts.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signals = np.atleast_2d(np.asarray(signals))
+    n_rows, n = signals.shape
+    rows = np.arange(n_rows)
+    # One price row per strategy; a shared series is broadcast without copying
+    paths = np.broadcast_to(close, signals.shape)
+
+    entries, exits = position_changes(regime_positions(signals))
+    entry_idx = trade_ordinals(entries)
+    exit_idx = trade_ordinals(exits, entry_idx.shape[1])
+    n_entries = entry_idx.shape[1]
+
+    cash = np.full(n_rows, initial_capital, dtype=np.float64)
+    cash_states = np.empty((n_rows, 2 * n_entries + 1))
+    holdings_states = np.zeros((n_rows, 2 * n_entries + 1))
+    cash_states[:, 0] = cash
+    round_trips = np.zeros(n_rows, dtype=np.int64)
+    wins = np.zeros(n_rows, dtype=np.int64)
+    fallback = np.zeros(n_rows, dtype=bool)
+
+    for k in range(n_entries):
+        has_entry = entry_idx[:, k] >= 0
+        has_exit = exit_idx[:, k] >= 0
+        entry_price = paths[rows, entry_idx[:, k]]
+        exit_price = paths[rows, exit_idx[:, k]]
+
+        shares = np.where(has_entry, cash // entry_price, 0.0)
+        fallback |= has_entry & (shares <= 0)
+        cost = shares * entry_price
+        cash = np.where(has_entry, cash - cost, cash)
+        cash_states[:, 2 * k + 1] = cash
+        holdings_states[:, 2 * k + 1] = shares
+
+        proceeds = shares * exit_price
+        cash = np.where(has_exit, cash + proceeds, cash)
+        cash_states[:, 2 * k + 2] = cash
+        round_trips += has_exit
+        wins += has_exit & (proceeds - cost > 0)
+
+    events = np.cumsum(entries | exits, axis=1)
+    trades = events[:, -1] if n else np.zeros(n_rows, dtype=np.int64)
+    total = (np.take_along_axis(cash_states, events, axis=1)
+             + np.take_along_axis(holdings_states, events, axis=1) * close)
+    del events
+
+    for row in rows[fallback]:
+        result = simulate(paths[row], signals[row], initial_capital)
+        total[row] = result['Total']
+        sides = result['trade_side']
+        values = result['trade_shares'] * paths[row][result['trade_index']]
+        profits = values[1::2] - values[0:len(sides) // 2 * 2:2]
+        trades[row] = len(sides)
+        round_trips[row] = len(profits)
+        wins[row] = np.count_nonzero(profits > 0)
+
+    strategy_returns = np.zeros((n_rows, n))
+    if n > 1:
+        strategy_returns[:, 1:] = (total[:, 1:] - total[:, :-1]) / total[:, :-1]
+
+    return {
+        'Total': total,
+        'Strategy_Returns': strategy_returns,
+        'Trades': trades,
+        'Round_Trips': round_trips,
+        'Winning_Trades': wins,
+    }
+
+
+def regime_positions(signals):
+    """
+    Long (True) wherever the last non-zero signal of the row is 1, for a
+    (n_rows, n_bars) signal array: the position the crossover rule holds.
+    """
+    signals = np.asarray(signals)
+    last = np.where(signals != 0, np.arange(signals.shape[1]), 0)
+    np.maximum.accumulate(last, axis=1, out=last)
+    return np.take_along_axis(signals, last, axis=1) == 1
+
+
+def position_changes(long):
+    """(entries, exits) flags of a (n_rows, n_bars) boolean position array."""
+    entries = long.copy()
+    entries[:, 1:] &= ~long[:, :-1]
+    exits = np.zeros_like(long)
+    exits[:, 1:] = long[:, :-1] & ~long[:, 1:]
+    return entries, exits
+
+
+def trade_ordinals(flags, width=None):
+    """(n_rows, max_trades) matrix of bar indices of each row's flags, -1 padded."""
+    row_idx, col_idx = np.nonzero(flags)
+    counts = np.bincount(row_idx, minlength=flags.shape[0])
+    if width is None:
+        width = int(counts.max()) if len(counts) else 0
+    ordinal = np.arange(len(row_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+    out = np.full((flags.shape[0], width), -1, dtype=np.int64)
+    out[row_idx, ordinal] = col_idx
+    return out
+
+
+def _run_strategy_vectorized(signals, initial_capital, lean=False):
+    close = signals['Close'].to_numpy(dtype=np.float64)
+    result = simulate(close, signals['Signal'].to_numpy(), initial_capital)
+    result['Holdings'] = result['Holdings'].astype(np.int64)
+    portfolio = _portfolio_frame(signals, result, lean)
+
+    index = result['trade_index']
+    trades = TradeLedger.from_arrays(signals.index[index], result['trade_side'], close[index],
+                                     result['trade_shares'], bars=index)
+
+    return portfolio, trades
+
+
+def _run_strategy_execution(signals, initial_capital, execution, lean=False):
+    close = signals['Close'].to_numpy(dtype=np.float64)
+    result = execute(close, signals['Signal'].to_numpy(), initial_capital, **execution)
+    portfolio = _portfolio_frame(signals, result, lean)
+
+    index = result['trade_index']
+    trades = TradeLedger.from_arrays(signals.index[index], result['trade_side'], result['trade_price'],
+                                     result['trade_shares'], bars=index, fees=result['trade_fee'],
+                                     reasons=result['trade_reason'])
+    return portfolio, trades
+
+
+def _portfolio_frame(signals, result, lean):
+    # Wraps the result arrays without copying them; lean drops unread columns
+    columns = ('Total', 'Strategy_Returns') if lean else ('Holdings', 'Cash', 'Total', 'Returns', 'Strategy_Returns')
+    frame = {'Price': signals['Close']}
+    frame.update((column, result[column]) for column in columns)
+    return pd.DataFrame(frame, index=signals.index, copy=False)
+
+
+def _run_strategy_loop(signals, initial_capital):
     #Create dataframe with same row labels as signals
 
     portfolio = pd.DataFrame(index=signals.index)
     portfolio['Price'] = signals['Close']
     portfolio['Holdings'] = 0
-    portfolio['Cash'] = initial_capital
-    portfolio['Total'] = initial_capital
+    portfolio['Cash'] = float(initial_capital)
+    portfolio['Total'] = float(initial_capital)
     portfolio['Returns'] = 0.0
     portfolio['Strategy_Returns'] = 0.0
-    
+
     # Current position state
     position = 0  # 0 = no position, 1 = long
     cash = initial_capital
     holdings = 0
-    trades = []
-    
+    trades = TradeLedger(tz=signals.index.tz)
+
     for i, (date, row) in enumerate(signals.iterrows()):
         price = row['Close']
         signal = row['Signal']
-        
+
         # Buy signal (enter long position)
         if signal == 1 and position == 0:
             shares_to_buy = cash // price
@@ -28,42 +295,30 @@ def run_strategy(signals, initial_capital):
                 holdings = shares_to_buy
                 cash -= shares_to_buy * price
                 position = 1
-                
+
                 # Record trade
-                trades.append({
-                    'Date': date,
-                    'Type': 'BUY',
-                    'Price': price,
-                    'Shares': shares_to_buy,
-                    'Value': shares_to_buy * price
-                })
-        
+                trades.append(date, 'BUY', price, shares_to_buy, bar=i)
+
         # Sell signal (exit long position)
         elif signal == -1 and position == 1:
             if holdings > 0:
                 cash += holdings * price
-                
+
                 # Record trade
-                trades.append({
-                    'Date': date,
-                    'Type': 'SELL',
-                    'Price': price,
-                    'Shares': holdings,
-                    'Value': holdings * price
-                })
-                
+                trades.append(date, 'SELL', price, holdings, bar=i)
+
                 holdings = 0
                 position = 0
-        
+
         # Update portfolio values
         portfolio.loc[date, 'Holdings'] = holdings
         portfolio.loc[date, 'Cash'] = cash
         portfolio.loc[date, 'Total'] = cash + holdings * price
-        
+
         # Calculate returns
         if i > 0:
             prev_total = portfolio.iloc[i-1]['Total']
             portfolio.loc[date, 'Strategy_Returns'] = (portfolio.loc[date, 'Total'] - prev_total) / prev_total
             portfolio.loc[date, 'Returns'] = (price - signals.iloc[i-1]['Close']) / signals.iloc[i-1]['Close']
-    
-    return portfolio, trades
\ No newline at end of file
+
+    return portfolio, trades
@@ -0,0 +1,194 @@
+import math
+from collections import deque
+
+from .ledger import TradeLedger
+
+
+class RollingMean:
+    """
+    O(1) running simple moving average.
+
+    Mirrors the Kahan-compensated add/remove scheme pandas uses for
+    rolling().mean(), so every value is bit-for-bit what the batch
+    generate_signals() produces for the same series.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = math.nan
+
+    def update(self, value):
+        """Push one value and return the current mean (NaN until the window fills)."""
+        value = float(value)
+        if self.window == 1:
+            # pandas restarts the sum when consecutive windows do not overlap
+            self.__init__(1)
+        elif len(self.values) == self.window:
+            self._remove(self.values.popleft())
+        self.values.append(value)
+        self._add(value)
+
+        if self.nobs < self.window or self.nobs == 0:
+            return math.nan
+        result = self.sum_x / self.nobs
+        if self.num_consecutive_same_value >= self.nobs:
+            result = self.prev_value
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+    def _add(self, value):
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self.compensation_add
+        t = self.sum_x + y
+        self.compensation_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct += 1
+        if value == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = value
+
+    def _remove(self, value):
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self.compensation_remove
+        t = self.sum_x + y
+        self.compensation_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct -= 1
+
+
+class StreamingCrossover:
+    """
+    Incremental moving average crossover strategy.
+
+    Keeps running-sum state for both windows together with the current
+    position, cash and holdings, so each new bar costs O(1) instead of
+    recomputing the whole history. Feeding the bars of a series through
+    ``update`` yields the same signals, trades and equity as
+    generate_signals() followed by run_strategy().
+    """
+
+    def __init__(self, short_window: int = 20, long_window: int = 50,
+                 initial_capital: float = 100000):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.initial_capital = initial_capital
+
+        self.short_ma = RollingMean(short_window)
+        self.long_ma = RollingMean(long_window)
+
+        self.signal = None
+        self.position = 0  # 0 = no position, 1 = long
+        self.cash = initial_capital
+        self.holdings = 0
+        self.price = None
+        self.total = initial_capital
+        self.trades = TradeLedger()
+        self.bars = 0
+
+    def update(self, date, close):
+        """
+        Process one bar and return its record: the moving averages, Signal,
+        Entry/Exit flags, any trade executed on the bar and the updated
+        Holdings, Cash, Total and returns.
+        """
+        price = close
+        short_ma = self.short_ma.update(price)
+        long_ma = self.long_ma.update(price)
+
+        if short_ma > long_ma:
+            signal = 1
+        elif short_ma < long_ma:
+            signal = -1
+        else:
+            signal = 0
+        change = 0 if self.signal is None else signal - self.signal
+
+        trade = None
+        # Buy signal (enter long position)
+        if signal == 1 and self.position == 0:
+            shares_to_buy = self.cash // price
+            if shares_to_buy > 0:
+                self.holdings = shares_to_buy
+                self.cash -= shares_to_buy * price
+                self.position = 1
+                trade = {
+                    'Date': date,
+                    'Type': 'BUY',
+                    'Price': price,
+                    'Shares': shares_to_buy,
+                    'Value': shares_to_buy * price
+                }
+
+        # Sell signal (exit long position)
+        elif signal == -1 and self.position == 1:
+            if self.holdings > 0:
+                self.cash += self.holdings * price
+                trade = {
+                    'Date': date,
+                    'Type': 'SELL',
+                    'Price': price,
+                    'Shares': self.holdings,
+                    'Value': self.holdings * price
+                }
+                self.holdings = 0
+                self.position = 0
+
+        if trade is not None:
+            self.trades.append(date, trade['Type'], price, trade['Shares'], bar=self.bars)
+
+        prev_total, prev_price = self.total, self.price
+        self.total = self.cash + self.holdings * price
+        first = self.bars == 0
+        record = {
+            'Date': date,
+            'Close': price,
+            f'MA_{self.short_window}': short_ma,
+            f'MA_{self.long_window}': long_ma,
+            'Signal': signal,
+            'Position': change,
+            'Entry': change == 2,
+            'Exit': change == -2,
+            'Trade': trade,
+            'Holdings': self.holdings,
+            'Cash': self.cash,
+            'Total': self.total,
+            'Returns': 0.0 if first else (price - prev_price) / prev_price,
+            'Strategy_Returns': 0.0 if first else (self.total - prev_total) / prev_total,
+        }
+
+        self.signal = signal
+        self.price = price
+        self.bars += 1
+        return record
+
+    def update_many(self, bars):
+        """
+        Process a batch of bars, given as a DataFrame with a Close column or
+        an iterable of (date, close) pairs. Returns the list of bar records.
+        """
+        if hasattr(bars, 'columns'):
+            bars = zip(bars.index, bars['Close'].tolist())
+        return [self.update(date, close) for date, close in bars]
+
+    @property
+    def equity(self):
+        """Current total portfolio value."""
+        return self.total
@@ -0,0 +1,185 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .sources import YFinanceSource
+from .signals import moving_average_matrix, crossover_signal
+from .strategy import simulate
+from .performance import compute_metrics, infer_periods_per_year
+from .backtester import evaluate_pairs
+
+logger = logging.getLogger(__name__)
+
+
+def walk_forward_folds(n_bars, in_sample, out_of_sample, anchored=False):
+    """
+    Split ``n_bars`` into consecutive walk-forward folds.
+
+    Returns a list of (is_start, is_end, oos_end) bar offsets: the model is
+    fitted on [is_start, is_end) and traded on [is_end, oos_end). Out-of-
+    sample windows are back to back; rolling folds slide the in-sample
+    window along with them, anchored folds keep it starting at bar 0.
+    """
+    folds = []
+    is_end = in_sample
+    while is_end < n_bars:
+        is_start = 0 if anchored else is_end - in_sample
+        folds.append((is_start, is_end, min(is_end + out_of_sample, n_bars)))
+        is_end += out_of_sample
+    return folds
+
+
+class WalkForwardOptimizer:
+    """
+    Walk-forward optimization of the crossover windows on one ticker.
+
+    Every distinct window's moving average is computed once over the full
+    history; each fold only slices that matrix. For every fold the (short,
+    long) pair with the highest in-sample ``metric`` is picked and then
+    traded out of sample, carrying the ending capital into the next fold so
+    the out-of-sample equity curves chain into one. Each fold starts flat.
+
+    In-sample searches are independent and run on a process pool when
+    ``max_workers`` is not 1; prices and averages are shared with the
+    workers through one shared-memory block.
+    """
+
+    def __init__(self, ticker: str, short_windows, long_windows,
+                 start_date: str = None, end_date: str = None,
+                 in_sample: int = 504, out_of_sample: int = 126, anchored: bool = False,
+                 metric: str = 'Sharpe Ratio', initial_capital: float = 100000,
+                 max_workers: int = None, batch_size: int = 256,
+                 cache=None, source=None, ma_type: str = "sma"):
+        self.ticker = ticker.upper()
+        self.pairs = [(short, long) for short in short_windows for long in long_windows if short < long]
+        if not self.pairs:
+            raise ValueError("No window pairs with short < long to evaluate")
+        self.start_date = start_date
+        self.end_date = end_date
+        self.in_sample = in_sample
+        self.out_of_sample = out_of_sample
+        self.anchored = anchored
+        self.metric = metric
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.ma_type = ma_type
+        self.source = source if source is not None else YFinanceSource(cache=cache)
+
+        self.results = None
+        self.equity = None
+        self.metric_values = {}
+
+    def run(self, data=None):
+        """
+        Run every fold and return the per-fold results DataFrame.
+
+        The chained out-of-sample equity is stored in ``self.equity`` and its
+        compute_metrics() values in ``self.metric_values``.
+        """
+        if data is None:
+            data = self.source.load(self.ticker, self.start_date, self.end_date)
+        close = data['Close'].to_numpy(dtype=np.float64)
+        periods_per_year = infer_periods_per_year(data.index)
+
+        folds = walk_forward_folds(len(close), self.in_sample, self.out_of_sample, self.anchored)
+        if not folds:
+            raise ValueError(f"Need more than {self.in_sample} bars for a walk-forward fold, got {len(close)}")
+
+        windows = sorted({w for pair in self.pairs for w in pair})
+        row_of = {w: i for i, w in enumerate(windows)}
+        averages = moving_average_matrix(close, windows, ma_type=self.ma_type)
+
+        logger.info("Walk-forward %s: %d folds x %d pairs", self.ticker, len(folds), len(self.pairs))
+        if self.max_workers == 1 or len(folds) == 1:
+            selections = [_select_pair(close, averages, row_of, fold, self.pairs, self.initial_capital,
+                                       self.metric, self.batch_size, periods_per_year) for fold in folds]
+        else:
+            selections = self._select_parallel(close, averages, windows, folds, periods_per_year)
+
+        # Out of sample: trade each fold's pick, chaining the capital
+        capital = self.initial_capital
+        round_trips = winning_trades = 0
+        equity = np.empty(folds[-1][2] - folds[0][1])
+        rows = []
+        for k, ((is_start, is_end, oos_end), (short, long, score)) in enumerate(zip(folds, selections)):
+            signal = crossover_signal(averages[row_of[short], is_end:oos_end],
+                                      averages[row_of[long], is_end:oos_end])
+            sim = simulate(close[is_end:oos_end], signal, capital)
+            equity[is_end - folds[0][1]:oos_end - folds[0][1]] = sim['Total']
+
+            values = sim['trade_shares'] * close[is_end:oos_end][sim['trade_index']]
+            profits = values[1::2] - values[0:len(values) // 2 * 2:2]
+            round_trips += len(profits)
+            winning_trades += int(np.count_nonzero(profits > 0))
+
+            rows.append({
+                'Fold': k,
+                'IS_Start': data.index[is_start],
+                'IS_End': data.index[is_end - 1],
+                'OOS_Start': data.index[is_end],
+                'OOS_End': data.index[oos_end - 1],
+                'Short_MA': short,
+                'Long_MA': long,
+                f'IS {self.metric}': score,
+                'OOS Return': sim['Total'][-1] / capital - 1,
+                'OOS Trades': len(sim['trade_side']),
+            })
+            capital = sim['Total'][-1]
+
+        oos = slice(folds[0][1], folds[-1][2])
+        self.equity = pd.Series(equity, index=data.index[oos], name='Total')
+        self.metric_values = compute_metrics(equity, self.initial_capital, price=close[oos],
+                                             round_trips=round_trips, winning_trades=winning_trades,
+                                             periods_per_year=periods_per_year)
+        self.results = pd.DataFrame(rows)
+        return self.results
+
+    def _select_parallel(self, close, averages, windows, folds, periods_per_year):
+        n = len(close)
+        shm = shared_memory.SharedMemory(create=True, size=(len(windows) + 1) * n * np.dtype(np.float64).itemsize)
+        try:
+            packed = np.ndarray((len(windows) + 1, n), dtype=np.float64, buffer=shm.buf)
+            packed[0] = close
+            packed[1:] = averages
+            del packed
+
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(_select_shared, shm.name, n, windows, fold, self.pairs,
+                                       self.initial_capital, self.metric, self.batch_size, periods_per_year)
+                           for fold in folds]
+                return [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+def _select_pair(close, averages, row_of, fold, pairs, initial_capital, metric, batch_size, periods_per_year):
+    """Best (short, long, score) pair on one fold's in-sample slice."""
+    is_start, is_end, _ = fold
+    in_sample = slice(is_start, is_end)
+    frames = [evaluate_pairs(close[in_sample], pairs[start:start + batch_size], initial_capital,
+                             averages[:, in_sample], row_of, periods_per_year=periods_per_year)
+              for start in range(0, len(pairs), batch_size)]
+    scores = pd.concat(frames, ignore_index=True)[metric].to_numpy(dtype=np.float64)
+    best = int(np.nanargmax(scores)) if not np.isnan(scores).all() else 0
+    short, long = pairs[best]
+    return short, long, scores[best]
+
+
+def _select_shared(shm_name, n, windows, fold, pairs, initial_capital, metric, batch_size, periods_per_year):
+    """Worker: _select_pair() on prices and averages mapped from shared memory."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    packed = None
+    try:
+        packed = np.ndarray((len(windows) + 1, n), dtype=np.float64, buffer=shm.buf)
+        row_of = {w: i for i, w in enumerate(windows)}
+        return _select_pair(packed[0], packed[1:], row_of, fold, pairs, initial_capital, metric, batch_size,
+                            periods_per_year)
+    finally:
+        # Drop the view before closing, the mapping can't close while exported
+        packed = None
+        shm.close()
@@ -1,6 +1,11 @@
-from Core.backtester import MovingAverageCrossoverBacktester
+from Core.backtester import MovingAverageCrossoverBacktester, sweep
+from Core.batch import BatchBacktester
+from Core.walkforward import WalkForwardOptimizer
+from Core.portfolio import PortfolioBacktester
+from Core.montecarlo import MonteCarloSimulator
+import logging
+
 import pandas as pd
-import numpy as np
 
 def single_stock_analysis():
     """Example: Single stock comprehensive analysis"""
@@ -16,7 +21,7 @@ def single_stock_analysis():
     )
     
 
-    backtester.run_backtest(save_plot_path='aapl_analysis.png')    
+    backtester.run_backtest(save_plot_path='aapl_analysis.png', plot=True)    
     return backtester
 
 def multi_stock_comparison():
@@ -24,36 +29,18 @@ def multi_stock_comparison():
     print("\n=== MULTI-STOCK COMPARISON ===")
     
     stocks = ['AAPL', 'MSFT', 'GOOGL', 'TSLA', 'SPY']
-    results = []
-    
-    for ticker in stocks:
-        print(f"\nAnalyzing {ticker}...")
-        
-        try:
-            bt = MovingAverageCrossoverBacktester(
-                ticker=ticker,
-                start_date='2020-01-01',
-                end_date='2024-01-01',
-                short_window=20,
-                long_window=50,
-                initial_capital=100000
-            )
-            bt.run_backtest()
-            
-            total_return = (bt.portfolio['Total'].iloc[-1] - 100000) / 100000
-            
-            results.append({
-                'Ticker': ticker,
-                'Total_Return': total_return,
-                'Final_Value': bt.portfolio['Total'].iloc[-1],
-                'Trades': len(bt.trades)
-            })
-            
-        except Exception as e:
-            print(f"Error analyzing {ticker}: {e}")
-            continue
-    
-    df = pd.DataFrame(results)
+
+    # Tickers run in parallel worker processes; failures are reported, not raised
+    batch = BatchBacktester(stocks, [(20, 50)], start_date='2020-01-01',
+                            end_date='2024-01-01', initial_capital=100000)
+    results = batch.run()
+
+    df = pd.DataFrame({
+        'Ticker': results['Ticker'],
+        'Total_Return': results['Total Return'],
+        'Final_Value': results['Final Portfolio Value'],
+        'Round_Trips': results['Total Trades']
+    })
     df['Total_Return'] = df['Total_Return'].apply(lambda x: f"{x:.2%}")
     df['Final_Value'] = df['Final_Value'].apply(lambda x: f"${x:,.2f}")
     
@@ -62,51 +49,40 @@ def multi_stock_comparison():
     
     return df
 
+def portfolio_analysis():
+    """Example: Trade several stocks as one volatility-scaled portfolio"""
+    print("\n=== PORTFOLIO ANALYSIS ===")
+    
+    portfolio = PortfolioBacktester(
+        tickers=['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA'],
+        start_date='2020-01-01',
+        end_date='2024-01-01',
+        allocation='volatility',
+        max_weight=0.4
+    )
+    portfolio.run_backtest()
+    
+    return portfolio.portfolio
+
 def parameter_sensitivity_analysis():
     """Example: Test different MA window combinations"""
     print("\n=== PARAMETER SENSITIVITY ANALYSIS ===")
     
     short_windows = [10, 15, 20, 25]
     long_windows = [40, 50, 60]
-    results = []
-    
-    for short in short_windows:
-        for long in long_windows:
-            if short >= long:
-                continue
-                
-            print(f"Testing {short}/{long} MA combination...")
-            
-            try:
-                bt = MovingAverageCrossoverBacktester(
-                    ticker='SPY',
-                    start_date='2020-01-01',
-                    end_date='2024-01-01',
-                    short_window=short,
-                    long_window=long,
-                    initial_capital=100000
-                )
-                bt.run_backtest()
-                
-                total_return = (bt.portfolio['Total'].iloc[-1] - 100000) / 100000
-                daily_returns = bt.portfolio['Strategy_Returns'].dropna()
-                volatility = daily_returns.std() * np.sqrt(252)
-                sharpe = (total_return * 252/len(daily_returns) - 0.02) / volatility if volatility > 0 else 0
-                
-                results.append({
-                    'Short_MA': short,
-                    'Long_MA': long,
-                    'Total_Return': total_return,
-                    'Volatility': volatility,
-                    'Sharpe_Ratio': sharpe,
-                    'Trades': len(bt.trades)
-                })
-                
-            except Exception as e:
-                print(f"Error with {short}/{long}: {e}")
-                continue
-    
-    df = pd.DataFrame(results)
+
+    # All window pairs are evaluated in one batched pass over a single download.
+    # Sharpe is the library's (annualized return - risk free) / volatility and
+    # trades are counted as completed round trips, as in the other reports.
+    results = sweep('SPY', short_windows, long_windows,
+                    start_date='2020-01-01', end_date='2024-01-01',
+                    initial_capital=100000)
+    df = results.rename(columns={
+        'Total Return': 'Total_Return',
+        'Sharpe Ratio': 'Sharpe_Ratio',
+        'Total Trades': 'Round_Trips'
+    })[['Short_MA', 'Long_MA', 'Total_Return', 'Volatility', 'Sharpe_Ratio', 'Round_Trips']]
+
     best_sharpe = df.loc[df['Sharpe_Ratio'].idxmax()]
     best_return = df.loc[df['Total_Return'].idxmax()]
     
@@ -131,49 +107,24 @@ def sector_analysis():
         'Utilities': 'XLU'
     }
     
-    results = []
-    
-    for sector_name, ticker in sectors.items():
-        print(f"\nAnalyzing {sector_name} ({ticker})...")
-        
-        try:
-            bt = MovingAverageCrossoverBacktester(
-                ticker=ticker,
-                start_date='2020-01-01',
-                end_date='2024-01-01',
-                short_window=20,
-                long_window=50,
-                initial_capital=100000
-            )
-            bt.run_backtest()
-            
-            total_return = (bt.portfolio['Total'].iloc[-1] - 100000) / 100000
-            daily_returns = bt.portfolio['Strategy_Returns'].dropna()
-            
-            cumulative = (1 + daily_returns).cumprod()
-            running_max = cumulative.expanding().max()
-            drawdown = (cumulative - running_max) / running_max
-            max_drawdown = drawdown.min()
-            
-            results.append({
-                'Sector': sector_name,
-                'Ticker': ticker,
-                'Total_Return': total_return,
-                'Max_Drawdown': max_drawdown,
-                'Trades': len(bt.trades),
-                'Final_Value': bt.portfolio['Total'].iloc[-1]
-            })
-            
-        except Exception as e:
-            print(f"Error analyzing {sector_name}: {e}")
-            continue
-    
-    df = pd.DataFrame(results)
+    batch = BatchBacktester(sectors.values(), [(20, 50)], start_date='2020-01-01',
+                            end_date='2024-01-01', initial_capital=100000)
+    results = batch.run()
+    sector_of = {ticker: sector_name for sector_name, ticker in sectors.items()}
+
+    df = pd.DataFrame({
+        'Sector': results['Ticker'].map(sector_of),
+        'Ticker': results['Ticker'],
+        'Total_Return': results['Total Return'],
+        'Max_Drawdown': results['Max Drawdown'],
+        'Round_Trips': results['Total Trades'],
+        'Final_Value': results['Final Portfolio Value']
+    })
     df = df.sort_values('Total_Return', ascending=False)
     
     print("\nSECTOR PERFORMANCE RANKING:")
     for _, row in df.iterrows():
-        print(f"{row['Sector']:<25} {row['Total_Return']:>8.2%} {row['Max_Drawdown']:>8.2%} {row['Trades']:>6}")
+        print(f"{row['Sector']:<25} {row['Total_Return']:>8.2%} {row['Max_Drawdown']:>8.2%} {row['Round_Trips']:>6}")
     
     return df
 
@@ -203,9 +154,9 @@ def stress_test_analysis():
             )
             bt.run_backtest()
             
-            total_return = (bt.portfolio['Total'].iloc[-1] - 100000) / 100000
+            total_return = bt.metric_values['Total Return']
             days = len(bt.portfolio)
-            buy_hold_return = (bt.portfolio['Price'].iloc[-1] - bt.portfolio['Price'].iloc[0]) / bt.portfolio['Price'].iloc[0]
+            buy_hold_return = bt.metric_values['Buy & Hold Return']
             
             results.append({
                 'Period': period_name,
@@ -228,15 +179,70 @@ def stress_test_analysis():
     
     return df
 
+def walk_forward_analysis():
+    """Example: Walk-forward window optimization with out-of-sample validation"""
+    print("\n=== WALK-FORWARD ANALYSIS ===")
+    
+    optimizer = WalkForwardOptimizer(
+        ticker='SPY',
+        short_windows=range(5, 55, 5),
+        long_windows=range(20, 210, 10),
+        start_date='2010-01-01',
+        end_date='2023-12-31',
+        in_sample=504,
+        out_of_sample=126
+    )
+    folds = optimizer.run()
+    
+    print("\nFOLD SELECTIONS:")
+    for _, row in folds.iterrows():
+        print(f"{row['OOS_Start']:%Y-%m-%d} -> {row['OOS_End']:%Y-%m-%d}  "
+              f"MA({row['Short_MA']}, {row['Long_MA']})  OOS: {row['OOS Return']:>7.2%}")
+    
+    print(f"\nOut-of-sample Total Return: {optimizer.metric_values['Total Return']:.2%}")
+    print(f"Out-of-sample Sharpe Ratio: {optimizer.metric_values['Sharpe Ratio']:.2f}")
+    
+    return folds
+
+def monte_carlo_analysis():
+    """Example: Strategy robustness on bootstrapped price histories"""
+    print("\n=== MONTE CARLO ANALYSIS ===")
+    
+    simulator = MonteCarloSimulator(
+        ticker='SPY',
+        start_date='2015-01-01',
+        end_date='2024-01-01',
+        short_window=20,
+        long_window=50,
+        n_paths=10000,
+        n_bars=1000,
+        method='bootstrap',
+        block_size=20,
+        seed=42
+    )
+    simulator.run()
+    
+    print(f"\nDISTRIBUTIONS ({simulator.n_paths} paths, {simulator.confidence:.0%} intervals):")
+    print(simulator.summary.loc[['Total Return', 'Sharpe Ratio', 'Max Drawdown'],
+                                ['Median', 'CI_Lower', 'CI_Upper', 'Historical', 'Percentile']].to_string())
+    
+    return simulator.summary
+
 def main():
+    # The backtester logs its progress and results; show them on the console
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
     print("MOVING AVERAGE CROSSOVER BACKTESTER - EXAMPLE USAGE")
     print("=" * 60)
     
     single_stock_analysis()
     multi_stock_comparison()
+    portfolio_analysis()
     parameter_sensitivity_analysis()
     sector_analysis()
     stress_test_analysis()
+    walk_forward_analysis()
+    monte_carlo_analysis()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
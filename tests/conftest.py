@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.sources import DataSource
+
+
+def make_prices(n=1000, seed=0, start_price=100.0, volatility=0.02, freq='B'):
+    """Geometric random-walk OHLCV bars, business days unless ``freq`` says otherwise."""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0003, volatility, n)))
+    open_ = close * np.exp(rng.normal(0, volatility / 4, n))
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * 1.005,
+        'Low': np.minimum(open_, close) * 0.995,
+        'Close': close,
+        'Volume': rng.integers(1_000, 100_000, n).astype(np.float64),
+    }, index=pd.date_range('2010-01-01', periods=n, freq=freq, name='Date'))
+
+
+@pytest.fixture
+def prices():
+    return make_prices()
+
+
+def with_flat_stretches(data, stretches=((300, 200), (700, 120))):
+    """Copy of ``data`` whose Close is held constant over (start, length) stretches."""
+    data = data.copy()
+    close = data['Close'].to_numpy().copy()
+    for start, length in stretches:
+        close[start:start + length] = close[start]
+    data['Close'] = close
+    return data
+
+
+class FrameSource(DataSource):
+    """DataSource serving prepared frames, cut to [start_date, end_date)."""
+
+    def __init__(self, frames):
+        self.frames = {ticker.upper(): frame for ticker, frame in frames.items()}
+
+    def load(self, ticker, start_date, end_date):
+        if ticker.upper() not in self.frames:
+            raise ValueError(f"No data found for ticker {ticker}")
+        data = self.frames[ticker.upper()]
+        if start_date is not None:
+            data = data[data.index >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            data = data[data.index < pd.Timestamp(end_date)]
+        return data
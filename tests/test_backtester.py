@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from Core.backtester import MovingAverageCrossoverBacktester, sweep
+
+from .conftest import FrameSource, make_prices, with_flat_stretches
+
+PAIRS = [(10, 30), (10, 50), (20, 50), (20, 100)]
+
+
+@pytest.fixture
+def flat_prices():
+    return with_flat_stretches(make_prices(1500, seed=11))
+
+
+def test_sweep_matches_run_backtest_on_flat_stretches(flat_prices):
+    results = sweep('X', [10, 20], [30, 50, 100], data=flat_prices).set_index(['Short_MA', 'Long_MA'])
+    for short, long in PAIRS:
+        backtester = MovingAverageCrossoverBacktester('X', None, None, short_window=short, long_window=long,
+                                                      source=FrameSource({'X': flat_prices}))
+        backtester.run_backtest()
+        row = results.loc[(short, long)]
+        for metric, value in backtester.metric_values.items():
+            assert row[metric] == pytest.approx(value, rel=1e-12, abs=1e-15), (short, long, metric)
+        assert row['Final Portfolio Value'] == backtester.portfolio['Total'].iloc[-1]
+
+
+def test_flat_stretch_is_a_tie_in_the_sweep(flat_prices):
+    from Core.signals import crossover_signal, generate_signals, moving_average_matrix
+
+    close = flat_prices['Close'].to_numpy()
+    averages = moving_average_matrix(close, [10, 50])
+    expected = generate_signals(flat_prices.copy(), 10, 50)['Signal'].to_numpy()
+    np.testing.assert_array_equal(crossover_signal(averages[0], averages[1]), expected)
+    assert (expected[360:500] == 0).all()
+
+
+def test_batch_annualizes_each_ticker_for_its_bar_frequency():
+    from Core.batch import BatchBacktester
+    from Core.backtester import evaluate_pairs
+    from Core.performance import infer_periods_per_year
+
+    frames = {'DAILY': make_prices(600, seed=1), 'HOURLY': make_prices(600, seed=2, freq='h')}
+    batch = BatchBacktester(list(frames), [(10, 30)], None, None, max_workers=1,
+                            source=FrameSource(frames))
+    results = batch.run().set_index('Ticker')
+    for ticker, data in frames.items():
+        expected = evaluate_pairs(data['Close'].to_numpy(), [(10, 30)], 100000,
+                                  periods_per_year=infer_periods_per_year(data.index))
+        assert results.loc[ticker, 'Sharpe Ratio'] == expected['Sharpe Ratio'].iloc[0]
+    assert infer_periods_per_year(frames['HOURLY'].index) != infer_periods_per_year(frames['DAILY'].index)
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from Core.cache import PriceCache
+
+from .conftest import make_prices
+
+
+class RecordingFetcher:
+    """Serves prepared bars for [start, end) and records every request."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def __call__(self, ticker, start, end):
+        self.calls.append((ticker, start, end))
+        data = self.frames[ticker]
+        return data[(data.index >= start) & (data.index < end)]
+
+
+@pytest.fixture
+def data():
+    return make_prices(600)
+
+
+def cache_for(tmp_path, frames, **kwargs):
+    fetcher = RecordingFetcher(frames)
+    return PriceCache(str(tmp_path / 'cache'), fetcher=fetcher, **kwargs), fetcher
+
+
+def test_extends_with_head_and_tail_fetches(tmp_path, data):
+    cache, fetcher = cache_for(tmp_path, {'AAA': data})
+
+    middle = cache.get('AAA', '2010-06-01', '2011-01-01')
+    pd.testing.assert_frame_equal(middle, data.loc['2010-06-01':'2010-12-31'], check_freq=False,
+                                  check_index_type=False, check_names=False)
+
+    cache.get('AAA', '2010-03-01', '2011-06-01')
+    assert fetcher.calls[1:] == [('AAA', '2010-03-01', '2010-06-01'), ('AAA', '2011-01-01', '2011-06-01')]
+
+    fetcher.calls.clear()
+    inside = cache.get('AAA', '2010-04-01', '2011-05-01')
+    assert fetcher.calls == []
+    pd.testing.assert_frame_equal(inside, data.loc['2010-04-01':'2011-04-30'], check_freq=False,
+                                  check_index_type=False, check_names=False)
+
+
+def test_future_end_is_not_marked_covered(tmp_path):
+    today = pd.Timestamp.today().normalize()
+    recent = make_prices(200, freq='D')
+    recent.index = pd.date_range(end=today, periods=200, freq='D', name='Date')
+    cache, fetcher = cache_for(tmp_path, {'AAA': recent})
+    future = (today + pd.Timedelta(days=365)).strftime('%Y-%m-%d')
+
+    cache.get('AAA', recent.index[0], future)
+    tomorrow = (today + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    assert cache._index['AAA']['end'] == tomorrow
+
+    cache.get('AAA', recent.index[0], future)
+    assert fetcher.calls[-1] == ('AAA', tomorrow, future)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    frames = {ticker: make_prices(100, seed=seed) for seed, ticker in enumerate(['AAA', 'BBB', 'CCC'])}
+    # 100 bars of a timestamp plus five OHLCV floats each; room for two tickers
+    cache, _ = cache_for(tmp_path, frames, max_bytes=2 * 100 * 6 * 8)
+
+    cache.get('AAA', '2010-01-01', '2011-01-01')
+    cache.get('BBB', '2010-01-01', '2011-01-01')
+    cache.get('AAA', '2010-02-01', '2010-03-01')
+    cache.get('CCC', '2010-01-01', '2011-01-01')
+
+    assert set(cache._index) == {'AAA', 'CCC'}
+    assert not (tmp_path / 'cache' / 'BBB').exists()
+    assert cache.size() <= cache.max_bytes
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from Core.backtester import MovingAverageCrossoverBacktester
+from Core.chunked import ChunkedBacktester
+from Core.execution import NUMBA_AVAILABLE
+
+from .conftest import FrameSource, make_prices
+
+EXACT = ('Total Return', 'Annualized Return', 'Max Drawdown', 'Max Drawdown Duration',
+         'Buy & Hold Return', 'Buy & Hold Annualized', 'Total Trades', 'Win Rate',
+         'Final Portfolio Value')
+ENGINES = ["python", pytest.param("numba", marks=pytest.mark.skipif(not NUMBA_AVAILABLE,
+                                                                    reason="numba is not installed"))]
+
+
+@pytest.fixture(scope='module')
+def reference():
+    data = make_prices(2000, seed=5)
+    backtester = MovingAverageCrossoverBacktester('X', None, None, short_window=20, long_window=50,
+                                                  source=FrameSource({'X': data}))
+    backtester.run_backtest()
+    return data, backtester
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("chunk_size", [1, 7, 49, 50, 333, 2000])
+def test_chunks_match_run_backtest(reference, chunk_size, engine):
+    data, backtester = reference
+    close = data['Close'].to_numpy()
+    chunked = ChunkedBacktester(20, 50, engine=engine)
+    totals = [chunked.update(data.index[i:i + chunk_size], close[i:i + chunk_size])
+              for i in range(0, len(data), chunk_size)]
+
+    np.testing.assert_array_equal(np.concatenate(totals), backtester.portfolio['Total'].to_numpy())
+    assert chunked.trades == backtester.trades
+    metrics = chunked.metrics()
+    for metric, value in backtester.metric_values.items():
+        if metric in EXACT:
+            assert metrics[metric] == value, metric
+        else:
+            assert metrics[metric] == pytest.approx(value, rel=1e-9), metric
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from Core.execution import NUMBA_AVAILABLE, EXECUTION_PARAMS, execute, execute_batch
+from Core.signals import generate_signals
+from Core.strategy import run_strategy, simulate
+
+PARAM_SETS = [
+    {},
+    {'commission': 1.0, 'slippage': 0.001},
+    {'commission_pct': 0.002, 'stop_loss': 0.05},
+    {'take_profit': 0.1, 'trailing_stop': 0.07, 'position_size': 0.5},
+    {'stop_loss': 0.03, 'fractional': 1, 'slippage': 0.0005},
+]
+OUTPUTS = ['Holdings', 'Cash', 'Total', 'Strategy_Returns', 'trade_index', 'trade_side',
+           'trade_shares', 'trade_price', 'trade_fee', 'trade_reason']
+
+
+@pytest.fixture
+def signal(prices):
+    return generate_signals(prices, 10, 30)['Signal'].to_numpy()
+
+
+def test_default_parameters_match_simulate(prices, signal):
+    close = prices['Close'].to_numpy()
+    executed = execute(close, signal, 100000, engine="python")
+    expected = simulate(close, signal, 100000)
+    for key in ('Holdings', 'Cash', 'Total', 'Returns', 'Strategy_Returns',
+                'trade_index', 'trade_side', 'trade_shares'):
+        np.testing.assert_array_equal(executed[key], expected[key], err_msg=key)
+    np.testing.assert_array_equal(executed['trade_price'], close[expected['trade_index']])
+    assert not executed['trade_fee'].any() and not executed['trade_reason'].any()
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba is not installed")
+@pytest.mark.parametrize("params", PARAM_SETS)
+def test_numba_matches_python(prices, signal, params):
+    close = prices['Close'].to_numpy()
+    compiled = execute(close, signal, 100000, engine="numba", **params)
+    python = execute(close, signal, 100000, engine="python", **params)
+    for key in OUTPUTS:
+        np.testing.assert_array_equal(compiled[key], python[key], err_msg=key)
+
+
+@pytest.mark.parametrize("engine", ["python", pytest.param("numba", marks=pytest.mark.skipif(
+    not NUMBA_AVAILABLE, reason="numba is not installed"))])
+def test_batch_matches_single_runs(prices, signal, engine):
+    close = prices['Close'].to_numpy()
+    batch = execute_batch(close, signal, 100000, PARAM_SETS, engine=engine)
+    for k, params in enumerate(PARAM_SETS):
+        single = execute(close, signal, 100000, engine=engine, **params)
+        np.testing.assert_array_equal(batch['Total'][k], single['Total'])
+        assert batch['Trades'][k] == len(single['trade_index'])
+        assert batch['Fees'][k] == pytest.approx(single['trade_fee'].sum())
+
+
+def test_stops_exit_and_reasons_reach_the_ledger(prices):
+    signals = generate_signals(prices, 10, 30)
+    portfolio, trades = run_strategy(signals, 100000, execution={'stop_loss': 0.02, 'take_profit': 0.05})
+    reasons = trades.to_frame()['Reason']
+    assert set(reasons[trades.to_frame()['Type'] == 'BUY']) == {'Signal'}
+    assert {'Stop Loss', 'Take Profit'} <= set(reasons)
+    assert set(trades.round_trips()['Exit_Reason']) <= {'Signal', 'Stop Loss', 'Take Profit'}
+
+
+def test_unknown_parameter_raises(prices, signal):
+    assert 'stop_loss' in EXECUTION_PARAMS
+    with pytest.raises(ValueError):
+        execute(prices['Close'].to_numpy(), signal, 100000, stop_los=0.05)
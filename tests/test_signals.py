@@ -0,0 +1,58 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from Core.backtester import MovingAverageCrossoverBacktester
+from Core.performance import calculate_performance
+from Core.signals import generate_signals, generate_signals_lean
+from Core.strategy import run_strategy
+
+from .conftest import make_prices
+
+
+def peak_memory(func):
+    """Peak traced bytes allocated while running func()."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def pipeline(data, lean):
+    if lean:
+        signals = generate_signals_lean(data, 20, 50)
+    else:
+        signals = generate_signals(data, 20, 50)
+    portfolio, trades = run_strategy(signals, 100000, lean=lean)
+    return calculate_performance(portfolio, trades, 100000)
+
+
+def test_lean_signals_match_generate_signals(prices):
+    lean = generate_signals_lean(prices, 20, 50)
+    full = generate_signals(prices.copy(), 20, 50)
+    for column in ('Close', 'MA_20', 'MA_50', 'Signal', 'Entry', 'Exit'):
+        np.testing.assert_array_equal(lean[column].to_numpy(), full[column].to_numpy(), err_msg=column)
+    assert lean['Signal'].dtype == np.int8
+    assert 'Position' not in lean and list(prices.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def test_lean_pipeline_lowers_peak_memory():
+    data = make_prices(200_000, freq='min')
+    lean_peak = peak_memory(lambda: pipeline(data, lean=True))
+    full_peak = peak_memory(lambda: pipeline(data.copy(), lean=False))
+    assert lean_peak < 0.75 * full_peak, (full_peak, lean_peak)
+
+
+def test_float32_halves_stored_signal_columns(prices):
+    wide = generate_signals_lean(prices, 20, 50)
+    narrow = generate_signals_lean(prices, 20, 50, dtype="float32")
+    columns = ['Close', 'MA_20', 'MA_50']
+    assert narrow[columns].memory_usage(index=False).sum() * 2 == wide[columns].memory_usage(index=False).sum()
+
+
+def test_price_dtype_rejected_with_signal_timeframe():
+    with pytest.raises(ValueError):
+        MovingAverageCrossoverBacktester('X', None, None, signal_timeframe='1w', price_dtype='float32')
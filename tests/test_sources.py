@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.sources import LocalFileSource
+
+from .conftest import make_prices
+
+START, END = '2010-03-01', '2011-01-01'
+
+
+def expected_close(data):
+    return data.loc[(data.index >= START) & (data.index < END), 'Close']
+
+
+def long_frame(frames):
+    """Stack {symbol: bars} into one row per (date, ticker)."""
+    rows = [frame[['Close']].assign(Ticker=symbol) for symbol, frame in frames.items()]
+    return pd.concat(rows).rename_axis('Date').reset_index()
+
+
+@pytest.fixture
+def frames():
+    return {'AAA': make_prices(300, seed=1), 'BBB': make_prices(300, seed=2)}
+
+
+@pytest.mark.parametrize("ext", ['csv', 'parquet'])
+def test_directory_of_files(tmp_path, frames, ext):
+    for ticker, frame in frames.items():
+        path = tmp_path / f"{ticker.lower()}.{ext}"
+        frame.to_csv(path) if ext == 'csv' else frame.to_parquet(path)
+
+    source = LocalFileSource(str(tmp_path))
+    errors = {}
+    loaded = source.load_many(['aaa', 'BBB', 'CCC'], START, END, errors)
+
+    assert set(loaded) == {'AAA', 'BBB'}
+    assert list(loaded['AAA'].columns) == ['Close']
+    for ticker, frame in frames.items():
+        pd.testing.assert_series_equal(loaded[ticker]['Close'], expected_close(frame),
+                                       check_freq=False, check_index_type=False)
+    assert errors == {'CCC': "No data found for ticker CCC"}
+
+
+def test_long_csv_with_mixed_dst_offsets(tmp_path):
+    data = make_prices(120, freq='D')
+    data.index = data.index.tz_localize('America/New_York')
+    path = tmp_path / "long.csv"
+    long_frame({'AAA': data}).to_csv(path, index=False)
+
+    loaded = LocalFileSource(str(path), chunksize=50).load('AAA', None, None)
+
+    assert len(loaded) == len(data)
+    np.testing.assert_array_equal(loaded.index, data.index.tz_convert('UTC'))
+    np.testing.assert_allclose(loaded['Close'], data['Close'])
+
+
+def test_long_parquet_matches_mixed_case_symbols(tmp_path, frames):
+    path = tmp_path / "long.parquet"
+    long_frame({'Aaa': frames['AAA'], 'bbb': frames['BBB'], 'CCC': make_prices(300, seed=3)}).to_parquet(path)
+
+    loaded = LocalFileSource(str(path)).load_many(['AAA', 'bBb'], START, END)
+
+    assert set(loaded) == {'AAA', 'BBB'}
+    for ticker, frame in frames.items():
+        np.testing.assert_array_equal(loaded[ticker]['Close'], expected_close(frame))
+
+
+@pytest.mark.parametrize("ext", ['csv', 'parquet'])
+def test_dtype_and_columns(tmp_path, frames, ext):
+    path = tmp_path / f"AAA.{ext}"
+    frames['AAA'].to_csv(path) if ext == 'csv' else frames['AAA'].to_parquet(path)
+
+    loaded = LocalFileSource(str(tmp_path), columns=('Open', 'Close'), dtype='float32').load('AAA', START, END)
+
+    assert list(loaded.columns) == ['Open', 'Close']
+    assert (loaded.dtypes == np.float32).all()
+    np.testing.assert_allclose(loaded['Close'], expected_close(frames['AAA']), rtol=1e-6)
+
+
+def test_rejects_unsupported_dtype(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported dtype"):
+        LocalFileSource(str(tmp_path), dtype='int64')
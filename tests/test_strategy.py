@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.ledger import TradeLedger
+from Core.signals import generate_signals
+from Core.strategy import run_strategy
+
+PORTFOLIO_COLUMNS = ['Price', 'Holdings', 'Cash', 'Total', 'Returns', 'Strategy_Returns']
+
+
+def assert_engines_match(signals, initial_capital):
+    vectorized, vectorized_trades = run_strategy(signals, initial_capital, engine="vectorized")
+    loop, loop_trades = run_strategy(signals, initial_capital, engine="loop")
+
+    assert list(vectorized.columns) == list(loop.columns) == PORTFOLIO_COLUMNS
+    assert vectorized.index.equals(loop.index)
+    for column in PORTFOLIO_COLUMNS:
+        np.testing.assert_array_equal(vectorized[column].to_numpy(dtype=np.float64),
+                                      loop[column].to_numpy(dtype=np.float64), err_msg=column)
+
+    assert isinstance(loop_trades, TradeLedger) and isinstance(vectorized_trades, TradeLedger)
+    assert len(vectorized_trades) == len(loop_trades)
+    for vectorized_trade, loop_trade in zip(vectorized_trades, loop_trades):
+        assert vectorized_trade == loop_trade
+    np.testing.assert_array_equal(vectorized_trades.records, loop_trades.records)
+    return vectorized_trades
+
+
+@pytest.mark.parametrize("short_window, long_window", [(5, 20), (20, 50)])
+def test_vectorized_matches_loop(prices, short_window, long_window):
+    signals = generate_signals(prices, short_window, long_window)
+    trades = assert_engines_match(signals, 100000)
+    assert len(trades) > 10
+
+
+def test_vectorized_matches_loop_when_an_entry_is_unaffordable():
+    # Entries at 50 and 200 on 100 of capital: the first buys two shares,
+    # the second cannot afford one and must wait for the entry at 80.
+    close = np.array([50, 50, 50, 60, 40, 40, 200, 200, 150, 150, 80, 90, 70], dtype=np.float64)
+    signal = np.array([1, 0, 0, 0, -1, 0, 1, 0, -1, 0, 1, 0, -1])
+    signals = pd.DataFrame({'Close': close, 'Signal': signal},
+                           index=pd.bdate_range('2020-01-01', periods=len(close)))
+
+    trades = assert_engines_match(signals, 100)
+    assert [trade['Type'] for trade in trades] == ['BUY', 'SELL', 'BUY', 'SELL']
+    assert trades[2]['Price'] == 80
+
+
+def test_vectorized_matches_loop_with_tz_aware_index(prices):
+    prices.index = prices.index.tz_localize('America/New_York')
+    signals = generate_signals(prices, 10, 30)
+    trades = assert_engines_match(signals, 100000)
+    assert trades[0]['Date'].tz is not None
+
+
+def test_unknown_engine_raises(prices):
+    with pytest.raises(ValueError):
+        run_strategy(generate_signals(prices, 10, 30), 100000, engine="numpy")
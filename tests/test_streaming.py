@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Core.signals import generate_signals
+from Core.strategy import run_strategy, simulate
+from Core.streaming import RollingMean, StreamingCrossover
+
+from .conftest import make_prices, with_flat_stretches
+
+
+@pytest.fixture(scope='module')
+def walk():
+    # Long enough for the running sums to drift if the compensation were off
+    return with_flat_stretches(make_prices(20_000, seed=7, freq='h'), ((5000, 300), (12000, 80)))
+
+
+@pytest.fixture(scope='module')
+def batch(walk):
+    return generate_signals(walk.copy(), 20, 50)
+
+
+@pytest.mark.parametrize("window", [1, 2, 20, 50])
+def test_rolling_mean_matches_pandas(walk, window):
+    rolling = RollingMean(window)
+    streamed = np.array([rolling.update(value) for value in walk['Close'].to_numpy()])
+    np.testing.assert_array_equal(streamed, walk['Close'].rolling(window).mean().to_numpy())
+
+
+def test_streaming_crossover_matches_batch_pipeline(walk, batch):
+    stream = StreamingCrossover(20, 50)
+    records = pd.DataFrame(stream.update_many(walk)).set_index('Date')
+
+    for column in ('MA_20', 'MA_50', 'Signal', 'Position', 'Entry', 'Exit'):
+        np.testing.assert_array_equal(records[column].to_numpy(), batch[column].to_numpy(), err_msg=column)
+
+    sim = simulate(walk['Close'].to_numpy(), batch['Signal'].to_numpy(), 100000)
+    for column in ('Holdings', 'Cash', 'Total', 'Returns', 'Strategy_Returns'):
+        np.testing.assert_array_equal(records[column].to_numpy(dtype=np.float64), sim[column], err_msg=column)
+
+    _, trades = run_strategy(batch, 100000)
+    assert len(trades) > 10
+    assert stream.trades == trades
+    assert stream.equity == sim['Total'][-1]